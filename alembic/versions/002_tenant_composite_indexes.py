@@ -0,0 +1,35 @@
+"""composite tenant-scoped indexes for hot query paths
+
+Revision ID: 002_tenant_composite_indexes
+Revises: 001_add_refresh_tokens
+Create Date: 2026-10-18 00:00:00.000000
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '002_tenant_composite_indexes'
+down_revision = '001_add_refresh_tokens'
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ('ix_atendimentos_empresa_data', 'atendimentos', ['empresa_id', 'data_atendimento']),
+    ('ix_atendimentos_cliente_data', 'atendimentos', ['cliente_id', 'data_atendimento']),
+    ('ix_clientes_empresa_primeiro_contato', 'clientes', ['empresa_id', 'data_primeiro_contato']),
+    ('ix_clientes_empresa_telefone', 'clientes', ['empresa_id', 'telefone']),
+]
+
+
+def upgrade():
+    # CONCURRENTLY cannot run inside a transaction on PostgreSQL; building the
+    # indexes online avoids blocking writes on large tenants.
+    # IF NOT EXISTS: tables created by metadata.create_all already carry them.
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, unique=False, if_not_exists=True, postgresql_concurrently=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, _columns in reversed(INDEXES):
+            op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
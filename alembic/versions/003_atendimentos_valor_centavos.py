@@ -0,0 +1,57 @@
+"""add numeric atendimentos.valor_centavos and backfill it
+
+Revision ID: 003_atendimentos_valor_centavos
+Revises: 002_tenant_composite_indexes
+Create Date: 2026-10-18 00:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from backend.analytics import brl_to_centavos
+
+# revision identifiers, used by Alembic.
+revision = '003_atendimentos_valor_centavos'
+down_revision = '002_tenant_composite_indexes'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 5000
+
+
+def upgrade():
+    columns = {c['name'] for c in sa.inspect(op.get_bind()).get_columns('atendimentos')}
+    if 'valor_centavos' not in columns:
+        op.add_column('atendimentos', sa.Column('valor_centavos', sa.Integer(), nullable=True))
+
+    # Backfill in id-ordered batches, each committed on its own, so row locks
+    # are held briefly and a large table never sits in one long transaction.
+    with op.get_context().autocommit_block():
+        _backfill(op.get_bind())
+
+
+def _backfill(bind):
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.text(
+                "SELECT id, valor_cobrado FROM atendimentos "
+                "WHERE id > :last_id AND valor_centavos IS NULL AND valor_cobrado IS NOT NULL "
+                "ORDER BY id LIMIT :limit"
+            ),
+            {"last_id": last_id, "limit": BATCH_SIZE},
+        ).fetchall()
+        if not rows:
+            break
+        params = [
+            {"id": row_id, "centavos": brl_to_centavos(valor)}
+            for row_id, valor in rows
+        ]
+        bind.execute(
+            sa.text("UPDATE atendimentos SET valor_centavos = :centavos WHERE id = :id"),
+            params,
+        )
+        last_id = rows[-1][0]
+
+
+def downgrade():
+    op.drop_column('atendimentos', 'valor_centavos')
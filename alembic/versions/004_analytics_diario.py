@@ -0,0 +1,38 @@
+"""per-empresa daily analytics rollup table
+
+Revision ID: 004_analytics_diario
+Revises: 003_atendimentos_valor_centavos
+Create Date: 2026-10-18 00:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.orm import Session
+
+# revision identifiers, used by Alembic.
+revision = '004_analytics_diario'
+down_revision = '003_atendimentos_valor_centavos'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    if not sa.inspect(bind).has_table('analytics_diario'):
+        op.create_table(
+            'analytics_diario',
+            sa.Column('empresa_id', sa.Integer(), nullable=False),
+            sa.Column('dia', sa.Date(), nullable=False),
+            sa.Column('atendimentos', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('receita_centavos', sa.BigInteger(), nullable=False, server_default='0'),
+            sa.Column('novos_clientes', sa.Integer(), nullable=False, server_default='0'),
+            sa.ForeignKeyConstraint(['empresa_id'], ['empresas.id'], ),
+            sa.PrimaryKeyConstraint('empresa_id', 'dia'),
+        )
+
+    # Seed history so the dashboard has data as soon as it reads the rollup.
+    from backend.rollups import rebuild_rollups
+    rebuild_rollups(Session(bind=bind))
+
+
+def downgrade():
+    op.drop_table('analytics_diario')
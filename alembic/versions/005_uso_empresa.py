@@ -0,0 +1,35 @@
+"""per-empresa usage counters for plan limits
+
+Revision ID: 005_uso_empresa
+Revises: 004_analytics_diario
+Create Date: 2026-10-18 00:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.orm import Session
+
+# revision identifiers, used by Alembic.
+revision = '005_uso_empresa'
+down_revision = '004_analytics_diario'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    if not sa.inspect(bind).has_table('uso_empresa'):
+        op.create_table(
+            'uso_empresa',
+            sa.Column('empresa_id', sa.Integer(), nullable=False),
+            sa.Column('total_clientes', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('total_atendimentos', sa.Integer(), nullable=False, server_default='0'),
+            sa.ForeignKeyConstraint(['empresa_id'], ['empresas.id'], ),
+            sa.PrimaryKeyConstraint('empresa_id'),
+        )
+
+    from backend.plan_limits import reconcile_usage
+    reconcile_usage(Session(bind=bind))
+
+
+def downgrade():
+    op.drop_table('uso_empresa')
@@ -0,0 +1,40 @@
+"""reclassification queue and worker job bookkeeping
+
+Revision ID: 006_reclassificacao
+Revises: 005_uso_empresa
+Create Date: 2026-10-18 00:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '006_reclassificacao'
+down_revision = '005_uso_empresa'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table('clientes_reclassificar'):
+        op.create_table(
+            'clientes_reclassificar',
+            sa.Column('cliente_id', sa.Integer(), nullable=False),
+            sa.Column('empresa_id', sa.Integer(), nullable=False),
+            sa.Column('marcado_em', sa.DateTime(), nullable=False),
+            sa.ForeignKeyConstraint(['cliente_id'], ['clientes.id'], ondelete='CASCADE'),
+            sa.ForeignKeyConstraint(['empresa_id'], ['empresas.id'], ),
+            sa.PrimaryKeyConstraint('cliente_id'),
+        )
+    if not inspector.has_table('tarefas_execucao'):
+        op.create_table(
+            'tarefas_execucao',
+            sa.Column('nome', sa.String(), nullable=False),
+            sa.Column('ultima_execucao', sa.DateTime(), nullable=False),
+            sa.PrimaryKeyConstraint('nome'),
+        )
+
+
+def downgrade():
+    op.drop_table('tarefas_execucao')
+    op.drop_table('clientes_reclassificar')
@@ -0,0 +1,34 @@
+"""partial index on live refresh tokens
+
+Revision ID: 007_refresh_tokens_ativos
+Revises: 006_reclassificacao
+Create Date: 2026-10-18 00:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '007_refresh_tokens_ativos'
+down_revision = '006_reclassificacao'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Built online, as in 002; IF NOT EXISTS covers tables from create_all.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_refresh_tokens_ativos',
+            'refresh_tokens',
+            ['empresa_id', 'expires_at'],
+            unique=False,
+            if_not_exists=True,
+            postgresql_concurrently=True,
+            postgresql_where=sa.text('revoked = 0'),
+            sqlite_where=sa.text('revoked = 0'),
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_refresh_tokens_ativos', table_name='refresh_tokens', if_exists=True, postgresql_concurrently=True)
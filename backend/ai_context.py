@@ -0,0 +1,158 @@
+"""
+Bounded business context for the internal AI assistant (/ia/perguntar).
+
+The context is a short summary computed entirely in SQL:
+
+- totals and the status breakdown;
+- the top clientes by number of atendimentos;
+- the most recent atendimentos;
+- a revenue trend over the last three 30-day windows, read from the
+  `analytics_diario` rollup.
+
+Every query is an aggregate or has a LIMIT, so the cost does not grow with
+the tenant's history. The text is capped at `AI_CONTEXT_MAX_TOKENS`
+(estimated at ~4 characters per token) by dropping list items from the end,
+and is cached per tenant through backend.cache, so writes invalidate it.
+
+The "Clientes: [...]" / "Atendimentos: N" lines keep the format that
+ai_module.LocalProvider parses.
+"""
+from __future__ import annotations
+
+import os
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+from sqlalchemy import case, func
+from sqlalchemy.orm import Session
+
+from backend import cache, models
+from backend.analytics import centavos_to_reais
+
+MAX_TOKENS = int(os.getenv("AI_CONTEXT_MAX_TOKENS", "600"))
+CACHE_TTL = int(os.getenv("AI_CONTEXT_CACHE_TTL_SECONDS", "300"))
+TOP_CLIENTES = 10
+RECENTES = 5
+JANELA_DIAS = 30
+CHARS_POR_TOKEN = 4
+
+
+def estimar_tokens(texto: str) -> int:
+    return -(-len(texto) // CHARS_POR_TOKEN)
+
+
+def _reais(centavos) -> str:
+    return f"R$ {centavos_to_reais(centavos):,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+
+
+def _resumo(db: Session, empresa_id: int, agora: datetime) -> dict:
+    A, C, R = models.Atendimento, models.Cliente, models.AnalyticsDiario
+
+    total_clientes = db.query(func.count(C.id)).filter(C.empresa_id == empresa_id).scalar() or 0
+    total_atendimentos = db.query(func.count(A.id)).filter(A.empresa_id == empresa_id).scalar() or 0
+    por_status = dict(
+        db.query(C.status_cliente, func.count(C.id))
+        .filter(C.empresa_id == empresa_id)
+        .group_by(C.status_cliente)
+        .all()
+    )
+
+    total = func.count(A.id)
+    ultima = func.max(A.data_atendimento)
+    top = (
+        db.query(C.nome, total, ultima)
+        .join(A, A.cliente_id == C.id)
+        .filter(A.empresa_id == empresa_id)
+        .group_by(C.id, C.nome)
+        .order_by(total.desc(), ultima.desc())
+        .limit(TOP_CLIENTES)
+        .all()
+    )
+    recentes = (
+        db.query(C.nome, A.tipo_servico, A.data_atendimento)
+        .join(C, C.id == A.cliente_id)
+        .filter(A.empresa_id == empresa_id)
+        .order_by(A.data_atendimento.desc(), A.id.desc())
+        .limit(RECENTES)
+        .all()
+    )
+
+    hoje = agora.date()
+    limites = [hoje - timedelta(days=JANELA_DIAS * k) for k in range(4)]  # hoje, -30, -60, -90
+    janelas = []
+    for k in range(3):
+        dentro = (R.dia > limites[k + 1]) & (R.dia <= limites[k])
+        janelas.append(func.sum(case((dentro, R.receita_centavos), else_=0)))
+        janelas.append(func.sum(case((dentro, R.atendimentos), else_=0)))
+    tendencia = (
+        db.query(*janelas)
+        .filter(R.empresa_id == empresa_id, R.dia > limites[3], R.dia <= hoje)
+        .one()
+    )
+    ultimos_30 = db.query(func.count(A.id)).filter(
+        A.empresa_id == empresa_id,
+        A.data_atendimento >= agora - timedelta(days=JANELA_DIAS),
+    ).scalar() or 0
+
+    return {
+        "total_clientes": total_clientes,
+        "total_atendimentos": total_atendimentos,
+        "ultimos_30": ultimos_30,
+        "por_status": por_status,
+        "top": [(nome, int(n), ult) for nome, n, ult in top],
+        "recentes": list(recentes),
+        "tendencia": [(int(tendencia[2 * k] or 0), int(tendencia[2 * k + 1] or 0)) for k in range(3)],
+    }
+
+
+def _data(value) -> str:
+    return value.strftime("%Y-%m-%d") if value else "-"
+
+
+def _renderizar(resumo: dict, top: List, recentes: List) -> str:
+    status = ", ".join(f"{s or 'sem status'}: {n}" for s, n in sorted(resumo["por_status"].items(), key=lambda i: str(i[0])))
+    linhas = [
+        f"Total de clientes: {resumo['total_clientes']}",
+        f"Atendimentos: {resumo['total_atendimentos']}",
+        f"Atendimentos nos últimos {JANELA_DIAS} dias: {resumo['ultimos_30']}",
+        f"Clientes por status: {status or '-'}",
+        f"Clientes: {[nome for nome, _n, _ult in top]}",
+    ]
+    if top:
+        linhas.append("Principais clientes (atendimentos, último):")
+        linhas += [f"- {nome}: {n}, {_data(ult)}" for nome, n, ult in top]
+    if recentes:
+        linhas.append("Atendimentos recentes:")
+        linhas += [f"- {_data(data)} {nome}: {servico}" for nome, servico, data in recentes]
+    rotulos = (f"últimos {JANELA_DIAS} dias", f"{JANELA_DIAS}-{2 * JANELA_DIAS} dias", f"{2 * JANELA_DIAS}-{3 * JANELA_DIAS} dias")
+    linhas.append("Receita: " + "; ".join(
+        f"{rotulo}: {_reais(receita)} em {n} atendimento(s)" for rotulo, (receita, n) in zip(rotulos, resumo["tendencia"])
+    ))
+    return "\n".join(linhas)
+
+
+def montar_contexto(db: Session, empresa_id: int, max_tokens: int = MAX_TOKENS, agora: Optional[datetime] = None) -> str:
+    """Summary text for the prompt, at most ~`max_tokens` tokens."""
+    agora = agora or datetime.now(timezone.utc).replace(tzinfo=None)
+    resumo = _resumo(db, empresa_id, agora)
+    top, recentes = list(resumo["top"]), list(resumo["recentes"])
+    texto = _renderizar(resumo, top, recentes)
+    # Drop detail first (recent activity, then the tail of the top list).
+    while estimar_tokens(texto) > max_tokens and (recentes or top):
+        if recentes:
+            recentes.pop()
+        else:
+            top.pop()
+        texto = _renderizar(resumo, top, recentes)
+    return texto[: max_tokens * CHARS_POR_TOKEN]
+
+
+def contexto_empresa(db: Session, empresa_id: int, max_tokens: int = MAX_TOKENS) -> str:
+    """`montar_contexto`, cached per tenant (invalidated by tenant writes)."""
+    return cache.get_or_compute(
+        empresa_id,
+        "ia_contexto",
+        str(max_tokens),
+        lambda: montar_contexto(db, empresa_id, max_tokens=max_tokens),
+        ttl=CACHE_TTL,
+    )
@@ -0,0 +1,84 @@
+"""
+ai_lote.py
+Versões em lote (colunares, NumPy) de ai_module.analisar_cliente e
+ai_module.sugerir_acoes.
+
+Kept apart from ai_module so the API process does not need NumPy to start;
+only batch jobs, scripts and tests import this module.
+"""
+from datetime import date, datetime
+from typing import Optional, Tuple
+
+import numpy as np
+
+# Same rules as analisar_cliente / sugerir_acoes, evaluated for every cliente
+# at once. Dates are epoch days (days since 1970-01-01); NaN means the
+# cliente has no dated atendimento. `dias` is today minus the last day, which
+# is exactly what `(datetime.now() - strptime(...)).days` yields.
+STATUS_NOVO = "Cliente novo"
+STATUS_INATIVO = "Cliente inativo"
+STATUS_IMPORTANTE = "Cliente importante"
+STATUS_FREQUENTE = "Cliente frequente"
+STATUS_ATIVO = "Cliente ativo"
+
+
+def dias_epoch(datas) -> np.ndarray:
+    """'YYYY-MM-DD' strings (None/'' for missing) -> float epoch days (NaN for missing)."""
+    valores = np.array([d or "NaT" for d in datas], dtype="datetime64[D]")
+    dias = valores.astype("int64").astype(float)
+    dias[np.isnat(valores)] = np.nan
+    return dias
+
+
+def _hoje_epoch(hoje: Optional[date]) -> int:
+    return ((hoje or datetime.now().date()) - date(1970, 1, 1)).days
+
+
+def analisar_clientes_lote(
+    total_atendimentos,
+    ultimo_dia,
+    hoje: Optional[date] = None,
+) -> np.ndarray:
+    """Vectorized `analisar_cliente`: one status label per cliente.
+
+    `total_atendimentos[i]` is the cliente's number of atendimentos and
+    `ultimo_dia[i]` the epoch day of the last one (NaN when none is dated).
+    """
+    total = np.asarray(total_atendimentos, dtype=np.int64)
+    ultimo = np.asarray(ultimo_dia, dtype=float)
+    novo = (total == 0) | np.isnan(ultimo)
+    dias = np.where(novo, 0, _hoje_epoch(hoje) - np.nan_to_num(ultimo))
+    frequencia = np.divide(dias, total, out=np.zeros_like(dias), where=total > 0)
+    return np.select(
+        [novo, dias > 180, total > 10, frequencia < 60],
+        [STATUS_NOVO, STATUS_INATIVO, STATUS_IMPORTANTE, STATUS_FREQUENTE],
+        default=STATUS_ATIVO,
+    )
+
+
+def sugerir_acoes_lote(
+    cliente_ids,
+    total_atendimentos,
+    ultimo_dia,
+    status=None,
+    hoje: Optional[date] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Vectorized `sugerir_acoes`: (ids of clientes with a suggestion, suggestions).
+
+    Clientes without a suggestion are left out, as in the scalar version, and
+    the input order is kept. `status` is the optional status_ia_cliente label
+    per cliente (only "Cliente importante" matters).
+    """
+    ids = np.asarray(cliente_ids)
+    total = np.asarray(total_atendimentos, dtype=np.int64)
+    ultimo = np.asarray(ultimo_dia, dtype=float)
+    sem_data = (total == 0) | np.isnan(ultimo)
+    dias = np.where(sem_data, 0, _hoje_epoch(hoje) - np.nan_to_num(ultimo))
+    importante = np.zeros(len(ids), dtype=bool) if status is None else np.asarray(status) == STATUS_IMPORTANTE
+    sugestoes = np.select(
+        [sem_data, dias > 120, dias < 30, importante & (dias > 60)],
+        ["Sugerido entrar em contato", "Cliente sem atendimento há meses", "Possível retorno em breve", "Cliente importante parado"],
+        default="",
+    )
+    com_sugestao = sugestoes != ""
+    return ids[com_sugestao], sugestoes[com_sugestao]
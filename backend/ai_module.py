@@ -5,22 +5,121 @@ Não altera funcionalidades existentes.
 """
 
 import os
+import asyncio
+import hashlib
 import logging
+import random
+import time
 from datetime import datetime
 from typing import List, Dict, Any, Optional
 
+from backend import cache
+
 logger = logging.getLogger("clientflow.ai")
 
+# Response cache (CachedProvider): in-process LRU/TTL, plus Redis when enabled.
+AI_CACHE_ENABLED = os.getenv("AI_CACHE_ENABLED", "true").lower() in {"1", "true", "yes", "on"}
+AI_CACHE_REDIS = os.getenv("AI_CACHE_REDIS", "false").lower() in {"1", "true", "yes", "on"}
+AI_CACHE_SIZE = int(os.getenv("AI_CACHE_SIZE", "512"))
+AI_CACHE_TTL = int(os.getenv("AI_CACHE_TTL_SECONDS", "3600"))
+# Async path (respond_async): per-call timeout and max concurrent upstream calls.
+AI_TIMEOUT = float(os.getenv("AI_TIMEOUT_SECONDS", "20"))
+AI_MAX_CONCURRENCY = int(os.getenv("AI_MAX_CONCURRENCY", "8"))
+
+# upstream_calls / coalesced / timeouts / errors of respond_async.
+async_stats = cache.CacheStats()
+
+
+def _normalize_prompt(prompt: str) -> str:
+    # Only whitespace that cannot change meaning: line endings, trailing
+    # blanks and the ends (indentation matters for code prompts).
+    lines = prompt.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+    return "\n".join(line.rstrip() for line in lines).strip()
+
+
+def _request_key(name: str, model: str, max_tokens: int, prompt: str) -> str:
+    digest = hashlib.sha256(_normalize_prompt(prompt).encode("utf-8")).hexdigest()
+    return f"ai:resp:{name}:{model}:{max_tokens}:{digest}"
+
+
+class _AsyncState:
+    """Semaphore and in-flight calls; asyncio primitives belong to one event loop."""
+
+    def __init__(self, loop):
+        self.loop = loop
+        self.semaphore = asyncio.Semaphore(AI_MAX_CONCURRENCY)
+        self.inflight: Dict[str, asyncio.Future] = {}
+
+
+_async_state: Optional[_AsyncState] = None
+
+
+def _get_async_state() -> _AsyncState:
+    global _async_state
+    loop = asyncio.get_running_loop()
+    if _async_state is None or _async_state.loop is not loop:
+        _async_state = _AsyncState(loop)
+    return _async_state
+
 
 # -----------------------------
 # Pluggable AI provider layer
 # -----------------------------
 class BaseAIProvider:
+    name = "base"
+    model = ""
+    # Worth caching: remote/paid providers. Heuristic ones are cheaper than a lookup.
+    cacheable = False
+
     def respond(self, prompt: str, max_tokens: int = 128) -> Optional[str]:
         raise NotImplementedError()
 
+    async def _respond_async(self, prompt: str, max_tokens: int) -> Optional[str]:
+        # Default for sync-only providers: keep the blocking call off the loop.
+        return await asyncio.to_thread(self.respond, prompt, max_tokens)
+
+    async def respond_async(self, prompt: str, max_tokens: int = 128, timeout: Optional[float] = None) -> Optional[str]:
+        """Non-blocking `respond`; returns None on failure or after `timeout` seconds.
+
+        Identical concurrent prompts share one upstream call (single-flight)
+        and at most AI_MAX_CONCURRENCY upstream calls run at once per
+        process. A caller that times out stops waiting, but the shared call
+        keeps going for the others.
+        """
+        timeout = AI_TIMEOUT if timeout is None else timeout
+        state = _get_async_state()
+        key = _request_key(self.name, self.model, max_tokens, prompt)
+        task = state.inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._upstream(state.semaphore, prompt, max_tokens, timeout))
+            state.inflight[key] = task
+            task.add_done_callback(lambda t: state.inflight.pop(key, None) if state.inflight.get(key) is t else None)
+        else:
+            async_stats.incr("coalesced")
+        try:
+            return await asyncio.wait_for(asyncio.shield(task), timeout)
+        except asyncio.TimeoutError:
+            async_stats.incr("timeouts")
+            logger.warning("%s: no response within %.1fs", self.name, timeout)
+            return None
+
+    async def _upstream(self, semaphore: asyncio.Semaphore, prompt: str, max_tokens: int, timeout: float) -> Optional[str]:
+        async with semaphore:
+            async_stats.incr("upstream_calls")
+            try:
+                return await asyncio.wait_for(self._respond_async(prompt, max_tokens), timeout)
+            except asyncio.TimeoutError:
+                return None
+            except Exception:
+                async_stats.incr("errors")
+                logger.exception("%s: async respond failed", self.name)
+                return None
+
 
 class OpenAIProvider(BaseAIProvider):
+    name = "openai"
+    cacheable = True
+
     def __init__(self, api_key: str, model: str = "gpt-3.5-turbo"):
         try:
             import openai
@@ -38,6 +137,7 @@ class OpenAIProvider(BaseAIProvider):
                 messages=[{"role": "user", "content": prompt}],
                 max_tokens=max_tokens,
                 temperature=0.2,
+                request_timeout=AI_TIMEOUT,
             )
             if resp and resp.choices:
                 return resp.choices[0].message.content.strip()
@@ -45,12 +145,26 @@ class OpenAIProvider(BaseAIProvider):
             logger.exception("OpenAIProvider error")
         return None
 
+    async def _respond_async(self, prompt: str, max_tokens: int) -> Optional[str]:
+        resp = await self.openai.ChatCompletion.acreate(
+            model=self.model,
+            messages=[{"role": "user", "content": prompt}],
+            max_tokens=max_tokens,
+            temperature=0.2,
+            request_timeout=AI_TIMEOUT,
+        )
+        if resp and resp.choices:
+            return resp.choices[0].message.content.strip()
+        return None
+
 
 class LocalProvider(BaseAIProvider):
     """
     Lightweight local 'black-box' that uses simple heuristics from this module.
     This allows the app to function without an external API key in dev/offline.
     """
+    name = "local"
+
     def respond(self, prompt: str, max_tokens: int = 128) -> Optional[str]:
         try:
             text = prompt.lower()
@@ -59,7 +173,8 @@ class LocalProvider(BaseAIProvider):
                 # try to extract counts from prompt
                 import re
                 m_clients = re.search(r"clientes:\s*\[(.*?)\]", prompt, re.IGNORECASE | re.DOTALL)
-                m_atend = re.search(r"atendimentos:\s*(\d+)", prompt, re.IGNORECASE)
+                m_atend = re.search(r"^atendimentos:\s*(\d+)", prompt, re.IGNORECASE | re.MULTILINE)
+                m_total = re.search(r"total de clientes:\s*(\d+)", prompt, re.IGNORECASE)
                 clientes_list = []
                 if m_clients:
                     raw = m_clients.group(1)
@@ -68,7 +183,8 @@ class LocalProvider(BaseAIProvider):
                 total = int(m_atend.group(1)) if m_atend else len(clientes_list)
                 if total == 0:
                     return "Cliente sem atendimentos registrados (modo local)."
-                return f"Modo local: detectados {len(clientes_list)} cliente(s) e {total} atendimento(s)."
+                total_clientes = int(m_total.group(1)) if m_total else len(clientes_list)
+                return f"Modo local: detectados {total_clientes} cliente(s) e {total} atendimento(s)."
             # perguntas sobre classificacao
             if "cliente importante" in text or "inativo" in text or "frequente" in text:
                 return "Modo local: use a análise heurística do sistema (cliente importante / frequente / inativo)."
@@ -78,8 +194,131 @@ class LocalProvider(BaseAIProvider):
             return "Resposta (modo local) indisponível no momento."
 
 
+class FakeProvider(BaseAIProvider):
+    """Offline stand-in for a remote provider, for load tests (AI_PROVIDER=fake).
+
+    Sleeps `latency` seconds (plus up to `jitter`) per call and returns a
+    deterministic answer, so the timeout / concurrency / coalescing / cache
+    path behaves as with a real upstream.
+    """
+    name = "fake"
+    model = "fake-latency"
+    cacheable = True
+
+    def __init__(self, latency: float = 0.5, jitter: float = 0.0):
+        self.latency = latency
+        self.jitter = jitter
+
+    def _delay(self) -> float:
+        return self.latency + random.uniform(0, self.jitter)
+
+    def _answer(self, prompt: str) -> str:
+        digest = hashlib.sha256(_normalize_prompt(prompt).encode("utf-8")).hexdigest()[:8]
+        return f"Resposta simulada {digest} ({len(prompt)} caracteres de prompt)."
+
+    def respond(self, prompt: str, max_tokens: int = 128) -> Optional[str]:
+        time.sleep(self._delay())
+        return self._answer(prompt)
+
+    async def _respond_async(self, prompt: str, max_tokens: int) -> Optional[str]:
+        await asyncio.sleep(self._delay())
+        return self._answer(prompt)
+
+
+class CachedProvider(BaseAIProvider):
+    """Caches `respond` of another provider.
+
+    Keyed by provider, model, max_tokens and the SHA-256 of the normalized
+    prompt. Lookups go to the in-process LRU/TTL first, then to Redis when
+    `redis_tier` is set (shared by every worker; skipped while Redis is
+    marked down, see backend.cache). Failed calls (None) are not cached.
+    """
+
+    def __init__(self, inner: BaseAIProvider, maxsize: int = AI_CACHE_SIZE, ttl: int = AI_CACHE_TTL, redis_tier: bool = AI_CACHE_REDIS):
+        self.inner = inner
+        self.name = inner.name
+        self.model = inner.model
+        self.cacheable = False
+        self.ttl = ttl
+        self.redis_tier = redis_tier
+        self.local = cache.LocalTTLCache(maxsize=maxsize, ttl=ttl)
+        self.stats = cache.CacheStats()
+
+    def _lookup_local(self, key: str) -> Optional[str]:
+        value = self.local.get(key)
+        if value is not None:
+            self.stats.incr("hits")
+            self.stats.incr("local_hits")
+        return value
+
+    def _lookup_redis(self, key: str):
+        """Return (cached value or None, Redis client to store into or None)."""
+        r = cache.shared_redis() if self.redis_tier else None
+        if r is not None:
+            try:
+                value = r.get(key)
+            except Exception as e:
+                logger.warning("AI cache: Redis unavailable: %s", e)
+                cache.mark_redis_down()
+                r = None
+            else:
+                if value is not None:
+                    self.stats.incr("hits")
+                    self.stats.incr("redis_hits")
+                    self.local.set(key, value)
+                    return value, None
+        self.stats.incr("misses")
+        return None, r
+
+    def _lookup(self, key: str):
+        value = self._lookup_local(key)
+        if value is not None:
+            return value, None
+        return self._lookup_redis(key)
+
+    def _store(self, key: str, value: Optional[str], r) -> None:
+        if value is None:
+            return
+        self.local.set(key, value)
+        if r is not None:
+            try:
+                r.set(key, value, ex=self.ttl)
+            except Exception as e:
+                logger.warning("AI cache: could not store response: %s", e)
+                cache.mark_redis_down()
+
+    def respond(self, prompt: str, max_tokens: int = 128) -> Optional[str]:
+        key = _request_key(self.name, self.model, max_tokens, prompt)
+        value, r = self._lookup(key)
+        if value is None:
+            value = self.inner.respond(prompt, max_tokens=max_tokens)
+            self._store(key, value, r)
+        return value
+
+    async def respond_async(self, prompt: str, max_tokens: int = 128, timeout: Optional[float] = None) -> Optional[str]:
+        # Local hits are answered inline. The Redis tier is blocking redis-py
+        # (up to its socket timeout and retries), so it runs in a worker
+        # thread. Misses go through the inner provider's coalescing /
+        # concurrency / timeout handling.
+        key = _request_key(self.name, self.model, max_tokens, prompt)
+        value = self._lookup_local(key)
+        if value is not None:
+            return value
+        if self.redis_tier:
+            value, r = await asyncio.to_thread(self._lookup_redis, key)
+        else:
+            value, r = self._lookup_redis(key)
+        if value is None:
+            value = await self.inner.respond_async(prompt, max_tokens=max_tokens, timeout=timeout)
+            if r is not None:
+                await asyncio.to_thread(self._store, key, value, r)
+            else:
+                self._store(key, value, None)
+        return value
+
+
 def get_provider() -> BaseAIProvider:
-    # Provider selection: environment variable AI_PROVIDER (openai|local)
+    # Provider selection: environment variable AI_PROVIDER (openai|local|fake)
     provider = os.getenv("AI_PROVIDER", "auto").lower()
     openai_key = os.getenv("OPENAI_API_KEY", "")
     if provider == "openai":
@@ -88,6 +327,11 @@ def get_provider() -> BaseAIProvider:
         return OpenAIProvider(openai_key, model=os.getenv("OPENAI_MODEL", "gpt-3.5-turbo"))
     if provider == "local":
         return LocalProvider()
+    if provider == "fake":
+        return FakeProvider(
+            latency=float(os.getenv("AI_FAKE_LATENCY_MS", "500")) / 1000,
+            jitter=float(os.getenv("AI_FAKE_JITTER_MS", "0")) / 1000,
+        )
     # auto: prefer OpenAI if key present, else local
     if openai_key:
         return OpenAIProvider(openai_key, model=os.getenv("OPENAI_MODEL", "gpt-3.5-turbo"))
@@ -106,9 +350,20 @@ def _get_provider_singleton() -> BaseAIProvider:
         except Exception as e:
             logger.warning("Falling back to LocalProvider: %s", e)
             _PROVIDER = LocalProvider()
+        if AI_CACHE_ENABLED and _PROVIDER.cacheable:
+            _PROVIDER = CachedProvider(_PROVIDER)
     return _PROVIDER
 
 
+def cache_stats() -> Dict[str, Any]:
+    """Hit/miss counters and hit rate of the provider response cache."""
+    provider = _get_provider_singleton()
+    chamadas = {k: v for k, v in async_stats.snapshot().items() if k != "hit_rate"}
+    if isinstance(provider, CachedProvider):
+        return {"enabled": True, **provider.stats.snapshot(), "async": chamadas}
+    return {"enabled": False, "async": chamadas}
+
+
 # 1. IA Analista de Clientes
 def analisar_cliente(atendimentos: List[Dict[str, Any]]) -> str:
     """
@@ -224,6 +479,21 @@ def responder_pergunta(pergunta: str, contexto: str = "") -> str:
     return "Não foi possível gerar resposta no momento."
 
 
+async def responder_pergunta_async(pergunta: str, contexto: str = "") -> str:
+    """
+    Versão assíncrona de `responder_pergunta` (timeout, limite de concorrência e coalescência).
+    """
+    prompt = (
+        f"Dados da empresa:\n{contexto}\n"
+        f"Pergunta: {pergunta}\nResposta:"
+    )
+    provider = _get_provider_singleton()
+    resp = await provider.respond_async(prompt, max_tokens=256)
+    if resp:
+        return resp
+    return "Não foi possível gerar resposta no momento."
+
+
 # -----------------------------
 # Code assistance helpers
 # -----------------------------
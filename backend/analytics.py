@@ -88,7 +88,7 @@ def build_metric_change(current: float, previous: float) -> dict:
 
 
 def parse_brl_number(value) -> float:
-    """Best-effort BRL parsing for legacy data (used only as a fallback)."""
+    """Best-effort BRL parsing for legacy free-text `valor_cobrado` values."""
     if value is None:
         return 0.0
     if isinstance(value, (int, float)):
@@ -110,3 +110,14 @@ def parse_brl_number(value) -> float:
         return float(raw)
     except ValueError:
         return 0.0
+
+
+def brl_to_centavos(value) -> Optional[int]:
+    """Convert a `valor_cobrado` value to integer centavos (None when unset)."""
+    if value is None or (isinstance(value, str) and not value.strip()):
+        return None
+    return int(round(parse_brl_number(value) * 100))
+
+
+def centavos_to_reais(value) -> float:
+    return round(int(value or 0) / 100.0, 2)
@@ -2,13 +2,16 @@ from jose import JWTError, jwt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from backend import models, database
-from sqlalchemy.orm import Session
+from sqlalchemy import and_, delete, exists, or_, select
+from sqlalchemy.orm import Session, aliased
 from typing import Optional, Tuple
 from datetime import datetime, timedelta, timezone
 import os
 import hashlib
 import uuid
 import logging
+import time
+from backend.cache import LocalTTLCache
 # OAuth2 scheme para extrair o token do header Authorization
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/empresas/login")
 logger = logging.getLogger("clientflow.auth")
@@ -28,6 +31,14 @@ if not SECRET_KEY:
 ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "15"))
 REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "7"))
+# Rows deleted per transaction by purge_refresh_tokens, and how long a rotated
+# token is kept after its successor was issued.
+REFRESH_TOKEN_PURGE_BATCH = int(os.getenv("REFRESH_TOKEN_PURGE_BATCH", "1000"))
+REFRESH_TOKEN_ROTATION_GRACE_DAYS = int(os.getenv("REFRESH_TOKEN_ROTATION_GRACE_DAYS", "7"))
+# Verified claims are memoized per token (never past the token's own exp).
+JWT_CLAIMS_CACHE_SIZE = int(os.getenv("JWT_CLAIMS_CACHE_SIZE", "10000"))
+JWT_CLAIMS_CACHE_TTL = float(os.getenv("JWT_CLAIMS_CACHE_TTL_SECONDS", "300"))
+_claims_cache = LocalTTLCache(maxsize=JWT_CLAIMS_CACHE_SIZE, ttl=JWT_CLAIMS_CACHE_TTL)
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
@@ -42,29 +53,33 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode.update({"exp": expire})
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
-def get_current_empresa_jwt(token: str = Depends(oauth2_scheme), db: Session = Depends(database.get_db)) -> models.Empresa:
-    """
-    Dependency para rotas protegidas: extrai empresa do JWT
-    """
-    credentials_exception = HTTPException(
+def credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Não autenticado",
         headers={"WWW-Authenticate": "Bearer"},
     )
+def empresa_id_from_token(token: str, claims: Optional[dict] = None) -> int:
+    """
+    Valida o JWT e retorna o empresa_id (sub), sem consultar o banco.
+    `claims` permite reaproveitar o payload já verificado pelo middleware.
+    """
+    payload = claims if claims is not None else decode_claims(token)
+    if payload is None:
+        raise credentials_exception()
+    empresa_id_raw = payload.get("sub")
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        empresa_id_raw = payload.get("sub")
-        try:
-            empresa_id = int(empresa_id_raw) if empresa_id_raw is not None else None
-        except (TypeError, ValueError):
-            empresa_id = None
-        if empresa_id is None:
-            raise credentials_exception
-    except JWTError:
-        raise credentials_exception
+        return int(empresa_id_raw)
+    except (TypeError, ValueError):
+        raise credentials_exception()
+def get_current_empresa_jwt(token: str = Depends(oauth2_scheme), db: Session = Depends(database.get_db)) -> models.Empresa:
+    """
+    Dependency para rotas protegidas: extrai empresa do JWT
+    """
+    empresa_id = empresa_id_from_token(token)
     empresa = db.query(models.Empresa).filter(models.Empresa.id == empresa_id).first()
     if empresa is None:
-        raise credentials_exception
+        raise credentials_exception()
     return empresa
 def decode_access_token(token: str):
     """
@@ -79,14 +94,31 @@ def decode_access_token(token: str):
         return payload
     except JWTError:
         return None
+def decode_claims(token: str) -> Optional[dict]:
+    """
+    Igual a decode_access_token, mas memoiza o payload válido por token até
+    min(exp, JWT_CLAIMS_CACHE_TTL_SECONDS). O dict retornado é compartilhado:
+    trate como somente leitura.
+    """
+    payload = _claims_cache.get(token)
+    if payload is not None:
+        return payload
+    payload = decode_access_token(token)
+    if payload is None:
+        return None
+    ttl = JWT_CLAIMS_CACHE_TTL
+    exp = payload.get("exp")
+    if isinstance(exp, (int, float)):
+        ttl = min(ttl, exp - time.time())
+    if ttl > 0:
+        _claims_cache.set(token, payload, ttl=ttl)
+    return payload
 
 
 # ====== Criptografia de Senhas ======
-from passlib.context import CryptContext
 import secrets
-
-# Configuração do contexto de criptografia
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from backend import passwords
+from backend.passwords import pwd_context  # noqa: F401  (re-exported)
 
 # Configuração de tokens (simplificado para V1)
 # NOTE: SECRET_KEY/ALGORITHM/EXPIRATIONS read from env at module top
@@ -94,16 +126,23 @@ pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 def get_password_hash(password: str) -> str:
     """
-    Cria hash seguro da senha usando bcrypt
+    Cria hash seguro da senha usando bcrypt (no pool de processos de backend.passwords)
     """
-    return pwd_context.hash(password)
+    return passwords.hash_password(password)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
     Verifica se a senha corresponde ao hash
     """
-    return pwd_context.verify(plain_password, hashed_password)
+    return passwords.verify_and_update(plain_password, hashed_password)[0]
+
+
+def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verifica a senha; devolve também um novo hash quando o armazenado está desatualizado (BCRYPT_ROUNDS)
+    """
+    return passwords.verify_and_update(plain_password, hashed_password)
 
 
 def create_session_token() -> str:
@@ -187,3 +226,39 @@ def verify_refresh_token(db: Session, token: str) -> Optional[models.RefreshToke
 def revoke_refresh_tokens_for_empresa(db: Session, empresa_id: int):
     db.query(models.RefreshToken).filter(models.RefreshToken.empresa_id == empresa_id, models.RefreshToken.revoked == 0).update({models.RefreshToken.revoked: 1})
     db.commit()
+
+
+def purge_refresh_tokens(
+    db: Session,
+    now: Optional[datetime] = None,
+    batch_size: int = REFRESH_TOKEN_PURGE_BATCH,
+    grace: timedelta = timedelta(days=REFRESH_TOKEN_ROTATION_GRACE_DAYS),
+) -> int:
+    """Delete refresh tokens that can never be used again, `batch_size` rows per commit.
+
+    Purged: expired tokens, tokens revoked without rotation (logout / revoke
+    all), and rotated tokens whose successor was issued more than `grace` ago
+    (or no longer exists). Short transactions keep row locks brief on a busy
+    table. Returns the number of deleted rows.
+    """
+    now = now or datetime.now(timezone.utc)
+    # DateTime columns are stored naive (UTC).
+    now = now.astimezone(timezone.utc).replace(tzinfo=None) if now.tzinfo else now
+    RT = models.RefreshToken
+    successor = aliased(RT)
+    recent_successor = exists().where(successor.jti == RT.replaced_by, successor.created_at >= now - grace)
+    purgeable = or_(
+        RT.expires_at < now,
+        and_(RT.revoked == 1, or_(RT.replaced_by.is_(None), ~recent_successor)),
+    )
+    deleted = 0
+    while True:
+        ids = db.scalars(select(RT.id).where(purgeable).order_by(RT.id).limit(batch_size)).all()
+        if not ids:
+            break
+        db.execute(delete(RT).where(RT.id.in_(ids)).execution_options(synchronize_session=False))
+        db.commit()
+        deleted += len(ids)
+        if len(ids) < batch_size:
+            break
+    return deleted
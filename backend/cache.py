@@ -0,0 +1,276 @@
+"""
+Per-tenant response cache with write-through invalidation.
+
+Entries are keyed by (empresa_id, namespace, key) and tagged with the tenant's
+data version. Write endpoints call `bump_tenant_version` after committing, which
+makes every cached entry of that empresa stale at once without having to find
+and delete keys.
+
+Redis (backend.redis_client) is the shared tier; the version and the entry are
+fetched with a single MGET. When Redis is unreachable the cache degrades to an
+in-process LRU/TTL store for `REDIS_RETRY_SECONDS` before trying Redis again.
+Version bumps made during an outage are queued and INCRed in Redis as soon as
+it is reachable again, so other workers stop serving entries cached before
+the outage.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from itertools import count
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Set
+
+from backend.redis_client import get_redis
+
+logger = logging.getLogger("clientflow.cache")
+
+CACHE_TTL = int(os.getenv("ANALYTICS_CACHE_TTL_SECONDS", "60"))
+LOCAL_CACHE_SIZE = int(os.getenv("LOCAL_CACHE_SIZE", "2048"))
+REDIS_RETRY_SECONDS = float(os.getenv("CACHE_REDIS_RETRY_SECONDS", "30"))
+
+_MISSING = object()
+
+
+class LocalTTLCache:
+    """Thread-safe in-process LRU cache with a per-entry TTL."""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return default
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class CacheStats:
+    """Hit/miss/error counters, safe to bump from request threads."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts: Dict[str, int] = {}
+
+    def incr(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self._counts[name] = self._counts.get(name, 0) + amount
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = dict(self._counts)
+        lookups = counts.get("hits", 0) + counts.get("misses", 0)
+        counts["hit_rate"] = round(counts.get("hits", 0) / lookups, 4) if lookups else 0.0
+        return counts
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counts.clear()
+
+
+stats = CacheStats()
+
+_local_values = LocalTTLCache(maxsize=LOCAL_CACHE_SIZE, ttl=CACHE_TTL)
+# Local tier version per tenant. Versions come from one process-wide sequence
+# and are never reused, so a tenant whose version was evicted gets a fresh one
+# (a miss), never an older one that still has entries cached under it.
+_local_versions = LocalTTLCache(maxsize=LOCAL_CACHE_SIZE, ttl=3600)
+_local_versions_lock = threading.Lock()
+_version_seq = count(1)
+# Tenants bumped while Redis was down; INCRed on recovery.
+_pending_bumps: Set[int] = set()
+_pending_lock = threading.Lock()
+_redis_down_until = 0.0
+
+
+def shared_redis():
+    """Return the Redis client, or None while it is marked unavailable."""
+    if time.monotonic() < _redis_down_until:
+        return None
+    try:
+        r = get_redis()
+    except Exception:
+        mark_redis_down()
+        return None
+    if r is not None and _pending_bumps and not _flush_pending_bumps(r):
+        return None
+    return r
+
+
+def _flush_pending_bumps(r) -> bool:
+    """INCR the versions bumped during an outage; False if Redis is still down."""
+    with _pending_lock:
+        pending = list(_pending_bumps)
+        _pending_bumps.clear()
+    try:
+        pipe = r.pipeline(transaction=False)
+        for empresa_id in pending:
+            pipe.incr(_version_key(empresa_id))
+        pipe.execute()
+    except Exception as e:
+        logger.warning("Could not replay %d cache version bump(s): %s", len(pending), e)
+        with _pending_lock:
+            _pending_bumps.update(pending)
+        mark_redis_down()
+        return False
+    return True
+
+
+def mark_redis_down() -> None:
+    global _redis_down_until
+    _redis_down_until = time.monotonic() + REDIS_RETRY_SECONDS
+    stats.incr("redis_errors")
+
+
+def _version_key(empresa_id: int) -> str:
+    return f"cache:ver:{empresa_id}"
+
+
+def _entry_key(empresa_id: int, namespace: str, key: str) -> str:
+    return f"cache:{namespace}:{empresa_id}:{key}"
+
+
+def bump_tenant_version(empresa_id: int) -> None:
+    """Invalidate every cached entry of `empresa_id`. Call after commit."""
+    with _local_versions_lock:
+        _local_versions.set(empresa_id, next(_version_seq))
+    r = shared_redis()
+    if r is None:
+        if time.monotonic() < _redis_down_until:
+            with _pending_lock:
+                _pending_bumps.add(empresa_id)
+        return
+    try:
+        r.incr(_version_key(empresa_id))
+    except Exception as e:
+        logger.warning("Could not bump cache version for empresa %s: %s", empresa_id, e)
+        mark_redis_down()
+        with _pending_lock:
+            _pending_bumps.add(empresa_id)
+
+
+def _local_version(empresa_id: int) -> int:
+    with _local_versions_lock:
+        version = _local_versions.get(empresa_id)
+        if version is None:
+            version = next(_version_seq)
+            _local_versions.set(empresa_id, version)
+        return version
+
+
+def _read(empresa_id: int, namespace: str, key: str):
+    """Look the entry up; returns (hit, value, slot) where `slot` says where to store a miss."""
+    r = shared_redis()
+    if r is not None:
+        entry_key = _entry_key(empresa_id, namespace, key)
+        try:
+            raw_version, raw_entry = r.mget(_version_key(empresa_id), entry_key)
+        except Exception as e:
+            logger.warning("Redis cache unavailable, using in-process cache: %s", e)
+            mark_redis_down()
+        else:
+            version = int(raw_version or 0)
+            if raw_entry is not None:
+                entry = json.loads(raw_entry)
+                if entry.get("v") == version:
+                    stats.incr("hits")
+                    return True, entry["data"], None
+            stats.incr("misses")
+            return False, None, (r, entry_key, version)
+
+    local_key = (namespace, empresa_id, key, _local_version(empresa_id))
+    value = _local_values.get(local_key, _MISSING)
+    if value is not _MISSING:
+        stats.incr("hits")
+        return True, value, None
+    stats.incr("misses")
+    return False, None, (None, local_key, None)
+
+
+def _write(slot, value: Any, ttl: int) -> None:
+    r, key, version = slot
+    if r is None:
+        _local_values.set(key, value, ttl=ttl)
+        return
+    try:
+        r.set(key, json.dumps({"v": version, "data": value}), ex=ttl)
+    except Exception as e:
+        logger.warning("Could not store cache entry %s: %s", key, e)
+        mark_redis_down()
+
+
+def get_or_compute(
+    empresa_id: int,
+    namespace: str,
+    key: str,
+    compute: Callable[[], Any],
+    ttl: int = CACHE_TTL,
+) -> Any:
+    """Return the cached JSON-serializable value or compute and store it."""
+    hit, value, slot = _read(empresa_id, namespace, key)
+    if hit:
+        return value
+    value = compute()
+    _write(slot, value, ttl)
+    return value
+
+
+async def get_or_compute_async(
+    empresa_id: int,
+    namespace: str,
+    key: str,
+    compute: Callable[[], Awaitable[Any]],
+    ttl: int = CACHE_TTL,
+) -> Any:
+    """`get_or_compute` for async handlers: Redis I/O runs in a worker thread.
+
+    redis-py blocks for up to its socket timeout (and retries) when Redis is
+    slow, which must not stall the event loop.
+    """
+    hit, value, slot = await asyncio.to_thread(_read, empresa_id, namespace, key)
+    if hit:
+        return value
+    value = await compute()
+    await asyncio.to_thread(_write, slot, value, ttl)
+    return value
+
+
+async def bump_tenant_version_async(empresa_id: int) -> None:
+    """`bump_tenant_version` off the event loop."""
+    await asyncio.to_thread(bump_tenant_version, empresa_id)
+
+
+def cache_stats() -> Dict[str, Any]:
+    return stats.snapshot()
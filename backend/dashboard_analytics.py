@@ -0,0 +1,194 @@
+"""
+Dashboard analytics queries (`GET /api/dashboard/analytics`).
+
+Two sources produce the same response shape, each in a single round trip:
+- `analytics_from_rollups` (default) reads the per-day `analytics_diario`
+  rollup, so cost depends on the number of days in the range.
+- `analytics_from_raw` aggregates `atendimentos`/`clientes` directly; kept for
+  tenants whose rollups have not been rebuilt yet (ANALYTICS_USE_ROLLUPS=false).
+  One scan per table covers both periods via conditional aggregation.
+"""
+from __future__ import annotations
+
+import os
+from datetime import timedelta
+
+from sqlalchemy import case, func, literal_column, select, union_all
+from sqlalchemy.orm import Session
+
+from backend import models
+from backend.analytics import DateRange, build_metric_change, centavos_to_reais, get_date_range, normalize_period
+
+ANALYTICS_USE_ROLLUPS = os.getenv("ANALYTICS_USE_ROLLUPS", "true").lower().strip() in {"1", "true", "yes", "on"}
+
+
+def compute_dashboard_analytics(db: Session, empresa_id: int, period: str) -> dict:
+    dr = get_date_range(normalize_period(period))
+    if ANALYTICS_USE_ROLLUPS:
+        return analytics_from_rollups(db, empresa_id, dr)
+    return analytics_from_raw(db, empresa_id, dr)
+
+
+def _series_date(value) -> str:
+    return value.isoformat() if hasattr(value, "isoformat") else str(value)
+
+
+def _response(revenue, clients, appointments, revenue_series, clients_series) -> dict:
+    return {
+        "metrics": {
+            "revenue": build_metric_change(centavos_to_reais(revenue[0]), centavos_to_reais(revenue[1])),
+            "clients": build_metric_change(float(clients[0] or 0), float(clients[1] or 0)),
+            "appointments": build_metric_change(float(appointments[0] or 0), float(appointments[1] or 0)),
+        },
+        "revenue_series": revenue_series,
+        "clients_series": clients_series,
+    }
+
+
+def analytics_from_rollups(db: Session, empresa_id: int, dr: DateRange) -> dict:
+    """Analytics from `analytics_diario`.
+
+    The rollup has day granularity, so both periods are widened to whole days:
+    the current period covers start..today inclusive and the previous period
+    covers the days from floor(start_date_previous) up to start_date. Both
+    periods and the series come from one range read over the rollup.
+    """
+    R = models.AnalyticsDiario
+    cur_start = dr.start_date.date()
+    cur_end = dr.end_date.date() + timedelta(days=1)
+    prev_start = dr.start_date_previous.date()
+
+    days = (
+        db.query(R.dia, R.atendimentos, R.receita_centavos, R.novos_clientes)
+        .filter(R.empresa_id == empresa_id, R.dia >= prev_start, R.dia < cur_end)
+        .order_by(R.dia)
+        .all()
+    )
+
+    cur = [0, 0, 0]
+    prev = [0, 0, 0]
+    revenue_series = []
+    clients_series = []
+    for d in days:
+        bucket = cur if d.dia >= cur_start else prev
+        bucket[0] += d.atendimentos or 0
+        bucket[1] += d.receita_centavos or 0
+        bucket[2] += d.novos_clientes or 0
+        if d.dia < cur_start:
+            continue
+        # Same sparsity as the raw queries: only days that actually had activity.
+        if d.atendimentos:
+            revenue_series.append({"date": d.dia.isoformat(), "value": centavos_to_reais(d.receita_centavos)})
+        if d.novos_clientes:
+            clients_series.append({"date": d.dia.isoformat(), "value": int(d.novos_clientes)})
+
+    return _response(
+        revenue=(cur[1], prev[1]),
+        clients=(cur[2], prev[2]),
+        appointments=(cur[0], prev[0]),
+        revenue_series=revenue_series,
+        clients_series=clients_series,
+    )
+
+
+def _conditional_aggregates(dialect: str):
+    """Return (count_if, sum_if) builders.
+
+    PostgreSQL gets `agg(...) FILTER (WHERE ...)`; other dialects (SQLite) get
+    the portable `SUM(CASE WHEN ... END)` form.
+    """
+    if dialect == "postgresql":
+        def count_if(cond, col):
+            return func.count(col).filter(cond)
+
+        def sum_if(cond, col):
+            return func.sum(col).filter(cond)
+    else:
+        def count_if(cond, col):
+            return func.sum(case((cond, 1), else_=0))
+
+        def sum_if(cond, col):
+            return func.sum(case((cond, col), else_=None))
+    return count_if, sum_if
+
+
+def analytics_from_raw(db: Session, empresa_id: int, dr: DateRange) -> dict:
+    """Analytics aggregated directly from `atendimentos` and `clientes`.
+
+    Each table is scanned once over [start_date_previous, end_date), grouped by
+    day with separate current/previous aggregates per row; both scans travel in
+    a single UNION ALL round trip. Period totals are the sum of the per-day
+    buckets, and the current-period buckets double as the series.
+    """
+    A, C = models.Atendimento, models.Cliente
+    dialect = db.bind.dialect.name if db.bind is not None else ""
+    count_if, sum_if = _conditional_aggregates(dialect)
+
+    appt_day = func.date(A.data_atendimento)
+    appt_cur = A.data_atendimento >= dr.start_date
+    appt_prev = A.data_atendimento < dr.start_date
+    appts = (
+        select(
+            literal_column("0").label("kind"),
+            appt_day.label("dia"),
+            count_if(appt_cur, A.id).label("cur_count"),
+            sum_if(appt_cur, A.valor_centavos).label("cur_revenue"),
+            count_if(appt_prev, A.id).label("prev_count"),
+            sum_if(appt_prev, A.valor_centavos).label("prev_revenue"),
+        )
+        .where(
+            A.empresa_id == empresa_id,
+            A.data_atendimento >= dr.start_date_previous,
+            A.data_atendimento < dr.end_date,
+        )
+        .group_by(appt_day)
+    )
+
+    client_day = func.date(C.data_primeiro_contato)
+    client_cur = C.data_primeiro_contato >= dr.start_date
+    client_prev = C.data_primeiro_contato < dr.start_date
+    clients = (
+        select(
+            literal_column("1").label("kind"),
+            client_day.label("dia"),
+            count_if(client_cur, C.id).label("cur_count"),
+            literal_column("0").label("cur_revenue"),
+            count_if(client_prev, C.id).label("prev_count"),
+            literal_column("0").label("prev_revenue"),
+        )
+        .where(
+            C.empresa_id == empresa_id,
+            C.data_primeiro_contato >= dr.start_date_previous,
+            C.data_primeiro_contato < dr.end_date,
+        )
+        .group_by(client_day)
+    )
+
+    rows = db.execute(union_all(appts, clients).order_by("kind", "dia")).all()
+
+    appt_totals = [0, 0, 0, 0]  # cur_count, cur_revenue, prev_count, prev_revenue
+    client_totals = [0, 0]  # cur_count, prev_count
+    revenue_series = []
+    clients_series = []
+    for r in rows:
+        cur_count = int(r.cur_count or 0)
+        if r.kind == 0:
+            appt_totals[0] += cur_count
+            appt_totals[1] += int(r.cur_revenue or 0)
+            appt_totals[2] += int(r.prev_count or 0)
+            appt_totals[3] += int(r.prev_revenue or 0)
+            if cur_count:
+                revenue_series.append({"date": _series_date(r.dia), "value": centavos_to_reais(r.cur_revenue)})
+        else:
+            client_totals[0] += cur_count
+            client_totals[1] += int(r.prev_count or 0)
+            if cur_count:
+                clients_series.append({"date": _series_date(r.dia), "value": cur_count})
+
+    return _response(
+        revenue=(appt_totals[1], appt_totals[3]),
+        clients=(client_totals[0], client_totals[1]),
+        appointments=(appt_totals[0], appt_totals[2]),
+        revenue_series=revenue_series,
+        clients_series=clients_series,
+    )
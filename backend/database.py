@@ -85,7 +85,10 @@ def create_tenant_schema(schema_name: str):
 
 # Dependência para obter sessão do banco de dados
 def get_db(schema: str = None):
-    db = SessionLocal()
+    # A fresh Session per request, not the thread-local one: FastAPI runs the
+    # dependency and the endpoint on arbitrary threadpool threads, so the
+    # scoped registry would hand one Session to concurrent requests.
+    db = SessionLocal.session_factory()
     dialect = db.bind.dialect.name if db.bind is not None else ""
     if schema and dialect == "postgresql":
         db.execute(text(f"SET search_path TO {schema}, public"))
@@ -100,3 +103,82 @@ def get_db(schema: str = None):
             except Exception:
                 pass
         db.close()
+
+
+# ===== Async engine (opt-in, see ASYNC_DB_ROUTES in backend/main.py) =====
+# Async routes wait on the database in the event loop instead of holding one
+# of anyio's worker threads. The engine is created on first use so the async
+# drivers (asyncpg / aiosqlite) are only required when the routes are enabled.
+def _async_url(url: str) -> str:
+    for sync_prefix, async_prefix in (
+        ("postgresql+psycopg2://", "postgresql+asyncpg://"),
+        ("postgresql://", "postgresql+asyncpg://"),
+        ("sqlite://", "sqlite+aiosqlite://"),
+    ):
+        if url.startswith(sync_prefix):
+            return async_prefix + url[len(sync_prefix):]
+    return url
+
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or _async_url(SQLALCHEMY_DATABASE_URL or "")
+_async_engine = None
+_async_session_factory = None
+
+
+def get_async_engine():
+    global _async_engine
+    if _async_engine is None:
+        from sqlalchemy.ext.asyncio import create_async_engine
+
+        async_connect_args = {}
+        async_engine_kwargs = {"echo": False}
+        if ASYNC_DATABASE_URL.startswith("postgresql"):
+            async_connect_args = {"timeout": int(os.getenv("DB_CONNECT_TIMEOUT", "5"))}
+            async_engine_kwargs.update({
+                "pool_pre_ping": True,
+                "pool_size": int(os.getenv("DB_POOL_SIZE", "5")),
+                "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "10")),
+            })
+        _async_engine = create_async_engine(ASYNC_DATABASE_URL, connect_args=async_connect_args, **async_engine_kwargs)
+    return _async_engine
+
+
+def AsyncSessionLocal():
+    """New AsyncSession. expire_on_commit=False: attributes can't lazy-load in async code."""
+    global _async_session_factory
+    if _async_session_factory is None:
+        from sqlalchemy.ext.asyncio import async_sessionmaker
+
+        _async_session_factory = async_sessionmaker(get_async_engine(), autoflush=False, expire_on_commit=False)
+    return _async_session_factory()
+
+
+# Dependência async equivalente a get_db
+async def get_async_db():
+    db = AsyncSessionLocal()
+    dialect = db.bind.dialect.name if db.bind is not None else ""
+    try:
+        yield db
+    finally:
+        if dialect == "postgresql":
+            try:
+                await db.execute(text("RESET search_path"))
+            except Exception:
+                pass
+        await db.close()
+
+
+def dialect_insert(db):
+    """Return the dialect `insert` construct supporting ON CONFLICT upserts.
+
+    Both supported backends (PostgreSQL and SQLite) expose the same
+    `on_conflict_do_update` / `on_conflict_do_nothing` API.
+    """
+    dialect = db.bind.dialect.name if db.bind is not None else ""
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise RuntimeError(f"Upsert not supported for dialect {dialect!r}")
+    return insert
@@ -1,11 +1,27 @@
 from fastapi import Depends, Request
 from sqlalchemy.orm import Session
-from backend.database import get_db
-from backend import auth, models
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend.database import get_async_db, get_db
+from backend import auth, empresa_cache
+from backend.empresa_cache import EmpresaSnapshot
 
 
-def require_authenticated_empresa(token: str = Depends(auth.oauth2_scheme), db: Session = Depends(get_db)) -> models.Empresa:
-    empresa = auth.get_current_empresa_jwt(token, db)
+def require_authenticated_empresa(
+    token: str = Depends(auth.oauth2_scheme),
+    db: Session = Depends(get_db),
+    request: Request = None,
+) -> EmpresaSnapshot:
+    """Resolve the JWT's empresa through empresa_cache (no DB hit when cached).
+
+    Reuses the claims JWTClaimsMiddleware already verified for this token.
+    Returns a read-only snapshot; load `models.Empresa` explicitly to modify it.
+    """
+    claims = None
+    if request is not None and getattr(request.state, "jwt_token", None) == token:
+        claims = request.state.jwt_claims
+    empresa = empresa_cache.get_empresa(db, auth.empresa_id_from_token(token, claims))
+    if empresa is None:
+        raise auth.credentials_exception()
     return empresa
 
 
@@ -20,3 +36,31 @@ def get_tenant_db(request: Request, db: Session = Depends(get_db)):
     if schema and dialect == "postgresql":
         db.execute(text(f"SET search_path TO {schema}, public"))
     yield db
+
+
+async def require_authenticated_empresa_async(
+    token: str = Depends(auth.oauth2_scheme),
+    db: AsyncSession = Depends(get_async_db),
+    request: Request = None,
+) -> EmpresaSnapshot:
+    """Async twin of require_authenticated_empresa (same cache, same claims)."""
+    claims = None
+    if request is not None and getattr(request.state, "jwt_token", None) == token:
+        claims = request.state.jwt_claims
+    empresa_id = auth.empresa_id_from_token(token, claims)
+    empresa = await empresa_cache.get_empresa_async(db, empresa_id)
+    if empresa is None:
+        raise auth.credentials_exception()
+    return empresa
+
+
+async def get_async_tenant_db(request: Request, db: AsyncSession = Depends(get_async_db)):
+    """Async twin of get_tenant_db."""
+    from sqlalchemy import text
+    schema = None
+    if hasattr(request.state, "empresa_id") and request.state.empresa_id:
+        schema = f"empresa_{request.state.empresa_id}"
+    dialect = db.bind.dialect.name if db.bind is not None else ""
+    if schema and dialect == "postgresql":
+        await db.execute(text(f"SET search_path TO {schema}, public"))
+    yield db
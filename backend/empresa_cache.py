@@ -0,0 +1,161 @@
+"""
+Cached resolution of the authenticated empresa.
+
+`require_authenticated_empresa` used to load the full Empresa row on every
+request even though the JWT already names the tenant. Requests only need a
+handful of fields, so those are kept as an immutable `EmpresaSnapshot` in a
+two-level cache:
+
+- L1: bounded in-process LRU with a short TTL (a dictionary lookup);
+- L2: Redis (`empresa:{id}`), shared by every worker.
+
+Commits that change a cached field invalidate both levels (see the session
+hooks at the bottom). Other workers' L1 entries expire within
+`EMPRESA_CACHE_LOCAL_TTL_SECONDS`.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+from dataclasses import asdict, dataclass, fields
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from backend import models
+from backend.cache import LocalTTLCache, mark_redis_down, shared_redis
+
+logger = logging.getLogger("clientflow.empresa_cache")
+
+LOCAL_TTL = float(os.getenv("EMPRESA_CACHE_LOCAL_TTL_SECONDS", "30"))
+REDIS_TTL = int(os.getenv("EMPRESA_CACHE_REDIS_TTL_SECONDS", "600"))
+LOCAL_SIZE = int(os.getenv("EMPRESA_CACHE_SIZE", "4096"))
+
+
+@dataclass(frozen=True)
+class EmpresaSnapshot:
+    """The Empresa fields authenticated requests rely on (EmpresaOut + limits)."""
+    id: int
+    nome_empresa: str
+    nicho: str
+    email_login: str
+    telefone: Optional[str] = None
+    tipo_empresa: Optional[str] = None
+    plano_empresa: Optional[str] = None
+    limite_clientes: Optional[int] = None
+    limite_atendimentos: Optional[int] = None
+    ativo: Optional[int] = None
+
+
+_FIELDS = tuple(f.name for f in fields(EmpresaSnapshot))
+_local = LocalTTLCache(maxsize=LOCAL_SIZE, ttl=LOCAL_TTL)
+
+
+def _redis_key(empresa_id: int) -> str:
+    return f"empresa:{empresa_id}"
+
+
+def _cached(empresa_id: int) -> Optional[EmpresaSnapshot]:
+    snapshot = _local.get(empresa_id)
+    if snapshot is not None:
+        return snapshot
+    r = shared_redis()
+    if r is None:
+        return None
+    try:
+        raw = r.get(_redis_key(empresa_id))
+    except Exception as e:
+        logger.warning("Redis unavailable for empresa cache: %s", e)
+        mark_redis_down()
+        return None
+    if raw is None:
+        return None
+    snapshot = EmpresaSnapshot(**json.loads(raw))
+    _local.set(empresa_id, snapshot)
+    return snapshot
+
+
+def _load(db: Session, empresa_id: int) -> Optional[EmpresaSnapshot]:
+    row = (
+        db.query(*[getattr(models.Empresa, f) for f in _FIELDS])
+        .filter(models.Empresa.id == empresa_id)
+        .first()
+    )
+    return EmpresaSnapshot(**dict(zip(_FIELDS, row))) if row is not None else None
+
+
+def _remember(snapshot: EmpresaSnapshot) -> None:
+    _local.set(snapshot.id, snapshot)
+    r = shared_redis()
+    if r is None:
+        return
+    try:
+        r.set(_redis_key(snapshot.id), json.dumps(asdict(snapshot)), ex=REDIS_TTL)
+    except Exception as e:
+        logger.warning("Could not store empresa %s in Redis: %s", snapshot.id, e)
+        mark_redis_down()
+
+
+def get_empresa(db: Session, empresa_id: int) -> Optional[EmpresaSnapshot]:
+    """Return the snapshot for `empresa_id` (None if the empresa does not exist)."""
+    snapshot = _cached(empresa_id)
+    if snapshot is not None:
+        return snapshot
+    snapshot = _load(db, empresa_id)
+    if snapshot is not None:
+        _remember(snapshot)
+    return snapshot
+
+
+async def get_empresa_async(db: AsyncSession, empresa_id: int) -> Optional[EmpresaSnapshot]:
+    """`get_empresa` for async handlers; Redis calls run in a worker thread."""
+    snapshot = _local.get(empresa_id)
+    if snapshot is None:
+        snapshot = await asyncio.to_thread(_cached, empresa_id)
+    if snapshot is not None:
+        return snapshot
+    snapshot = await db.run_sync(lambda session: _load(session, empresa_id))
+    if snapshot is not None:
+        await asyncio.to_thread(_remember, snapshot)
+    return snapshot
+
+
+def invalidate_empresa(empresa_id: int) -> None:
+    _local.delete(empresa_id)
+    r = shared_redis()
+    if r is None:
+        return
+    try:
+        r.delete(_redis_key(empresa_id))
+    except Exception as e:
+        logger.warning("Could not invalidate empresa %s in Redis: %s", empresa_id, e)
+        mark_redis_down()
+
+
+# Invalidate after commit (not at flush) so a concurrent request cannot re-cache
+# the old row between the UPDATE and the COMMIT.
+_PENDING_KEY = "empresa_cache_invalidate"
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changed_empresas(session, _flush_context):
+    pending = session.info.setdefault(_PENDING_KEY, set())
+    for obj in list(session.dirty) + list(session.deleted):
+        if isinstance(obj, models.Empresa) and obj.id is not None:
+            if obj in session.deleted or session.is_modified(obj, include_collections=False):
+                pending.add(obj.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_empresas(session):
+    for empresa_id in session.info.pop(_PENDING_KEY, ()):
+        invalidate_empresa(empresa_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending_invalidations(session):
+    session.info.pop(_PENDING_KEY, None)
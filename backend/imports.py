@@ -0,0 +1,156 @@
+"""
+Bulk CSV import of clientes.
+
+The upload is read row by row and processed in chunks of `IMPORT_CHUNK_SIZE`.
+Per chunk there is one `telefone IN (...)` query for duplicates, one quota
+reservation, one multi-row INSERT (SQLAlchemy "insertmanyvalues" batching)
+and one commit, instead of five statements and a commit per cliente.
+The tenant cache version is bumped once, after the last chunk (or the
+error that stopped the import) whenever anything was committed.
+"""
+from __future__ import annotations
+
+import csv
+import io
+from datetime import datetime, timezone
+from typing import IO, Dict, List
+
+from fastapi import HTTPException, status
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from backend import cache, models, rollups
+from backend.plan_limits import reserve_quota
+from backend.schemas import ClienteCreate
+
+IMPORT_CHUNK_SIZE = 1000
+REQUIRED_COLUMNS = ("nome", "telefone")
+DUPLICATE_MESSAGE = "Cliente já cadastrado com este telefone."
+LIMIT_MESSAGE = "Limite do plano atingido."
+
+
+def _validation_message(exc: ValidationError) -> str:
+    err = exc.errors()[0]
+    field = ".".join(str(p) for p in err.get("loc", ()))
+    return f"{field}: {err.get('msg')}" if field else str(err.get("msg"))
+
+
+def _invalid_csv(exc: Exception, importados: int) -> HTTPException:
+    # Chunks before the bad line are already committed; say how many.
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail=f"CSV inválido ({exc.__class__.__name__}); envie em UTF-8. Clientes já importados: {importados}.",
+    )
+
+
+def importar_clientes_csv(db: Session, empresa, upload: IO[bytes]) -> Dict:
+    """Import clientes from a CSV upload (columns: nome, telefone[, anotacoes_rapidas]).
+
+    Rows are validated with `ClienteCreate`. Duplicates (already stored or
+    repeated in the file) and rows beyond the plan limit are skipped and
+    reported. Each chunk commits on its own, so a large file is never held
+    in one transaction. Returns ``{"importados", "ignorados", "erros"}``
+    where each error is ``{"linha", "erro"}`` (``linha`` counts the header
+    as line 1).
+    """
+    reader = csv.DictReader(io.TextIOWrapper(upload, encoding="utf-8-sig", newline=""))
+    try:
+        header = [c.strip().lower() for c in (reader.fieldnames or [])]
+    except (UnicodeDecodeError, csv.Error) as exc:
+        raise _invalid_csv(exc, 0)
+    missing = [c for c in REQUIRED_COLUMNS if c not in header]
+    if missing:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"CSV sem as colunas obrigatórias: {', '.join(missing)}",
+        )
+    reader.fieldnames = header
+
+    report = {"importados": 0, "ignorados": 0, "erros": []}
+    try:
+        _import_rows(db, empresa, reader, report)
+    finally:
+        # Chunks committed before a decode error stay, so the tenant's cached
+        # listings / dashboards are stale either way.
+        if report["importados"]:
+            cache.bump_tenant_version(empresa.id)
+
+    report["ignorados"] = len(report["erros"])
+    report["erros"].sort(key=lambda e: e["linha"])
+    return report
+
+
+def _import_rows(db: Session, empresa, reader: csv.DictReader, report: Dict) -> None:
+    seen = set()
+    chunk: List[tuple] = []
+    rows = enumerate(reader, start=2)
+    while True:
+        try:
+            linha, row = next(rows)
+        except StopIteration:
+            break
+        except (UnicodeDecodeError, csv.Error) as exc:
+            raise _invalid_csv(exc, report["importados"])
+        try:
+            cliente = ClienteCreate(
+                nome=row.get("nome") or "",
+                telefone=(row.get("telefone") or "").strip(),
+                anotacoes_rapidas=row.get("anotacoes_rapidas") or "",
+            )
+        except ValidationError as exc:
+            report["erros"].append({"linha": linha, "erro": _validation_message(exc)})
+            continue
+        if cliente.telefone in seen:
+            report["erros"].append({"linha": linha, "erro": DUPLICATE_MESSAGE})
+            continue
+        seen.add(cliente.telefone)
+        chunk.append((linha, cliente))
+        if len(chunk) >= IMPORT_CHUNK_SIZE:
+            _import_chunk(db, empresa, chunk, report)
+            chunk = []
+    if chunk:
+        _import_chunk(db, empresa, chunk, report)
+
+
+def _import_chunk(db: Session, empresa, chunk: List[tuple], report: Dict) -> None:
+    telefones = [cliente.telefone for _linha, cliente in chunk]
+    existentes = {
+        telefone
+        for (telefone,) in db.query(models.Cliente.telefone).filter(
+            models.Cliente.empresa_id == empresa.id,
+            models.Cliente.telefone.in_(telefones),
+        )
+    }
+    novos = []
+    for linha, cliente in chunk:
+        if cliente.telefone in existentes:
+            report["erros"].append({"linha": linha, "erro": DUPLICATE_MESSAGE})
+        else:
+            novos.append((linha, cliente))
+
+    permitidos = reserve_quota(empresa, "clientes", db, len(novos))
+    for linha, _cliente in novos[permitidos:]:
+        report["erros"].append({"linha": linha, "erro": LIMIT_MESSAGE})
+    novos = novos[:permitidos]
+    if not novos:
+        db.commit()
+        return
+
+    agora = datetime.now(timezone.utc)
+    db.execute(
+        insert(models.Cliente),
+        [
+            {
+                "empresa_id": empresa.id,
+                "nome": cliente.nome,
+                "telefone": cliente.telefone,
+                "anotacoes_rapidas": cliente.anotacoes_rapidas,
+                "data_primeiro_contato": agora,
+            }
+            for _linha, cliente in novos
+        ],
+    )
+    rollups.registrar(db, empresa.id, agora.date(), novos_clientes=len(novos))
+    db.commit()
+    report["importados"] += len(novos)
@@ -6,10 +6,10 @@
 
 import logging
 import os
-import re
 from contextlib import asynccontextmanager
 from pathlib import Path
-from fastapi import FastAPI, Request, Depends, Query
+from fastapi import FastAPI, Depends, Query
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from fastapi.staticfiles import StaticFiles
@@ -19,35 +19,13 @@ from datetime import datetime, timedelta
 
 # Routers e módulos
 from backend.routers import empresa, clientes, atendimentos, public, dashboard
-from backend import models, database, ai_module
+from backend import models, database, ai_context, ai_module, cache, dashboard_analytics, passwords
+from backend.analytics import normalize_period
 from backend.dependencies import require_authenticated_empresa, get_tenant_db
+from backend.middleware import JWTClaimsMiddleware
+from backend.empresa_cache import EmpresaSnapshot
 from backend import auth
 from backend.schemas import PerguntaIA
-from backend.analytics import get_date_range, build_metric_change, normalize_period
-
-
-def _parse_brl_number(value) -> float:
-    if value is None:
-        return 0.0
-    if isinstance(value, (int, float)):
-        return float(value)
-    raw = str(value).strip()
-    if not raw:
-        return 0.0
-    raw = raw.replace("R$", "").strip()
-    raw = re.sub(r"[^0-9,\.\-]", "", raw)
-    if not raw or raw == "-":
-        return 0.0
-
-    if "," in raw and "." in raw:
-        raw = raw.replace(".", "").replace(",", ".")
-    elif "," in raw:
-        raw = raw.replace(",", ".")
-
-    try:
-        return float(raw)
-    except ValueError:
-        return 0.0
 
 
 def _period_key(raw: Optional[str]) -> str:
@@ -159,6 +137,7 @@ async def lifespan(application: FastAPI):
         # Do NOT raise - let app run even if migrations fail
         # This prevents Railway 502 errors from startup failures
     yield
+    passwords.shutdown()
 
 
 # Instância FastAPI
@@ -321,6 +300,18 @@ def _run_startup_migrations_if_needed() -> None:
 # models.Base.metadata.create_all(bind=database.engine)
 
 # ===== REGISTER ALL ROUTERS =====
+# ASYNC_DB_ROUTES=true serves the hot endpoints (auth, list/create, analytics)
+# from async handlers on the async engine. They are registered first, so they
+# shadow the sync handlers for the same paths; everything else stays sync.
+async_db_routes = os.getenv("ASYNC_DB_ROUTES", "false").lower().strip() in {"1", "true", "yes", "on"}
+if async_db_routes:
+    from backend.routers import atendimentos_async, clientes_async, dashboard_async, empresa_async
+
+    app.include_router(empresa_async.router)
+    app.include_router(clientes_async.router)
+    app.include_router(atendimentos_async.router)
+    app.include_router(dashboard_async.router)
+    logger.info("Async DB routes enabled")
 app.include_router(empresa.router)
 app.include_router(clientes.router)
 app.include_router(atendimentos.router)
@@ -341,24 +332,8 @@ def readiness():
     """Kubernetes/Railway-style readiness probe (no DB check)"""
     return {"ready": True, "timestamp": datetime.now().isoformat()}
 
-# Middleware para injetar empresa_id do JWT
-@app.middleware("http")
-async def inject_empresa_id_jwt(request: Request, call_next):
-    """Extract empresa_id from JWT and inject into request state."""
-    auth_header = request.headers.get("authorization")
-    if auth_header and auth_header.lower().startswith("bearer "):
-        token = auth_header.split()[1]
-        try:
-            from backend.auth import jwt, SECRET_KEY, ALGORITHM
-            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-            empresa_id = payload.get("sub")
-            if empresa_id:
-                request.state.empresa_id = empresa_id
-        except Exception as err:
-            logger.debug(f"JWT parsing failed (expected for public endpoints): {type(err).__name__}")
-            # Do NOT fail - public endpoints don't need JWT
-    response = await call_next(request)
-    return response
+# Middleware para injetar empresa_id do JWT (ASGI puro, decodifica uma vez)
+app.add_middleware(JWTClaimsMiddleware)
 
 # Health check endpoints
 @app.get("/health")
@@ -379,29 +354,37 @@ def api_health():
     return {"status": "ok", "version": "1.0.0"}
 
 # Assistente IA Interno
+def _contexto_ia(token: Optional[str], empresa, db: Session, tenant_db: Session) -> Optional[str]:
+    """Prompt context for /ia/perguntar; None when `token` names an unknown empresa."""
+    if token:
+        payload = auth.decode_access_token(token)
+        if payload:
+            empresa_id = payload.get("sub")
+            if empresa_id:
+                empresa = db.query(models.Empresa).filter(models.Empresa.id == empresa_id).first()
+                if not empresa:
+                    return None
+        from sqlalchemy import text
+        tenant_db.execute(text(f"SET search_path TO empresa_{empresa.id}, public"))
+    # Bounded SQL summary (cached per tenant) instead of every row.
+    return ai_context.contexto_empresa(tenant_db, empresa.id)
+
+
 @app.post("/ia/perguntar")
-def ia_perguntar(
+async def ia_perguntar(
     body: PerguntaIA,
     token: Optional[str] = Query(None),
-    empresa: models.Empresa = Depends(require_authenticated_empresa),
+    empresa: EmpresaSnapshot = Depends(require_authenticated_empresa),
     db: Session = Depends(database.get_db),
     tenant_db: Session = Depends(get_tenant_db)
 ):
+    # Async so a slow provider only holds a coroutine (with a timeout), not a
+    # worker thread; the sync DB part runs in the threadpool.
     try:
-        if token:
-            payload = auth.decode_access_token(token)
-            if payload:
-                empresa_id = payload.get("sub")
-                if empresa_id:
-                    empresa = db.query(models.Empresa).filter(models.Empresa.id == empresa_id).first()
-                    if not empresa:
-                        return JSONResponse(status_code=401, content={"error": "Empresa não encontrada"})
-            from sqlalchemy import text
-            tenant_db.execute(text(f"SET search_path TO empresa_{empresa.id}, public"))
-        clients = tenant_db.query(models.Cliente).filter(models.Cliente.empresa_id == empresa.id).all()
-        atendimentos = tenant_db.query(models.Atendimento).filter(models.Atendimento.empresa_id == empresa.id).all()
-        contexto = f"Clients: {[c.nome for c in clients]}\nAtendimentos: {len(atendimentos)}"
-        resposta = ai_module.responder_pergunta(body.pergunta, contexto)
+        contexto = await run_in_threadpool(_contexto_ia, token, empresa, db, tenant_db)
+        if contexto is None:
+            return JSONResponse(status_code=401, content={"error": "Empresa não encontrada"})
+        resposta = await ai_module.responder_pergunta_async(body.pergunta, contexto)
         return {"resposta": resposta}
     except Exception as e:
         return JSONResponse(status_code=500, content={"error": str(e)})
@@ -410,7 +393,7 @@ def ia_perguntar(
 @app.get("/api/dashboard/analytics")
 def obter_dashboard_analytics(
     period: str = Query("7d"),
-    empresa: models.Empresa = Depends(require_authenticated_empresa),
+    empresa: EmpresaSnapshot = Depends(require_authenticated_empresa),
     tenant_db: Session = Depends(get_tenant_db),
 ):
     """Professional analytics endpoint for the premium dashboard.
@@ -420,131 +403,18 @@ def obter_dashboard_analytics(
     - Never trusts empresa_id from the frontend
 
     Performance:
-    - Uses aggregated SQL queries (no N+1)
-    - Groups series by day
+    - Reads the per-day `analytics_diario` rollup (cost scales with days in
+      the range, not rows); see backend/dashboard_analytics.py
+    - Cached per (empresa, period, data version); writes bump the version
     """
-    from sqlalchemy import func, case, cast
-    from sqlalchemy.types import Numeric
-
     period_key = normalize_period(period)
-    dr = get_date_range(period_key)
-
-    dialect = tenant_db.bind.dialect.name if tenant_db.bind is not None else ""
-
-    def revenue_expr(col):
-        # Atendimento.valor_cobrado is a string; normalize to numeric at SQL-level.
-        # Handles common formats:
-        # - "1234.56" (decimal '.')
-        # - "1.234,56" (thousands '.', decimal ',')
-        # - "1234,56" (decimal ',')
-        cleaned = func.regexp_replace(col, r"[^0-9,\.\-]", "", "g") if dialect == "postgresql" else col
-        if dialect == "postgresql":
-            has_comma = func.strpos(cleaned, ",") > 0
-            normalized = case(
-                (has_comma, func.replace(func.replace(cleaned, ".", ""), ",", ".")),
-                else_=cleaned,
-            )
-            return cast(normalized, Numeric)
-
-        # Fallback for non-Postgres dialects: try a simple replace and cast.
-        normalized = func.replace(cleaned, ",", ".")
-        return cast(normalized, Numeric)
-
-    revenue_col = revenue_expr(models.Atendimento.valor_cobrado)
-
-    # Appointments + revenue (current)
-    appt_current_count, appt_current_revenue = tenant_db.query(
-        func.count(models.Atendimento.id),
-        func.coalesce(func.sum(revenue_col), 0),
-    ).filter(
-        models.Atendimento.empresa_id == empresa.id,
-        models.Atendimento.data_atendimento >= dr.start_date,
-        models.Atendimento.data_atendimento < dr.end_date,
-    ).one()
-
-    # Appointments + revenue (previous)
-    appt_prev_count, appt_prev_revenue = tenant_db.query(
-        func.count(models.Atendimento.id),
-        func.coalesce(func.sum(revenue_col), 0),
-    ).filter(
-        models.Atendimento.empresa_id == empresa.id,
-        models.Atendimento.data_atendimento >= dr.start_date_previous,
-        models.Atendimento.data_atendimento < dr.end_date_previous,
-    ).one()
-
-    # New clients (current/previous)
-    clients_current = tenant_db.query(func.count(models.Cliente.id)).filter(
-        models.Cliente.empresa_id == empresa.id,
-        models.Cliente.data_primeiro_contato >= dr.start_date,
-        models.Cliente.data_primeiro_contato < dr.end_date,
-    ).scalar() or 0
-
-    clients_previous = tenant_db.query(func.count(models.Cliente.id)).filter(
-        models.Cliente.empresa_id == empresa.id,
-        models.Cliente.data_primeiro_contato >= dr.start_date_previous,
-        models.Cliente.data_primeiro_contato < dr.end_date_previous,
-    ).scalar() or 0
-
-    # Revenue series by day
-    appt_date = func.date(models.Atendimento.data_atendimento)
-    revenue_series_rows = (
-        tenant_db.query(
-            appt_date.label("date"),
-            func.coalesce(func.sum(revenue_col), 0).label("value"),
-        )
-        .filter(
-            models.Atendimento.empresa_id == empresa.id,
-            models.Atendimento.data_atendimento >= dr.start_date,
-            models.Atendimento.data_atendimento < dr.end_date,
-        )
-        .group_by(appt_date)
-        .order_by(appt_date)
-        .all()
+    return cache.get_or_compute(
+        empresa.id,
+        "analytics",
+        period_key,
+        lambda: dashboard_analytics.compute_dashboard_analytics(tenant_db, empresa.id, period_key),
     )
 
-    revenue_series = [
-        {
-            "date": (r.date.isoformat() if hasattr(r.date, "isoformat") else str(r.date)),
-            "value": float(r.value or 0),
-        }
-        for r in revenue_series_rows
-    ]
-
-    # New clients series by day
-    client_date = func.date(models.Cliente.data_primeiro_contato)
-    clients_series_rows = (
-        tenant_db.query(
-            client_date.label("date"),
-            func.count(models.Cliente.id).label("value"),
-        )
-        .filter(
-            models.Cliente.empresa_id == empresa.id,
-            models.Cliente.data_primeiro_contato >= dr.start_date,
-            models.Cliente.data_primeiro_contato < dr.end_date,
-        )
-        .group_by(client_date)
-        .order_by(client_date)
-        .all()
-    )
-
-    clients_series = [
-        {
-            "date": (r.date.isoformat() if hasattr(r.date, "isoformat") else str(r.date)),
-            "value": int(r.value or 0),
-        }
-        for r in clients_series_rows
-    ]
-
-    return {
-        "metrics": {
-            "revenue": build_metric_change(float(appt_current_revenue or 0), float(appt_prev_revenue or 0)),
-            "clients": build_metric_change(float(clients_current), float(clients_previous)),
-            "appointments": build_metric_change(float(appt_current_count), float(appt_prev_count)),
-        },
-        "revenue_series": revenue_series,
-        "clients_series": clients_series,
-    }
-
 # Rota raiz
 @app.get("/")
 def root():
@@ -575,6 +445,7 @@ def status():
             "environment": service_env,
             "commit_sha": commit_sha,
             "build_time": build_time,
+            "ai_cache": ai_module.cache_stats(),
         }
     except Exception as e:
         logger.warning(f"Status check - DB connection issue: {e}")
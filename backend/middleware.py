@@ -0,0 +1,47 @@
+"""
+Raw ASGI middleware.
+
+`@app.middleware("http")` wraps every request in BaseHTTPMiddleware, which
+adds a task and a memory stream per request. This runs in the request's own
+coroutine and only touches the scope.
+"""
+from __future__ import annotations
+
+from typing import Optional
+
+from backend import auth
+
+
+def _bearer_token(scope) -> Optional[str]:
+    for name, value in scope.get("headers", ()):
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            if scheme.lower() == "bearer" and token.strip():
+                return token.strip()
+            return None
+    return None
+
+
+class JWTClaimsMiddleware:
+    """Verify the bearer JWT once and expose it on `request.state`.
+
+    Sets `jwt_token`, `jwt_claims` and `empresa_id` when the token is valid.
+    Invalid or missing tokens are ignored here (public routes must keep
+    working); protected routes reject them in `require_authenticated_empresa`,
+    which reuses `jwt_claims` instead of decoding again.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            token = _bearer_token(scope)
+            claims = auth.decode_claims(token) if token else None
+            if claims:
+                state = scope.setdefault("state", {})
+                state["jwt_token"] = token
+                state["jwt_claims"] = claims
+                if claims.get("sub"):
+                    state["empresa_id"] = claims["sub"]
+        await self.app(scope, receive, send)
@@ -2,10 +2,11 @@
 """
 Modelos do banco de dados representando empresas, clientes e atendimentos
 """
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text
-from sqlalchemy.orm import relationship, declared_attr
+from sqlalchemy import Column, Integer, BigInteger, String, Date, DateTime, ForeignKey, Text, Index
+from sqlalchemy.orm import relationship, declared_attr, validates
 from datetime import datetime, timezone
 from backend.database import Base
+from backend.analytics import brl_to_centavos
 
 # Constantes de configuração de relacionamentos
 CASCADE_DELETE_ORPHAN = "all, delete-orphan"
@@ -101,6 +102,9 @@ class Atendimento(BaseModel):
     status_atendimento = Column(String, default="Novo")
     descricao_servico = Column(Text)
     valor_cobrado = Column(String)
+    # Numeric mirror of valor_cobrado, kept in sync on write so revenue can be
+    # aggregated with a plain SUM instead of parsing strings per row.
+    valor_centavos = Column(Integer, nullable=True)
     forma_pagamento = Column(String)
     funcionario_responsavel = Column(String)
     duracao_servico = Column(String)
@@ -112,3 +116,73 @@ class Atendimento(BaseModel):
     data_atendimento = Column(DateTime, default=lambda: datetime.now(timezone.utc))
     empresa = relationship("Empresa", back_populates="atendimentos")
     cliente = relationship("Cliente", back_populates="atendimentos")
+
+    @validates("valor_cobrado")
+    def _sync_valor_centavos(self, _key, value):
+        self.valor_centavos = brl_to_centavos(value)
+        return value
+
+
+class AnalyticsDiario(BaseModel):
+    """Per-empresa daily rollup feeding the dashboard analytics.
+
+    Maintained incrementally by backend.rollups on every write; rebuild history
+    with `python scripts/rebuild_rollups.py`.
+    """
+    __tablename__ = "analytics_diario"
+    empresa_id = Column(Integer, ForeignKey(EMPRESA_FK), primary_key=True)
+    dia = Column(Date, primary_key=True)
+    atendimentos = Column(Integer, nullable=False, default=0)
+    receita_centavos = Column(BigInteger, nullable=False, default=0)
+    novos_clientes = Column(Integer, nullable=False, default=0)
+
+
+class UsoEmpresa(BaseModel):
+    """Per-empresa usage counters backing the plan limit checks.
+
+    Incremented by backend.plan_limits in the same transaction as the insert;
+    `reconcile_usage` recounts from the source tables.
+    """
+    __tablename__ = "uso_empresa"
+    empresa_id = Column(Integer, ForeignKey(EMPRESA_FK), primary_key=True)
+    total_clientes = Column(Integer, nullable=False, default=0)
+    total_atendimentos = Column(Integer, nullable=False, default=0)
+
+
+class ClienteReclassificar(BaseModel):
+    """Queue of clientes whose classification is stale (new atendimentos).
+
+    Marked by backend.reclassificacao on atendimento writes and drained in
+    batches by the worker (`python -m backend.worker`).
+    """
+    __tablename__ = "clientes_reclassificar"
+    cliente_id = Column(Integer, ForeignKey(CLIENTE_FK, ondelete="CASCADE"), primary_key=True)
+    empresa_id = Column(Integer, ForeignKey(EMPRESA_FK), nullable=False)
+    marcado_em = Column(DateTime, nullable=False, default=lambda: datetime.now(timezone.utc))
+
+
+class TarefaExecucao(BaseModel):
+    """Last successful run of each periodic worker job."""
+    __tablename__ = "tarefas_execucao"
+    nome = Column(String, primary_key=True)
+    ultima_execucao = Column(DateTime, nullable=False)
+
+
+# Composite tenant-scoped indexes for the hot query paths: list endpoints,
+# dashboard analytics (empresa + date range), phone dedupe on cliente creation
+# and per-cliente history. Mirrored by alembic revision 002.
+Index("ix_atendimentos_empresa_data", Atendimento.empresa_id, Atendimento.data_atendimento)
+Index("ix_atendimentos_cliente_data", Atendimento.cliente_id, Atendimento.data_atendimento)
+Index("ix_clientes_empresa_primeiro_contato", Cliente.empresa_id, Cliente.data_primeiro_contato)
+Index("ix_clientes_empresa_telefone", Cliente.empresa_id, Cliente.telefone)
+
+# Live refresh tokens only: revoked and expired rows are purged in batches
+# (auth.purge_refresh_tokens), so the index stays small. Serves the
+# "revoke all for empresa" path. Mirrored by alembic revision 007.
+Index(
+    "ix_refresh_tokens_ativos",
+    RefreshToken.empresa_id,
+    RefreshToken.expires_at,
+    postgresql_where=RefreshToken.revoked == 0,
+    sqlite_where=RefreshToken.revoked == 0,
+)
@@ -0,0 +1,87 @@
+"""
+Keyset (cursor) pagination helpers shared by the list endpoints.
+
+Cursors are opaque to the client: a urlsafe-base64 JSON payload holding the
+sort key of the last row returned. The next page is fetched with a
+``(sort_col, id) < (last_value, last_id)`` predicate, so the cost of a page
+does not grow with how deep the client has paged.
+
+The sort columns are nullable. Rows are ordered ``DESC NULLS LAST`` on every
+backend (Postgres would otherwise put NULLs first, SQLite last), and a cursor
+whose value is NULL continues within the NULL tail by id.
+"""
+from __future__ import annotations
+
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import and_, or_
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+def encode_cursor(value: Any, row_id: int) -> str:
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    raw = json.dumps({"v": value, "id": int(row_id)}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, as_datetime: bool = True) -> Tuple[Any, int]:
+    """Return ``(value, id)`` from an opaque cursor or raise HTTP 400."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+        value = data["v"]
+        row_id = int(data["id"])
+        if as_datetime and value is not None:
+            value = datetime.fromisoformat(value)
+        return value, row_id
+    except Exception:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cursor inválido")
+
+
+def keyset_after(sort_col, id_col, value: Any, row_id: int):
+    """Predicate selecting rows strictly after ``(value, row_id)`` in DESC NULLS LAST order."""
+    if value is None:
+        return and_(sort_col.is_(None), id_col < row_id)
+    return or_(sort_col < value, and_(sort_col == value, id_col < row_id), sort_col.is_(None))
+
+
+def _order_desc(sort_col, id_col):
+    return sort_col.desc().nulls_last(), id_col.desc()
+
+
+def paginate_desc(query, sort_col, id_col, limit: int, cursor: Optional[str] = None) -> Tuple[List[Any], Optional[str]]:
+    """Apply keyset pagination (newest first) to `query`.
+
+    Fetches ``limit + 1`` rows to detect whether another page exists without a
+    separate COUNT. Returns ``(rows, next_cursor)``.
+    """
+    if cursor:
+        value, row_id = decode_cursor(cursor)
+        query = query.filter(keyset_after(sort_col, id_col, value, row_id))
+    rows = query.order_by(*_order_desc(sort_col, id_col)).limit(limit + 1).all()
+    return _split_page(rows, sort_col, id_col, limit)
+
+
+async def paginate_desc_async(db, stmt, sort_col, id_col, limit: int, cursor: Optional[str] = None) -> Tuple[List[Any], Optional[str]]:
+    """`paginate_desc` for a 2.0 `select()` of entities on an AsyncSession."""
+    if cursor:
+        value, row_id = decode_cursor(cursor)
+        stmt = stmt.where(keyset_after(sort_col, id_col, value, row_id))
+    result = await db.scalars(stmt.order_by(*_order_desc(sort_col, id_col)).limit(limit + 1))
+    return _split_page(list(result), sort_col, id_col, limit)
+
+
+def _split_page(rows: List[Any], sort_col, id_col, limit: int) -> Tuple[List[Any], Optional[str]]:
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(getattr(last, sort_col.key), getattr(last, id_col.key))
+    return rows, next_cursor
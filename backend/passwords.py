@@ -0,0 +1,124 @@
+"""
+Password hashing on a dedicated process pool.
+
+bcrypt is deliberately slow (~250 ms per call at cost 12). Run inline, a burst
+of logins occupies the request threads and every core. Hashes and checks run
+on a bounded ProcessPoolExecutor instead (`PASSWORD_HASH_WORKERS` processes).
+Hashing therefore uses at most that many cores, and the API threads / event
+loop only wait on a future. `PASSWORD_HASH_WORKERS=0` hashes inline (tests,
+single-core dev boxes).
+
+The cost is set by `BCRYPT_ROUNDS`. Stored hashes with a different cost are
+re-hashed transparently on the next successful login (`verify_and_update`).
+
+This module only imports passlib, so spawned workers start quickly.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Optional, Tuple
+
+from passlib.context import CryptContext
+
+logger = logging.getLogger("clientflow.passwords")
+
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+# Hashes with other rounds count as outdated (needs_update), so changing
+# BCRYPT_ROUNDS migrates them on login.
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def _verify_and_update(password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+    return pwd_context.verify_and_update(password, hashed)
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                # spawn: forking a process that already runs threads is unsafe.
+                _executor = ProcessPoolExecutor(max_workers=WORKERS, mp_context=multiprocessing.get_context("spawn"))
+    return _executor
+
+
+def _reset_executor(broken: ProcessPoolExecutor) -> None:
+    global _executor
+    with _executor_lock:
+        if _executor is broken:
+            _executor = None
+    broken.shutdown(wait=False, cancel_futures=True)
+
+
+def _run(fn: Callable, *args):
+    if WORKERS <= 0:
+        return fn(*args)
+    executor = _get_executor()
+    try:
+        return executor.submit(fn, *args).result()
+    except BrokenProcessPool:
+        # A worker died (OOM kill, ...): start a fresh pool for the next call.
+        logger.warning("Password hashing pool broke; recreating it")
+        _reset_executor(executor)
+        return _get_executor().submit(fn, *args).result()
+
+
+async def _run_async(fn: Callable, *args):
+    loop = asyncio.get_running_loop()
+    if WORKERS <= 0:
+        return await loop.run_in_executor(None, fn, *args)
+    executor = _get_executor()
+    try:
+        return await loop.run_in_executor(executor, fn, *args)
+    except BrokenProcessPool:
+        logger.warning("Password hashing pool broke; recreating it")
+        _reset_executor(executor)
+        return await loop.run_in_executor(_get_executor(), fn, *args)
+
+
+def hash_password(password: str) -> str:
+    return _run(_hash, password)
+
+
+def verify_and_update(password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+    """Check `password`; the second item is a new hash when the stored one is outdated."""
+    try:
+        return _run(_verify_and_update, password, hashed)
+    except ValueError:
+        # Malformed / unknown hash format.
+        return False, None
+
+
+async def hash_password_async(password: str) -> str:
+    return await _run_async(_hash, password)
+
+
+async def verify_and_update_async(password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+    try:
+        return await _run_async(_verify_and_update, password, hashed)
+    except ValueError:
+        return False, None
+
+
+def shutdown() -> None:
+    """Stop the worker processes (app shutdown)."""
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
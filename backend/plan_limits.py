@@ -3,6 +3,7 @@ from __future__ import annotations
 from typing import Optional
 
 from fastapi import HTTPException, status
+from sqlalchemy import func, update
 from sqlalchemy.orm import Session
 
 from backend import database, models
@@ -10,13 +11,25 @@ from backend import database, models
 
 FREE_LIMIT_MESSAGE = "Você atingiu o limite do plano FREE."
 
+_RESOURCES = {
+    "clientes": ("limite_clientes", models.Cliente, models.UsoEmpresa.total_clientes),
+    "atendimentos": ("limite_atendimentos", models.Atendimento, models.UsoEmpresa.total_atendimentos),
+}
+
 
 def check_plan_limits(
     empresa: models.Empresa,
     resource_type: str,
     db: Optional[Session] = None,
+    quantidade: int = 1,
 ) -> None:
-    """Enforce plan limits for the authenticated empresa.
+    """Enforce plan limits for the authenticated empresa and reserve quota.
+
+    Increments the empresa's `uso_empresa` counter by `quantidade` with a
+    single conditional UPDATE in the caller's transaction, so the check is
+    O(1) and the reservation commits or rolls back together with the insert.
+    The UPDATE row lock serializes concurrent inserts of the same empresa,
+    so two requests can never both take the last free slot.
 
     Raises:
         HTTPException(403) when a FREE plan limit is reached.
@@ -24,30 +37,13 @@ def check_plan_limits(
     Notes:
         - Always filters by empresa_id.
         - Never trusts the frontend for limit values.
-        - PRO is treated as unlimited.
+        - PRO is treated as unlimited (usage is still counted).
     """
 
     if not empresa:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Não autenticado")
 
-    plano = (empresa.plano_empresa or "free").strip().lower()
-
-    # PRO is unlimited by definition.
-    if plano == "pro":
-        return
-
-    if resource_type == "clientes":
-        limit = empresa.limite_clientes
-        model = models.Cliente
-    elif resource_type == "atendimentos":
-        limit = empresa.limite_atendimentos
-        model = models.Atendimento
-    else:
-        raise HTTPException(status_code=400, detail="resource_type inválido")
-
-    # Treat unset/invalid limits as unlimited.
-    if limit is None or int(limit) <= 0:
-        return
+    plano, limit, counter = _plan_limit(empresa, resource_type)
 
     close_db = False
     if db is None:
@@ -55,11 +51,111 @@ def check_plan_limits(
         close_db = True
 
     try:
-        total = db.query(model).filter(model.empresa_id == empresa.id).count()
-        if total >= int(limit):
+        if not _reserve(db, empresa.id, counter, quantidade, limit):
             if plano == "free":
                 raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=FREE_LIMIT_MESSAGE)
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Você atingiu o limite do seu plano.")
+        if close_db:
+            db.commit()
     finally:
         if close_db:
             db.close()
+
+
+def reserve_quota(empresa, resource_type: str, db: Session, quantidade: int) -> int:
+    """Reserve up to `quantidade` units for a batch; return how many were granted.
+
+    Unlike `check_plan_limits` a batch that does not fit is not rejected as a
+    whole: the remaining quota is granted and the caller reports the rest.
+    Runs in the caller's transaction.
+    """
+    if quantidade <= 0:
+        return 0
+    _plano, limit, counter = _plan_limit(empresa, resource_type)
+    if _reserve(db, empresa.id, counter, quantidade, limit):
+        return quantidade
+    if limit is None:
+        return 0
+    used = db.query(counter).filter(models.UsoEmpresa.empresa_id == empresa.id).scalar() or 0
+    restante = min(quantidade, int(limit) - int(used))
+    if restante > 0 and _reserve(db, empresa.id, counter, restante, limit):
+        return restante
+    return 0
+
+
+def _plan_limit(empresa, resource_type: str):
+    """Return (plano, limit or None when unlimited, usage counter column)."""
+    if resource_type not in _RESOURCES:
+        raise HTTPException(status_code=400, detail="resource_type inválido")
+    limit_attr, _model, counter = _RESOURCES[resource_type]
+
+    plano = (empresa.plano_empresa or "free").strip().lower()
+    limit = getattr(empresa, limit_attr)
+
+    # PRO is unlimited by definition; treat unset/invalid limits as unlimited.
+    if plano == "pro" or limit is None or int(limit) <= 0:
+        limit = None
+    return plano, limit, counter
+
+
+def _reserve(db: Session, empresa_id: int, counter, quantidade: int, limit: Optional[int]) -> bool:
+    stmt = (
+        update(models.UsoEmpresa)
+        .where(models.UsoEmpresa.empresa_id == empresa_id)
+        .values({counter: counter + quantidade})
+        .execution_options(synchronize_session=False)
+    )
+    if limit is not None:
+        stmt = stmt.where(counter + quantidade <= int(limit))
+    if db.execute(stmt).rowcount:
+        return True
+
+    # No row updated: either the counter row does not exist yet (first write
+    # since the feature shipped) or the limit is reached.
+    exists = db.query(models.UsoEmpresa.empresa_id).filter(models.UsoEmpresa.empresa_id == empresa_id).first()
+    if exists:
+        return False
+    _seed_usage(db, empresa_id)
+    return bool(db.execute(stmt).rowcount)
+
+
+def _count_usage(db: Session, empresa_id: int) -> dict:
+    return {
+        counter.key: db.query(func.count(model.id)).filter(model.empresa_id == empresa_id).scalar() or 0
+        for _limit_attr, model, counter in _RESOURCES.values()
+    }
+
+
+def _seed_usage(db: Session, empresa_id: int) -> None:
+    """Create the counter row from a one-off COUNT(*) (no-op if it raced in)."""
+    insert = database.dialect_insert(db)
+    stmt = insert(models.UsoEmpresa.__table__).values(empresa_id=empresa_id, **_count_usage(db, empresa_id))
+    db.execute(stmt.on_conflict_do_nothing(index_elements=["empresa_id"]))
+
+
+def reconcile_usage(db: Session, empresa_id: Optional[int] = None) -> int:
+    """Recount usage from the source tables and overwrite the counters.
+
+    Use after out-of-band deletes/imports; inserts committed while it runs may
+    be missed, so prefer quiet periods. Commits; returns rows written.
+    """
+    empresas = db.query(models.Empresa.id)
+    if empresa_id is not None:
+        empresas = empresas.filter(models.Empresa.id == empresa_id)
+    usage = {eid: {counter.key: 0 for _a, _m, counter in _RESOURCES.values()} for (eid,) in empresas}
+
+    for _limit_attr, model, counter in _RESOURCES.values():
+        counts = db.query(model.empresa_id, func.count(model.id)).group_by(model.empresa_id)
+        if empresa_id is not None:
+            counts = counts.filter(model.empresa_id == empresa_id)
+        for eid, total in counts:
+            if eid in usage:
+                usage[eid][counter.key] = int(total)
+
+    insert = database.dialect_insert(db)
+    table = models.UsoEmpresa.__table__
+    for eid, values in usage.items():
+        stmt = insert(table).values(empresa_id=eid, **values)
+        db.execute(stmt.on_conflict_do_update(index_elements=["empresa_id"], set_=values))
+    db.commit()
+    return len(usage)
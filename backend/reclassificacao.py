@@ -0,0 +1,141 @@
+"""
+Incremental reclassification of clientes (rules in services._classificacao).
+
+- Atendimento writes call `marcar_clientes` in their own transaction, which
+  queues the cliente in `clientes_reclassificar` (one row per cliente).
+- `processar_pendentes` drains that queue in small batches.
+- `varredura` handles drift over time. A classification changes with time
+  only when the age of the last atendimento crosses a 30-day boundary
+  (months are `days // 30`). Besides the 2-month (recente -> ativo) and
+  6-month (ativo -> inativo) thresholds, the stored score_atividade drops
+  5 points at every boundary, with no upper limit. So the sweep reclassifies
+  every cliente whose last atendimento crossed any boundary since the
+  previous sweep. It runs one empresa at a time, as range scans on
+  ix_atendimentos_empresa_data.
+
+All of it runs in the worker process (`python -m backend.worker`).
+"""
+from __future__ import annotations
+
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, List, Optional, Tuple
+
+from sqlalchemy import and_, bindparam, delete, exists, func, or_
+from sqlalchemy.orm import Query, Session, aliased
+
+from backend import models
+from backend.database import dialect_insert
+from backend.services import reclassificar_clientes
+
+LOTE_PENDENTES = int(os.getenv("RECLASSIFICACAO_LOTE", "500"))
+_LOTE_VARREDURA = 1000
+_MES = timedelta(days=30)
+
+
+def _naive_utc(value: datetime) -> datetime:
+    # DateTime columns are stored naive (UTC).
+    return value.astimezone(timezone.utc).replace(tzinfo=None) if value.tzinfo else value
+
+
+def marcar_clientes(db: Session, atendimentos: Iterable[models.Atendimento]) -> None:
+    """Queue the clientes of flushed atendimentos for reclassification."""
+    pares = sorted({(a.empresa_id, a.cliente_id) for a in atendimentos})
+    if not pares:
+        return
+    agora = datetime.now(timezone.utc)
+    insert = dialect_insert(db)
+    stmt = insert(models.ClienteReclassificar.__table__).values(
+        [{"cliente_id": cliente_id, "empresa_id": empresa_id, "marcado_em": agora} for empresa_id, cliente_id in pares]
+    )
+    # A re-mark bumps marcado_em so a batch already in flight does not dequeue it.
+    db.execute(stmt.on_conflict_do_update(index_elements=["cliente_id"], set_={"marcado_em": stmt.excluded.marcado_em}))
+
+
+def processar_pendentes(db: Session, lote: int = LOTE_PENDENTES, agora: Optional[datetime] = None) -> int:
+    """Reclassify up to `lote` queued clientes and dequeue them. Commits; returns how many."""
+    Q = models.ClienteReclassificar
+    pendentes = (
+        db.query(Q.cliente_id, Q.marcado_em)
+        .order_by(Q.marcado_em)
+        .limit(lote)
+        .with_for_update(skip_locked=True)
+        .all()
+    )
+    if not pendentes:
+        return 0
+    reclassificar_clientes(db, cliente_ids=[cliente_id for cliente_id, _ in pendentes], agora=agora)
+    fila = Q.__table__
+    db.execute(
+        delete(fila).where(fila.c.cliente_id == bindparam("cid"), fila.c.marcado_em == bindparam("marcado")),
+        [{"cid": cliente_id, "marcado": marcado_em} for cliente_id, marcado_em in pendentes],
+    )
+    db.commit()
+    return len(pendentes)
+
+
+def varredura(db: Session, desde: Optional[datetime], agora: Optional[datetime] = None) -> int:
+    """Reclassify clientes whose classification drifted in (desde, agora].
+
+    Without `desde` (first run) every cliente is reclassified. Commits;
+    returns how many clientes were updated.
+    """
+    agora = agora or datetime.now(timezone.utc)
+    if desde is None:
+        atualizados = reclassificar_clientes(db, agora=agora)
+        db.commit()
+        return atualizados
+
+    desde, agora_naive = _naive_utc(desde), _naive_utc(agora)
+    atualizados = 0
+    for (empresa_id,) in db.query(models.Empresa.id).order_by(models.Empresa.id).all():
+        mais_antiga = (
+            db.query(func.min(models.Atendimento.data_atendimento))
+            .filter(models.Atendimento.empresa_id == empresa_id)
+            .scalar()
+        )
+        janelas = _janelas(desde, agora_naive, mais_antiga) if mais_antiga is not None else []
+        if not janelas:
+            continue
+        ids = [cliente_id for (cliente_id,) in _candidatos(db, empresa_id, janelas)]
+        for i in range(0, len(ids), _LOTE_VARREDURA):
+            atualizados += reclassificar_clientes(db, cliente_ids=ids[i:i + _LOTE_VARREDURA], agora=agora)
+            db.commit()
+    return atualizados
+
+
+def _janelas(desde: datetime, agora: datetime, mais_antiga: datetime) -> List[Tuple[datetime, datetime]]:
+    """(inicio, fim] ranges of last-atendimento dates whose age crossed a 30-day boundary in (desde, agora].
+
+    The k-th boundary is crossed when the last atendimento is in
+    (desde - 30k, agora - 30k]. Ranges older than the empresa's first
+    atendimento are empty and skipped. Adjacent ranges are merged, so a gap
+    of 30 days or more between sweeps gives a single range.
+    """
+    janelas: List[Tuple[datetime, datetime]] = []
+    if desde >= agora:
+        return janelas
+    k = 1
+    while agora - k * _MES >= mais_antiga:
+        inicio, fim = desde - k * _MES, agora - k * _MES
+        if janelas and fim >= janelas[-1][0]:
+            janelas[-1] = (inicio, janelas[-1][1])
+        else:
+            janelas.append((inicio, fim))
+        k += 1
+    return janelas
+
+
+def _candidatos(db: Session, empresa_id: int, janelas: List[Tuple[datetime, datetime]]) -> Query:
+    """Distinct clientes of `empresa_id` whose most recent atendimento falls in `janelas`."""
+    A, B = models.Atendimento, aliased(models.Atendimento)
+    posterior = exists().where(B.cliente_id == A.cliente_id, B.data_atendimento > A.data_atendimento)
+    return (
+        db.query(A.cliente_id)
+        .filter(
+            A.empresa_id == empresa_id,
+            or_(*[and_(A.data_atendimento > inicio, A.data_atendimento <= fim) for inicio, fim in janelas]),
+            ~posterior,
+        )
+        .distinct()
+    )
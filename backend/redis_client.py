@@ -1,14 +1,39 @@
 import os
 from typing import Optional
 import redis
+from redis.backoff import ExponentialBackoff
+from redis.exceptions import ConnectionError, TimeoutError
+from redis.retry import Retry
 
 _redis_client: Optional[redis.Redis] = None
 
+# Pool and socket settings. Timeouts bound how long a stalled Redis can hold
+# a request thread; transient connection errors are retried with backoff.
+MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", "50"))
+SOCKET_TIMEOUT = float(os.getenv("REDIS_SOCKET_TIMEOUT_SECONDS", "1.0"))
+CONNECT_TIMEOUT = float(os.getenv("REDIS_CONNECT_TIMEOUT_SECONDS", "1.0"))
+HEALTH_CHECK_INTERVAL = int(os.getenv("REDIS_HEALTH_CHECK_INTERVAL_SECONDS", "30"))
+RETRIES = int(os.getenv("REDIS_RETRIES", "2"))
+
+
+def redis_options() -> dict:
+    """Keyword arguments for `redis.from_url` built from the settings above."""
+    return {
+        "decode_responses": True,
+        "max_connections": MAX_CONNECTIONS,
+        "socket_timeout": SOCKET_TIMEOUT,
+        "socket_connect_timeout": CONNECT_TIMEOUT,
+        "socket_keepalive": True,
+        "health_check_interval": HEALTH_CHECK_INTERVAL,
+        "retry": Retry(ExponentialBackoff(cap=0.5, base=0.05), RETRIES),
+        "retry_on_error": [ConnectionError, TimeoutError],
+    }
+
 
 def get_redis() -> redis.Redis:
     global _redis_client
     if _redis_client is not None:
         return _redis_client
     url = os.getenv("REDIS_URL", "redis://localhost:6379/0")
-    _redis_client = redis.from_url(url, decode_responses=True)
+    _redis_client = redis.from_url(url, **redis_options())
     return _redis_client
@@ -0,0 +1,128 @@
+"""
+Per-empresa daily rollups (`analytics_diario`) for the dashboard analytics.
+
+Write paths call `registrar_atendimento` / `registrar_cliente` after flushing
+the new row and before committing, so the rollup moves in the same
+transaction as the data it summarizes. `rebuild_rollups` recomputes history
+from the raw tables (see scripts/rebuild_rollups.py).
+"""
+from __future__ import annotations
+
+from collections import defaultdict
+from datetime import date, datetime
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from backend import models
+from backend.database import dialect_insert
+
+_COUNTERS = ("atendimentos", "receita_centavos", "novos_clientes")
+
+
+def _as_date(value) -> Optional[date]:
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    # SQLite returns func.date(...) as 'YYYY-MM-DD'.
+    return date.fromisoformat(str(value)[:10])
+
+
+def registrar(
+    db: Session,
+    empresa_id: int,
+    dia: date,
+    atendimentos: int = 0,
+    receita_centavos: int = 0,
+    novos_clientes: int = 0,
+) -> None:
+    """Add deltas to the (empresa_id, dia) rollup row, creating it if needed."""
+    table = models.AnalyticsDiario.__table__
+    insert = dialect_insert(db)
+    stmt = insert(table).values(
+        empresa_id=empresa_id,
+        dia=dia,
+        atendimentos=atendimentos,
+        receita_centavos=receita_centavos,
+        novos_clientes=novos_clientes,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.empresa_id, table.c.dia],
+        set_={col: table.c[col] + stmt.excluded[col] for col in _COUNTERS},
+    )
+    db.execute(stmt)
+
+
+def registrar_atendimentos(db: Session, atendimentos: Iterable[models.Atendimento]) -> None:
+    """Fold flushed atendimentos into the rollup, one upsert per (empresa, dia)."""
+    deltas: Dict[Tuple[int, date], list] = defaultdict(lambda: [0, 0])
+    for a in atendimentos:
+        key = (a.empresa_id, _as_date(a.data_atendimento))
+        deltas[key][0] += 1
+        deltas[key][1] += a.valor_centavos or 0
+    for (empresa_id, dia), (total, receita) in deltas.items():
+        registrar(db, empresa_id, dia, atendimentos=total, receita_centavos=receita)
+
+
+def registrar_clientes(db: Session, clientes: Iterable[models.Cliente]) -> None:
+    """Fold flushed clientes into the rollup, one upsert per (empresa, dia)."""
+    deltas: Dict[Tuple[int, date], int] = defaultdict(int)
+    for c in clientes:
+        deltas[(c.empresa_id, _as_date(c.data_primeiro_contato))] += 1
+    for (empresa_id, dia), total in deltas.items():
+        registrar(db, empresa_id, dia, novos_clientes=total)
+
+
+def registrar_atendimento(db: Session, atendimento: models.Atendimento) -> None:
+    registrar_atendimentos(db, [atendimento])
+
+
+def registrar_cliente(db: Session, cliente: models.Cliente) -> None:
+    registrar_clientes(db, [cliente])
+
+
+def rebuild_rollups(db: Session, empresa_id: Optional[int] = None) -> int:
+    """Recompute rollups from the raw tables. Returns the number of rows written.
+
+    Commits on success. Scoped to one empresa when `empresa_id` is given.
+    """
+    A, C, R = models.Atendimento, models.Cliente, models.AnalyticsDiario
+
+    appt_day = func.date(A.data_atendimento)
+    appt_q = db.query(A.empresa_id, appt_day, func.count(A.id), func.coalesce(func.sum(A.valor_centavos), 0))
+    client_day = func.date(C.data_primeiro_contato)
+    client_q = db.query(C.empresa_id, client_day, func.count(C.id))
+    delete_q = db.query(R)
+    if empresa_id is not None:
+        appt_q = appt_q.filter(A.empresa_id == empresa_id)
+        client_q = client_q.filter(C.empresa_id == empresa_id)
+        delete_q = delete_q.filter(R.empresa_id == empresa_id)
+
+    rows: Dict[Tuple[int, date], dict] = {}
+
+    def _row(eid, dia):
+        key = (eid, _as_date(dia))
+        if key not in rows:
+            rows[key] = {"empresa_id": key[0], "dia": key[1], "atendimentos": 0, "receita_centavos": 0, "novos_clientes": 0}
+        return rows[key]
+
+    for eid, dia, total, receita in appt_q.filter(A.data_atendimento.isnot(None)).group_by(A.empresa_id, appt_day):
+        row = _row(eid, dia)
+        row["atendimentos"] = int(total)
+        row["receita_centavos"] = int(receita or 0)
+    for eid, dia, total in client_q.filter(C.data_primeiro_contato.isnot(None)).group_by(C.empresa_id, client_day):
+        _row(eid, dia)["novos_clientes"] = int(total)
+
+    try:
+        delete_q.delete(synchronize_session=False)
+        if rows:
+            db.execute(R.__table__.insert(), list(rows.values()))
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return len(rows)
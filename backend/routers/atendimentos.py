@@ -1,9 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional, Union
 
-from backend import database, models
+from backend import cache, database, models, reclassificacao, rollups
 from backend.dependencies import require_authenticated_empresa
+from backend.empresa_cache import EmpresaSnapshot
+from backend.exports import EXPORT_FORMAT_PATTERN, stream_query
+from backend.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, paginate_desc
 from backend.plan_limits import check_plan_limits
 from pydantic import BaseModel, Field
 
@@ -13,43 +16,78 @@ class AtendimentoCreateApi(BaseModel):
     tipo_servico: str = Field(..., min_length=2, max_length=100)
     descricao_servico: str = Field(default="", max_length=2000)
     meses_retorno: int | None = Field(default=None, ge=0, le=120)
+    valor_cobrado: str | None = Field(default=None, max_length=50)
 
 
 router = APIRouter(prefix="/api/atendimentos", tags=["atendimentos"])
 
+MAX_BATCH_SIZE = 1000
 
-@router.get("", response_model=List[dict])
+
+# Minimal shape to keep frontend compatibility without adding new schemas.
+ATENDIMENTO_FIELDS = (
+    "id",
+    "empresa_id",
+    "cliente_id",
+    "tipo_servico",
+    "status_atendimento",
+    "descricao_servico",
+    "meses_retorno",
+    "data_atendimento",
+)
+
+
+def atendimento_to_dict(a: models.Atendimento) -> dict:
+    return {field: getattr(a, field) for field in ATENDIMENTO_FIELDS}
+
+
+@router.get("", response_model=Union[List[dict], dict])
 def listar_atendimentos(
-    empresa: models.Empresa = Depends(require_authenticated_empresa),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None),
+    empresa: EmpresaSnapshot = Depends(require_authenticated_empresa),
     db: Session = Depends(database.get_db),
 ):
-    atendimentos = (
-        db.query(models.Atendimento)
-        .filter(models.Atendimento.empresa_id == empresa.id)
-        .order_by(models.Atendimento.data_atendimento.desc())
-        .all()
+    """List atendimentos, newest first.
+
+    Without `limit`/`cursor` the legacy unpaged list is returned. With them the
+    response is `{"items": [...], "next_cursor": ...}` keyed on
+    (data_atendimento, id).
+    """
+    query = db.query(models.Atendimento).filter(models.Atendimento.empresa_id == empresa.id)
+    if limit is None and cursor is None:
+        atendimentos = query.order_by(models.Atendimento.data_atendimento.desc()).all()
+        return [atendimento_to_dict(a) for a in atendimentos]
+
+    atendimentos, next_cursor = paginate_desc(
+        query,
+        models.Atendimento.data_atendimento,
+        models.Atendimento.id,
+        limit or DEFAULT_PAGE_SIZE,
+        cursor,
     )
+    return {"items": [atendimento_to_dict(a) for a in atendimentos], "next_cursor": next_cursor}
 
-    # Minimal shape to keep frontend compatibility without adding new schemas.
-    return [
-        {
-            "id": a.id,
-            "empresa_id": a.empresa_id,
-            "cliente_id": a.cliente_id,
-            "tipo_servico": a.tipo_servico,
-            "status_atendimento": a.status_atendimento,
-            "descricao_servico": a.descricao_servico,
-            "meses_retorno": a.meses_retorno,
-            "data_atendimento": a.data_atendimento,
-        }
-        for a in atendimentos
-    ]
+
+@router.get("/export")
+def exportar_atendimentos(
+    format: str = Query("csv", pattern=EXPORT_FORMAT_PATTERN),
+    empresa: EmpresaSnapshot = Depends(require_authenticated_empresa),
+    db: Session = Depends(database.get_db),
+):
+    """Stream every atendimento of the empresa as CSV or NDJSON."""
+    query = (
+        db.query(*[getattr(models.Atendimento, f) for f in ATENDIMENTO_FIELDS])
+        .filter(models.Atendimento.empresa_id == empresa.id)
+        .order_by(models.Atendimento.id)
+    )
+    return stream_query(query, ATENDIMENTO_FIELDS, format, "atendimentos")
 
 
 @router.post("", status_code=status.HTTP_201_CREATED)
 def criar_atendimento(
     body: AtendimentoCreateApi,
-    empresa: models.Empresa = Depends(require_authenticated_empresa),
+    empresa: EmpresaSnapshot = Depends(require_authenticated_empresa),
     db: Session = Depends(database.get_db),
 ):
     # Ensure client belongs to this empresa.
@@ -69,8 +107,59 @@ def criar_atendimento(
         tipo_servico=body.tipo_servico,
         descricao_servico=body.descricao_servico,
         meses_retorno=body.meses_retorno,
+        valor_cobrado=body.valor_cobrado,
     )
     db.add(atendimento)
+    db.flush()
+    rollups.registrar_atendimento(db, atendimento)
+    reclassificacao.marcar_clientes(db, [atendimento])
     db.commit()
+    cache.bump_tenant_version(empresa.id)
     db.refresh(atendimento)
     return atendimento
+
+
+@router.post("/batch", status_code=status.HTTP_201_CREATED)
+def criar_atendimentos_em_lote(
+    body: List[AtendimentoCreateApi] = Body(..., min_length=1, max_length=MAX_BATCH_SIZE),
+    empresa: EmpresaSnapshot = Depends(require_authenticated_empresa),
+    db: Session = Depends(database.get_db),
+):
+    """Create many atendimentos in one transaction (all or nothing).
+
+    Client ownership is checked with a single IN query and the plan limit is
+    reserved once for the whole batch. Returns the created ids in input order.
+    """
+    cliente_ids = {item.cliente_id for item in body}
+    encontrados = {
+        cliente_id
+        for (cliente_id,) in db.query(models.Cliente.id).filter(
+            models.Cliente.empresa_id == empresa.id,
+            models.Cliente.id.in_(cliente_ids),
+        )
+    }
+    faltando = sorted(cliente_ids - encontrados)
+    if faltando:
+        raise HTTPException(status_code=404, detail=f"Clientes não encontrados: {faltando}")
+
+    check_plan_limits(empresa, "atendimentos", db=db, quantidade=len(body))
+
+    atendimentos = [
+        models.Atendimento(
+            empresa_id=empresa.id,
+            cliente_id=item.cliente_id,
+            tipo_servico=item.tipo_servico,
+            descricao_servico=item.descricao_servico,
+            meses_retorno=item.meses_retorno,
+            valor_cobrado=item.valor_cobrado,
+        )
+        for item in body
+    ]
+    db.add_all(atendimentos)
+    db.flush()
+    rollups.registrar_atendimentos(db, atendimentos)
+    reclassificacao.marcar_clientes(db, atendimentos)
+    ids = [a.id for a in atendimentos]
+    db.commit()
+    cache.bump_tenant_version(empresa.id)
+    return {"ids": ids}
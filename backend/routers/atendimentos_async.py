@@ -0,0 +1,77 @@
+"""Async variants of the atendimentos list/create routes (enabled by ASYNC_DB_ROUTES).
+
+Registered ahead of `atendimentos.router`; export stays on the sync router.
+"""
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional, Union
+
+from backend import cache, database, models, reclassificacao, rollups
+from backend.dependencies import require_authenticated_empresa_async
+from backend.empresa_cache import EmpresaSnapshot
+from backend.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, paginate_desc_async
+from backend.plan_limits import check_plan_limits
+from backend.routers.atendimentos import AtendimentoCreateApi, atendimento_to_dict
+
+router = APIRouter(prefix="/api/atendimentos", tags=["atendimentos"])
+
+
+@router.get("", response_model=Union[List[dict], dict])
+async def listar_atendimentos(
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None),
+    empresa: EmpresaSnapshot = Depends(require_authenticated_empresa_async),
+    db: AsyncSession = Depends(database.get_async_db),
+):
+    """Same contract as the sync `listar_atendimentos`."""
+    stmt = select(models.Atendimento).where(models.Atendimento.empresa_id == empresa.id)
+    if limit is None and cursor is None:
+        result = await db.scalars(stmt.order_by(models.Atendimento.data_atendimento.desc()))
+        return [atendimento_to_dict(a) for a in result]
+
+    atendimentos, next_cursor = await paginate_desc_async(
+        db,
+        stmt,
+        models.Atendimento.data_atendimento,
+        models.Atendimento.id,
+        limit or DEFAULT_PAGE_SIZE,
+        cursor,
+    )
+    return {"items": [atendimento_to_dict(a) for a in atendimentos], "next_cursor": next_cursor}
+
+
+@router.post("", status_code=status.HTTP_201_CREATED)
+async def criar_atendimento(
+    body: AtendimentoCreateApi,
+    empresa: EmpresaSnapshot = Depends(require_authenticated_empresa_async),
+    db: AsyncSession = Depends(database.get_async_db),
+):
+    # Ensure client belongs to this empresa.
+    cliente_id = await db.scalar(
+        select(models.Cliente.id).where(
+            models.Cliente.id == body.cliente_id,
+            models.Cliente.empresa_id == empresa.id,
+        )
+    )
+    if not cliente_id:
+        raise HTTPException(status_code=404, detail="Cliente não encontrado")
+
+    await db.run_sync(lambda session: check_plan_limits(empresa, "atendimentos", db=session))
+
+    atendimento = models.Atendimento(
+        empresa_id=empresa.id,
+        cliente_id=body.cliente_id,
+        tipo_servico=body.tipo_servico,
+        descricao_servico=body.descricao_servico,
+        meses_retorno=body.meses_retorno,
+        valor_cobrado=body.valor_cobrado,
+    )
+    db.add(atendimento)
+    await db.flush()
+    await db.run_sync(lambda session: rollups.registrar_atendimento(session, atendimento))
+    await db.run_sync(lambda session: reclassificacao.marcar_clientes(session, [atendimento]))
+    await db.commit()
+    await cache.bump_tenant_version_async(empresa.id)
+    await db.refresh(atendimento)
+    return atendimento
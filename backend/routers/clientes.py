@@ -1,25 +1,76 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from backend.schemas import ClienteCreate, ClienteOut
-from backend import models, database
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile, status
+from backend.schemas import ClienteCreate, ClienteOut, ClientePage, SugestaoPage
+from backend import cache, models, database, rollups, services
 from backend.dependencies import require_authenticated_empresa
+from backend.empresa_cache import EmpresaSnapshot
+from backend.exports import EXPORT_FORMAT_PATTERN, stream_query
+from backend.imports import importar_clientes_csv
+from backend.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, paginate_desc
 from backend.plan_limits import check_plan_limits
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional, Union
 
 router = APIRouter(prefix="/api/clientes", tags=["clientes"])
 
-@router.get("", response_model=List[ClienteOut])
+@router.get("", response_model=Union[List[ClienteOut], ClientePage])
 def listar_clientes(
-    empresa: models.Empresa = Depends(require_authenticated_empresa),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None),
+    empresa: EmpresaSnapshot = Depends(require_authenticated_empresa),
     db: Session = Depends(database.get_db)
 ):
-    clientes = db.query(models.Cliente).filter(models.Cliente.empresa_id == empresa.id).order_by(models.Cliente.data_primeiro_contato.desc()).all()
-    return clientes
+    """List clientes, newest first.
+
+    Without `limit`/`cursor` the legacy unpaged list is returned. With them the
+    response is `{"items": [...], "next_cursor": ...}` keyed on
+    (data_primeiro_contato, id).
+    """
+    query = db.query(models.Cliente).filter(models.Cliente.empresa_id == empresa.id)
+    if limit is None and cursor is None:
+        return query.order_by(models.Cliente.data_primeiro_contato.desc()).all()
+    items, next_cursor = paginate_desc(
+        query,
+        models.Cliente.data_primeiro_contato,
+        models.Cliente.id,
+        limit or DEFAULT_PAGE_SIZE,
+        cursor,
+    )
+    return {"items": items, "next_cursor": next_cursor}
+
+@router.get("/sugestoes", response_model=SugestaoPage)
+def sugestoes_clientes(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None),
+    empresa: EmpresaSnapshot = Depends(require_authenticated_empresa),
+    db: Session = Depends(database.get_db)
+):
+    """Suggested actions per cliente, most urgent first.
+
+    Computed in SQL from max(data_atendimento) per cliente (see
+    services.sugestoes_clientes); `urgencia` 0 is the most urgent.
+    """
+    items, next_cursor = services.sugestoes_clientes(db, empresa.id, limit, cursor)
+    return {"items": items, "next_cursor": next_cursor}
+
+@router.get("/export")
+def exportar_clientes(
+    format: str = Query("csv", pattern=EXPORT_FORMAT_PATTERN),
+    empresa: EmpresaSnapshot = Depends(require_authenticated_empresa),
+    db: Session = Depends(database.get_db)
+):
+    """Stream every cliente of the empresa as CSV or NDJSON (ClienteOut columns)."""
+    fields = list(ClienteOut.model_fields)
+    query = (
+        db.query(*[getattr(models.Cliente, f) for f in fields])
+        .filter(models.Cliente.empresa_id == empresa.id)
+        .order_by(models.Cliente.id)
+    )
+    return stream_query(query, fields, format, "clientes")
 
 @router.post("", status_code=status.HTTP_201_CREATED)
 def criar_cliente(
     cliente: ClienteCreate,
-    empresa: models.Empresa = Depends(require_authenticated_empresa),
+    empresa: EmpresaSnapshot = Depends(require_authenticated_empresa),
     db: Session = Depends(database.get_db)
 ):
     existente = db.query(models.Cliente).filter(
@@ -38,6 +89,21 @@ def criar_cliente(
         anotacoes_rapidas=cliente.anotacoes_rapidas
     )
     db.add(novo_cliente)
+    db.flush()
+    rollups.registrar_cliente(db, novo_cliente)
     db.commit()
+    cache.bump_tenant_version(empresa.id)
     db.refresh(novo_cliente)
     return novo_cliente
+
+@router.post("/import")
+def importar_clientes(
+    arquivo: UploadFile = File(...),
+    empresa: EmpresaSnapshot = Depends(require_authenticated_empresa),
+    db: Session = Depends(database.get_db)
+):
+    """Bulk import clientes from a CSV (nome, telefone[, anotacoes_rapidas]).
+
+    Returns a per-row report; valid rows are imported even when others fail.
+    """
+    return importar_clientes_csv(db, empresa, arquivo.file)
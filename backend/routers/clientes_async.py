@@ -0,0 +1,74 @@
+"""Async variants of the clientes list/create routes (enabled by ASYNC_DB_ROUTES).
+
+Registered ahead of `clientes.router`, so they shadow the sync handlers for the
+same paths; the remaining routes (export) keep being served by the sync router.
+"""
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional, Union
+
+from backend import cache, database, models, rollups
+from backend.dependencies import require_authenticated_empresa_async
+from backend.empresa_cache import EmpresaSnapshot
+from backend.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, paginate_desc_async
+from backend.plan_limits import check_plan_limits
+from backend.schemas import ClienteCreate, ClienteOut, ClientePage
+
+router = APIRouter(prefix="/api/clientes", tags=["clientes"])
+
+
+@router.get("", response_model=Union[List[ClienteOut], ClientePage])
+async def listar_clientes(
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None),
+    empresa: EmpresaSnapshot = Depends(require_authenticated_empresa_async),
+    db: AsyncSession = Depends(database.get_async_db),
+):
+    """Same contract as the sync `listar_clientes`."""
+    stmt = select(models.Cliente).where(models.Cliente.empresa_id == empresa.id)
+    if limit is None and cursor is None:
+        result = await db.scalars(stmt.order_by(models.Cliente.data_primeiro_contato.desc()))
+        return result.all()
+    items, next_cursor = await paginate_desc_async(
+        db,
+        stmt,
+        models.Cliente.data_primeiro_contato,
+        models.Cliente.id,
+        limit or DEFAULT_PAGE_SIZE,
+        cursor,
+    )
+    return {"items": items, "next_cursor": next_cursor}
+
+
+@router.post("", status_code=status.HTTP_201_CREATED)
+async def criar_cliente(
+    cliente: ClienteCreate,
+    empresa: EmpresaSnapshot = Depends(require_authenticated_empresa_async),
+    db: AsyncSession = Depends(database.get_async_db),
+):
+    existente = await db.scalar(
+        select(models.Cliente.id).where(
+            models.Cliente.empresa_id == empresa.id,
+            models.Cliente.telefone == cliente.telefone,
+        ).limit(1)
+    )
+    if existente:
+        raise HTTPException(status_code=400, detail="Cliente já cadastrado com este telefone.")
+
+    # Sync helpers run on the same connection/transaction via run_sync.
+    await db.run_sync(lambda session: check_plan_limits(empresa, "clientes", db=session))
+
+    novo_cliente = models.Cliente(
+        empresa_id=empresa.id,
+        nome=cliente.nome,
+        telefone=cliente.telefone,
+        anotacoes_rapidas=cliente.anotacoes_rapidas
+    )
+    db.add(novo_cliente)
+    await db.flush()
+    await db.run_sync(lambda session: rollups.registrar_cliente(session, novo_cliente))
+    await db.commit()
+    await cache.bump_tenant_version_async(empresa.id)
+    await db.refresh(novo_cliente)
+    return novo_cliente
@@ -0,0 +1,33 @@
+"""Async variant of /api/dashboard/analytics (enabled by ASYNC_DB_ROUTES)."""
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend import cache, dashboard_analytics
+from backend.analytics import normalize_period
+from backend.dependencies import get_async_tenant_db, require_authenticated_empresa_async
+from backend.empresa_cache import EmpresaSnapshot
+
+router = APIRouter(prefix="/api/dashboard", tags=["dashboard"])
+
+
+@router.get("/analytics")
+async def obter_dashboard_analytics(
+    period: str = Query("7d"),
+    empresa: EmpresaSnapshot = Depends(require_authenticated_empresa_async),
+    tenant_db: AsyncSession = Depends(get_async_tenant_db),
+):
+    """Same contract as the sync handler in backend/main.py.
+
+    The analytics queries are shared with the sync path through run_sync; a
+    cache hit never checks out a connection, and the Redis round trips run in
+    a worker thread.
+    """
+    period_key = normalize_period(period)
+    return await cache.get_or_compute_async(
+        empresa.id,
+        "analytics",
+        period_key,
+        lambda: tenant_db.run_sync(
+            lambda session: dashboard_analytics.compute_dashboard_analytics(session, empresa.id, period_key)
+        ),
+    )
@@ -6,6 +6,7 @@ from sqlalchemy.orm import Session
 
 from backend import auth, database, models
 from backend.dependencies import require_authenticated_empresa
+from backend.empresa_cache import EmpresaSnapshot
 from backend.schemas import EmpresaCreate, EmpresaLogin, EmpresaOut, RefreshRequest, TokenResponse
 
 logger = logging.getLogger("clientflow.empresa")
@@ -14,7 +15,7 @@ router = APIRouter(prefix="/api/empresas", tags=["empresas"])
 
 
 @router.get("/me", response_model=EmpresaOut)
-def obter_empresa_atual(empresa: models.Empresa = Depends(require_authenticated_empresa)):
+def obter_empresa_atual(empresa: EmpresaSnapshot = Depends(require_authenticated_empresa)):
     return empresa
 
 
@@ -52,8 +53,14 @@ def cadastrar_empresa(empresa: EmpresaCreate, db: Session = Depends(database.get
 def login_empresa(login: EmpresaLogin, db: Session = Depends(database.get_db)):
     try:
         empresa = db.query(models.Empresa).filter(models.Empresa.email_login == login.email_login).first()
-        if not empresa or not auth.verify_password(login.senha, empresa.senha_hash):
+        if not empresa:
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Email ou senha incorretos")
+        ok, novo_hash = auth.verify_and_update_password(login.senha, empresa.senha_hash)
+        if not ok:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Email ou senha incorretos")
+        if novo_hash:
+            # Cost changed (BCRYPT_ROUNDS): committed with the refresh token below.
+            empresa.senha_hash = novo_hash
         access_token = auth.create_access_token({"sub": empresa.id})
         refresh_token = auth.create_refresh_token(db, empresa.id)
         return {"access_token": access_token, "refresh_token": refresh_token, "token_type": "bearer"}
@@ -0,0 +1,55 @@
+"""Async variants of the auth routes (enabled by ASYNC_DB_ROUTES).
+
+Registered ahead of `empresa.router`; cadastro/refresh stay on the sync router.
+"""
+import logging
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import select, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend import auth, database, models, passwords
+from backend.dependencies import require_authenticated_empresa_async
+from backend.empresa_cache import EmpresaSnapshot
+from backend.schemas import EmpresaLogin, EmpresaOut
+
+logger = logging.getLogger("clientflow.empresa")
+
+router = APIRouter(prefix="/api/empresas", tags=["empresas"])
+
+
+@router.get("/me", response_model=EmpresaOut)
+async def obter_empresa_atual(empresa: EmpresaSnapshot = Depends(require_authenticated_empresa_async)):
+    return empresa
+
+
+@router.post("/login")
+async def login_empresa(login: EmpresaLogin, db: AsyncSession = Depends(database.get_async_db)):
+    try:
+        row = (
+            await db.execute(
+                select(models.Empresa.id, models.Empresa.senha_hash).where(models.Empresa.email_login == login.email_login)
+            )
+        ).first()
+        if not row:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Email ou senha incorretos")
+        # bcrypt is CPU-bound: it runs on the password process pool, off the event loop.
+        ok, novo_hash = await passwords.verify_and_update_async(login.senha, row.senha_hash)
+        if not ok:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Email ou senha incorretos")
+        if novo_hash:
+            # Committed with the refresh token below.
+            await db.execute(update(models.Empresa).where(models.Empresa.id == row.id).values(senha_hash=novo_hash))
+        access_token = auth.create_access_token({"sub": row.id})
+        refresh_token = await db.run_sync(lambda session: auth.create_refresh_token(session, row.id))
+        return {"access_token": access_token, "refresh_token": refresh_token, "token_type": "bearer"}
+    except HTTPException:
+        raise
+    except SQLAlchemyError:
+        await db.rollback()
+        logger.exception("Database error while logging in")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Banco indisponivel ou esquema nao inicializado. Tente novamente em instantes.",
+        )
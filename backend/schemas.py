@@ -1,6 +1,7 @@
 
 from pydantic import BaseModel, EmailStr, Field, field_validator
 from datetime import datetime
+from typing import List
 import re
 
 class EmpresaOut(BaseModel):
@@ -126,11 +127,29 @@ class ClienteOut(BaseModel):
     nome: str
     telefone: str
     anotacoes_rapidas: str = ""
-    data_primeiro_contato: datetime
+    data_primeiro_contato: datetime | None = None
     model_config = {
         "from_attributes": True
     }
 
+class ClientePage(BaseModel):
+    items: List[ClienteOut]
+    next_cursor: str | None = None
+
+class SugestaoClienteOut(BaseModel):
+    cliente_id: int
+    nome: str
+    telefone: str
+    status_ia_cliente: str | None = None
+    ultimo_atendimento: datetime | None = None
+    dias_sem_atendimento: int | None = None
+    urgencia: int
+    sugestao: str
+
+class SugestaoPage(BaseModel):
+    items: List[SugestaoClienteOut]
+    next_cursor: str | None = None
+
 class PerguntaIA(BaseModel):
     pergunta: str = Field(min_length=3, max_length=1000, description="Pergunta para a IA")
     
@@ -1,49 +1,191 @@
 """
 Camada de serviços para regras de negócio, inteligência e automações do ClientFlow
 """
-from datetime import datetime, timezone
+from datetime import datetime, time, timedelta, timezone
+from typing import Iterable, List, Optional, Tuple
+from sqlalchemy import and_, case, func, or_, select, update
+from fastapi import HTTPException, status
 from sqlalchemy.orm import Session
 from backend import models
+from backend.pagination import decode_cursor, encode_cursor
 
-def classificar_cliente(cliente: models.Cliente, db: Session):
+# Linhas por executemany no UPDATE em lote da reclassificação
+UPDATE_BATCH_SIZE = 1000
+
+def _as_utc(value: datetime) -> datetime:
+    # DateTime columns come back naive (stored as UTC); compare aware values.
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+def _classificacao(total: int, ultima: Optional[datetime], agora: datetime) -> dict:
     """
-    Atualiza status_cliente, nivel_atividade, score_atividade e importante
+    Regras de classificação a partir do total de atendimentos e do mais recente
     """
-    atendimentos = db.query(models.Atendimento).filter(models.Atendimento.cliente_id == cliente.id, models.Atendimento.empresa_id == cliente.empresa_id).all()
-    total = len(atendimentos)
     if total == 0:
-        cliente.status_cliente = "novo"
-        cliente.nivel_atividade = "baixo"
-        cliente.score_atividade = 0
-        cliente.importante = 0
-        return
-    datas = [a.data_atendimento for a in atendimentos if a.data_atendimento]
-    datas.sort(reverse=True)
-    meses_sem_retorno = (datetime.now(timezone.utc) - datas[0]).days // 30 if datas else 99
+        return {"status_cliente": "novo", "nivel_atividade": "baixo", "score_atividade": 0, "importante": 0}
+    meses_sem_retorno = (agora - _as_utc(ultima)).days // 30 if ultima else 99
     if total >= 5:
-        cliente.status_cliente = "frequente"
-        cliente.nivel_atividade = "alto"
-        cliente.importante = 1
+        status, nivel, importante = "frequente", "alto", 1
     elif meses_sem_retorno >= 6:
-        cliente.status_cliente = "inativo"
-        cliente.nivel_atividade = "baixo"
-        cliente.importante = 0
+        status, nivel, importante = "inativo", "baixo", 0
     elif meses_sem_retorno <= 2:
-        cliente.status_cliente = "recente"
-        cliente.nivel_atividade = "medio"
-        cliente.importante = 0
+        status, nivel, importante = "recente", "medio", 0
     else:
-        cliente.status_cliente = "ativo"
-        cliente.nivel_atividade = "medio"
-        cliente.importante = 0
-    cliente.score_atividade = min(100, total * 20 - meses_sem_retorno * 5)
-
-def atualizar_status_todos_clientes(empresa_id: int, db: Session):
-    clientes = db.query(models.Cliente).filter(models.Cliente.empresa_id == empresa_id).all()
-    for cliente in clientes:
-        classificar_cliente(cliente, db)
+        status, nivel, importante = "ativo", "medio", 0
+    return {
+        "status_cliente": status,
+        "nivel_atividade": nivel,
+        "score_atividade": min(100, total * 20 - meses_sem_retorno * 5),
+        "importante": importante,
+    }
+
+def classificar_cliente(cliente: models.Cliente, db: Session, agora: Optional[datetime] = None):
+    """
+    Atualiza status_cliente, nivel_atividade, score_atividade e importante
+    """
+    total, ultima = db.query(func.count(models.Atendimento.id), func.max(models.Atendimento.data_atendimento)).filter(
+        models.Atendimento.cliente_id == cliente.id, models.Atendimento.empresa_id == cliente.empresa_id
+    ).one()
+    for campo, valor in _classificacao(total, ultima, agora or datetime.now(timezone.utc)).items():
+        setattr(cliente, campo, valor)
+
+def reclassificar_clientes(
+    db: Session,
+    empresa_id: Optional[int] = None,
+    cliente_ids: Optional[Iterable[int]] = None,
+    agora: Optional[datetime] = None,
+) -> int:
+    """
+    Reclassifica em lote: um SELECT agrupado (count/max por cliente) e um
+    UPDATE em lote apenas das linhas que mudaram. Não faz commit; retorna
+    quantos clientes foram atualizados.
+    """
+    agora = agora or datetime.now(timezone.utc)
+    C, A = models.Cliente, models.Atendimento
+    query = (
+        db.query(
+            C.id, C.status_cliente, C.nivel_atividade, C.score_atividade, C.importante,
+            func.count(A.id), func.max(A.data_atendimento),
+        )
+        .outerjoin(A, and_(A.cliente_id == C.id, A.empresa_id == C.empresa_id))
+        .group_by(C.id, C.status_cliente, C.nivel_atividade, C.score_atividade, C.importante)
+    )
+    if empresa_id is not None:
+        query = query.filter(C.empresa_id == empresa_id)
+    if cliente_ids is not None:
+        query = query.filter(C.id.in_(list(cliente_ids)))
+
+    mudancas = []
+    for cliente_id, status, nivel, score, importante, total, ultima in query:
+        novo = _classificacao(total, ultima, agora)
+        if (status, nivel, score, importante) != tuple(novo.values()):
+            mudancas.append({"id": cliente_id, **novo})
+    for i in range(0, len(mudancas), UPDATE_BATCH_SIZE):
+        db.execute(update(C), mudancas[i:i + UPDATE_BATCH_SIZE])
+    return len(mudancas)
+
+def atualizar_status_todos_clientes(empresa_id: int, db: Session, agora: Optional[datetime] = None):
+    reclassificar_clientes(db, empresa_id=empresa_id, agora=agora)
     db.commit()
 
+# Sugestões de ação (mesmas regras de ai_module.sugerir_acoes), da mais urgente
+# para a menos urgente; o índice é a `urgencia` devolvida pelo endpoint.
+SUGESTOES = (
+    "Cliente importante parado",
+    "Cliente sem atendimento há meses",
+    "Sugerido entrar em contato",
+    "Possível retorno em breve",
+)
+
+def sugestoes_clientes(
+    db: Session,
+    empresa_id: int,
+    limit: int,
+    cursor: Optional[str] = None,
+    agora: Optional[datetime] = None,
+) -> Tuple[List[dict], Optional[str]]:
+    """
+    Sugestões de ação por cliente, calculadas no banco.
+
+    Um único GROUP BY devolve max(data_atendimento) por cliente (nenhuma linha
+    de atendimento chega à aplicação). As regras de 30/60/120 dias viram
+    comparações com datas de corte: `dias > 120` equivale a
+    `ultima < meia-noite(hoje - 120)` e `dias < 30` a
+    `ultima >= meia-noite(hoje - 29)`.
+
+    Ordem: urgência, depois quem espera há mais tempo (último atendimento ou,
+    sem atendimento, primeiro contato) e id. Paginação keyset por
+    (urgencia, referencia, id). Retorna (itens, next_cursor).
+    """
+    C, A = models.Cliente, models.Atendimento
+    hoje = (agora or datetime.now(timezone.utc)).astimezone(timezone.utc).date()
+
+    def meia_noite(dias: int) -> datetime:
+        return datetime.combine(hoje - timedelta(days=dias), time.min)
+
+    ultimos = (
+        select(A.cliente_id, func.max(A.data_atendimento).label("ultima"))
+        .where(A.empresa_id == empresa_id)
+        .group_by(A.cliente_id)
+        .subquery()
+    )
+    ultima = ultimos.c.ultima
+    urgencia = case(
+        (ultima.is_(None), 2),
+        (ultima < meia_noite(120), 1),
+        (ultima >= meia_noite(29), 3),
+        (and_(C.status_ia_cliente == "Cliente importante", ultima < meia_noite(60)), 0),
+        else_=None,
+    )
+    referencia = func.coalesce(ultima, C.data_primeiro_contato, datetime(1970, 1, 1))
+
+    stmt = (
+        select(C.id, C.nome, C.telefone, C.status_ia_cliente, ultima, urgencia.label("urgencia"), referencia.label("referencia"))
+        .outerjoin(ultimos, ultimos.c.cliente_id == C.id)
+        .where(C.empresa_id == empresa_id, urgencia.is_not(None))
+    )
+    if cursor:
+        urg, ref, row_id = _decode_sugestao_cursor(cursor)
+        stmt = stmt.where(or_(
+            urgencia > urg,
+            and_(urgencia == urg, or_(referencia > ref, and_(referencia == ref, C.id > row_id))),
+        ))
+    rows = db.execute(stmt.order_by(urgencia, referencia, C.id).limit(limit + 1)).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor([last.urgencia, _referencia_iso(last.referencia)], last.id)
+    itens = [
+        {
+            "cliente_id": r.id,
+            "nome": r.nome,
+            "telefone": r.telefone,
+            "status_ia_cliente": r.status_ia_cliente,
+            "ultimo_atendimento": r.ultima,
+            "dias_sem_atendimento": (hoje - _as_date(r.ultima)).days if r.ultima is not None else None,
+            "urgencia": r.urgencia,
+            "sugestao": SUGESTOES[r.urgencia],
+        }
+        for r in rows
+    ]
+    return itens, next_cursor
+
+def _decode_sugestao_cursor(cursor: str):
+    value, row_id = decode_cursor(cursor, as_datetime=False)
+    try:
+        urg, ref = value
+        return int(urg), datetime.fromisoformat(ref), row_id
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cursor inválido")
+
+def _as_date(value):
+    # SQLite may hand back a string for computed datetime columns.
+    return value.date() if isinstance(value, datetime) else datetime.fromisoformat(str(value)).date()
+
+def _referencia_iso(value) -> str:
+    return value.isoformat() if isinstance(value, datetime) else datetime.fromisoformat(str(value)).isoformat()
+
 def log_acao(empresa_id: int, usuario: str, acao: str, _db: Session = None):
     # Placeholder para logs, pode ser expandido para salvar em tabela/logfile
     print(f"[LOG] Empresa {empresa_id} | Usuário: {usuario} | {acao} | {datetime.now(timezone.utc)}")
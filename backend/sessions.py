@@ -1,87 +1,399 @@
-from typing import Optional
+"""
+Opaque session tokens (token -> empresa_id) behind a pluggable store.
+
+`SESSION_STORE` picks the backend:
+
+- ``redis`` (default): shared by every process; see backend.redis_client for
+  the pool, timeout and retry settings.
+- ``memory``: in-process TTL store for single-node deployments and dev; no
+  Redis needed, but sessions are lost on restart and not shared between
+  workers.
+
+The module-level functions delegate to `get_store()`.
+"""
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Set, Tuple
 import os
 import logging
 import secrets
-from datetime import timedelta
+import threading
+import time
+from backend.cache import LocalTTLCache
 from backend.redis_client import get_redis
 
 logger = logging.getLogger("clientflow.sessions")
 
 # Session TTL in seconds (default 7 days)
 SESSION_TTL = int(os.getenv("SESSION_TTL_SECONDS", str(7 * 24 * 3600)))
+# Index members sampled for expired sessions on every create_session.
+INDEX_PRUNE_SAMPLE = int(os.getenv("SESSION_INDEX_PRUNE_SAMPLE", "5"))
+# Keys per UNLINK / GET batch.
+_BATCH = 500
+# Sliding TTL is rewritten only when it drifted this far below SESSION_TTL.
+SESSION_REFRESH_THRESHOLD = int(os.getenv("SESSION_REFRESH_THRESHOLD_SECONDS", "3600"))
+# Optional per-process near-cache of token -> empresa_id (0 disables it).
+NEAR_CACHE_TTL = float(os.getenv("SESSION_NEAR_CACHE_TTL_SECONDS", "0"))
+NEAR_CACHE_SIZE = int(os.getenv("SESSION_NEAR_CACHE_SIZE", "10000"))
+INVALIDATION_CHANNEL = "session:invalidate"
+SESSION_STORE = os.getenv("SESSION_STORE", "redis").lower()
 
+# Revocations publish the revoked tokens on INVALIDATION_CHANNEL; every
+# process with a near-cache runs a listener thread that drops them, so a
+# revoked token stops working everywhere without waiting for the TTL.
+_near_cache = LocalTTLCache(maxsize=NEAR_CACHE_SIZE, ttl=NEAR_CACHE_TTL) if NEAR_CACHE_TTL > 0 else None
+_listener: Optional[threading.Thread] = None
+_listener_lock = threading.Lock()
+_store: Optional["SessionStore"] = None
 
-def create_session(empresa_id: int) -> str:
-    """Create a session token stored in Redis pointing to `empresa_id`.
 
-    Returns the generated token.
-    """
-    r = get_redis()
-    token = secrets.token_urlsafe(32)
-    key = f"session:{token}"
-    try:
-        r.set(key, str(empresa_id), ex=SESSION_TTL)
-    except Exception as e:
-        logger.exception("Failed to create session in Redis: %s", e)
-        raise
-    return token
+def _session_key(token: str) -> str:
+    return f"session:{token}"
 
 
-def get_session_empresa(token: str) -> Optional[int]:
-    """Return empresa_id associated with `token`, or None if not found/invalid.
+def _index_key(empresa_id: int) -> str:
+    """Set of the empresa's session tokens (kept outside the `session:*` namespace)."""
+    return f"session_index:{empresa_id}"
+
+
+class SessionStore:
+    """Interface of a session backend."""
+
+    def create(self, empresa_id: int) -> str:
+        """Store a new token for `empresa_id` and return it."""
+        raise NotImplementedError
+
+    def get(self, token: str) -> Optional[int]:
+        """Return the token's empresa_id (sliding the TTL), or None."""
+        raise NotImplementedError
+
+    def revoke(self, token: str) -> None:
+        raise NotImplementedError
+
+    def revoke_all(self, empresa_id: int) -> int:
+        """Revoke every session of `empresa_id`; return how many were live."""
+        raise NotImplementedError
+
+
+class RedisSessionStore(SessionStore):
+    """Sessions as `session:{token}` keys plus a per-empresa index set."""
+
+    def create(self, empresa_id: int) -> str:
+        """Create a session token stored in Redis pointing to `empresa_id`.
+
+        The token is also added to the empresa's session index, so
+        `revoke_all` never has to scan the keyspace.
+        """
+        r = get_redis()
+        token = secrets.token_urlsafe(32)
+        key = _session_key(token)
+        try:
+            pipe = r.pipeline(transaction=True)
+            pipe.set(key, str(empresa_id), ex=SESSION_TTL)
+            pipe.sadd(_index_key(empresa_id), token)
+            pipe.execute()
+        except Exception as e:
+            logger.exception("Failed to create session in Redis: %s", e)
+            raise
+        self._prune_index(r, empresa_id)
+        return token
+
+    @staticmethod
+    def _prune_index(r, empresa_id: int, sample: Optional[int] = None) -> int:
+        """Lazily drop index members whose session already expired.
 
-    Access refreshes the TTL for the session.
+        Checks a small random sample per call, so the cost stays O(1) while stale
+        members are removed over time. Returns how many were removed.
+        """
+        sample = INDEX_PRUNE_SAMPLE if sample is None else sample
+        if sample <= 0:
+            return 0
+        index = _index_key(empresa_id)
+        try:
+            tokens = r.srandmember(index, sample) or []
+            if not tokens:
+                return 0
+            pipe = r.pipeline(transaction=False)
+            for token in tokens:
+                pipe.exists(_session_key(token))
+            stale = [token for token, alive in zip(tokens, pipe.execute()) if not alive]
+            if stale:
+                r.srem(index, *stale)
+            return len(stale)
+        except Exception:
+            logger.debug("Could not prune session index for empresa %s", empresa_id)
+            return 0
+
+    def get(self, token: str) -> Optional[int]:
+        """GET and TTL go out in one pipelined round trip.
+
+        The sliding TTL is only rewritten (EXPIRE) once it has drifted more
+        than SESSION_REFRESH_THRESHOLD seconds below SESSION_TTL. With
+        SESSION_NEAR_CACHE_TTL_SECONDS > 0 hits are served from an
+        in-process cache for that long (see `_near_cache`).
+        """
+        if _near_cache is not None:
+            cached = _near_cache.get(token)
+            if cached is not None:
+                return cached
+            _ensure_invalidation_listener()
+        r = get_redis()
+        key = _session_key(token)
+        try:
+            pipe = r.pipeline(transaction=False)
+            pipe.get(key)
+            pipe.ttl(key)
+            val, ttl = pipe.execute()
+        except Exception as e:
+            logger.exception("Redis error on get_session_empresa: %s", e)
+            return None
+        if val is None:
+            return None
+        try:
+            empresa_id = int(val)
+        except Exception:
+            logger.debug("Invalid session value for key %s: %r", key, val)
+            return None
+        # refresh TTL on access, only once it drifted past the threshold
+        if ttl is not None and 0 <= ttl < SESSION_TTL - SESSION_REFRESH_THRESHOLD:
+            try:
+                r.expire(key, SESSION_TTL)
+            except Exception:
+                logger.debug("Could not refresh session TTL for key %s", key)
+        if _near_cache is not None:
+            _near_cache.set(token, empresa_id)
+        return empresa_id
+
+    def revoke(self, token: str) -> None:
+        r = get_redis()
+        key = _session_key(token)
+        try:
+            val = r.getdel(key)
+            if val is not None:
+                r.srem(_index_key(int(val)), token)
+        except Exception as e:
+            logger.exception("Failed to delete session %s: %s", key, e)
+        _invalidate([token])
+
+    def revoke_all(self, empresa_id: int) -> int:
+        """Read and drop the empresa's index atomically, then UNLINK its sessions.
+
+        SMEMBERS + DEL run in one MULTI and the session keys are UNLINKed in
+        pipelined batches: O(k) in the empresa's sessions, independent of the
+        total number of sessions.
+        """
+        r = get_redis()
+        index = _index_key(empresa_id)
+        revoked = 0
+        try:
+            pipe = r.pipeline(transaction=True)
+            pipe.smembers(index)
+            pipe.delete(index)
+            tokens = list(pipe.execute()[0])
+            pipe = r.pipeline(transaction=False)
+            for i in range(0, len(tokens), _BATCH):
+                pipe.unlink(*[_session_key(t) for t in tokens[i:i + _BATCH]])
+            revoked = sum(pipe.execute()) if tokens else 0
+        except Exception as e:
+            logger.exception("Error while revoking sessions for empresa %s: %s", empresa_id, e)
+            tokens = []
+        _invalidate(tokens)
+        return revoked
+
+
+class MemorySessionStore(SessionStore):
+    """In-process session store with the same TTL semantics as the Redis one.
+
+    Entries are kept in expiry order (a TTL refresh moves the entry to the
+    end), so expired sessions are evicted from the front in amortized O(1)
+    on every `create`.
     """
-    r = get_redis()
-    key = f"session:{token}"
-    try:
-        val = r.get(key)
-    except Exception as e:
-        logger.exception("Redis error on get_session_empresa: %s", e)
-        return None
-    if val is None:
-        return None
-    # refresh TTL on access
-    try:
-        r.expire(key, SESSION_TTL)
-    except Exception:
-        logger.debug("Could not refresh session TTL for key %s", key)
-    try:
-        return int(val)
-    except Exception:
-        logger.debug("Invalid session value for key %s: %r", key, val)
-        return None
+
+    def __init__(self, ttl: int = SESSION_TTL, refresh_threshold: int = SESSION_REFRESH_THRESHOLD):
+        self.ttl = ttl
+        self.refresh_threshold = refresh_threshold
+        self._sessions: "OrderedDict[str, Tuple[int, float]]" = OrderedDict()
+        self._index: Dict[int, Set[str]] = {}
+        self._lock = threading.Lock()
+
+    def _drop(self, token: str) -> Optional[int]:
+        item = self._sessions.pop(token, None)
+        if item is None:
+            return None
+        empresa_id = item[0]
+        tokens = self._index.get(empresa_id)
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._index[empresa_id]
+        return empresa_id
+
+    def _evict_expired(self, now: float) -> None:
+        while self._sessions:
+            token, (_empresa_id, expires_at) = next(iter(self._sessions.items()))
+            if expires_at > now:
+                break
+            self._drop(token)
+
+    def create(self, empresa_id: int) -> str:
+        token = secrets.token_urlsafe(32)
+        now = time.monotonic()
+        with self._lock:
+            self._evict_expired(now)
+            self._sessions[token] = (empresa_id, now + self.ttl)
+            self._index.setdefault(empresa_id, set()).add(token)
+        return token
+
+    def get(self, token: str) -> Optional[int]:
+        now = time.monotonic()
+        with self._lock:
+            item = self._sessions.get(token)
+            if item is None:
+                return None
+            empresa_id, expires_at = item
+            if expires_at <= now:
+                self._drop(token)
+                return None
+            if expires_at - now < self.ttl - self.refresh_threshold:
+                self._sessions[token] = (empresa_id, now + self.ttl)
+                self._sessions.move_to_end(token)
+            return empresa_id
+
+    def revoke(self, token: str) -> None:
+        with self._lock:
+            self._drop(token)
+
+    def revoke_all(self, empresa_id: int) -> int:
+        now = time.monotonic()
+        with self._lock:
+            revoked = 0
+            for token in list(self._index.get(empresa_id, ())):
+                if self._sessions[token][1] > now:
+                    revoked += 1
+                self._drop(token)
+            return revoked
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+
+_STORES = {"redis": RedisSessionStore, "memory": MemorySessionStore}
+
+
+def get_store() -> SessionStore:
+    """Return the process-wide store selected by SESSION_STORE."""
+    global _store
+    if _store is None:
+        try:
+            _store = _STORES[SESSION_STORE]()
+        except KeyError:
+            raise RuntimeError(f"SESSION_STORE inválido: {SESSION_STORE!r} (use 'redis' ou 'memory')")
+    return _store
+
+
+def create_session(empresa_id: int) -> str:
+    """Create a session token pointing to `empresa_id`. Returns the token."""
+    return get_store().create(empresa_id)
+
+
+def get_session_empresa(token: str) -> Optional[int]:
+    """Return empresa_id associated with `token`, or None if not found/invalid."""
+    return get_store().get(token)
 
 
 def revoke_session(token: str) -> None:
-    """Remove a single session token."""
-    r = get_redis()
-    key = f"session:{token}"
-    try:
-        r.delete(key)
-    except Exception as e:
-        logger.exception("Failed to delete session %s: %s", key, e)
+    """Remove a single session token (and its index entry)."""
+    get_store().revoke(token)
 
 
 def revoke_all_sessions_for_empresa(empresa_id: int) -> int:
-    """Revoke all sessions for a given `empresa_id`.
+    """Revoke all sessions for a given `empresa_id`; returns how many were live."""
+    return get_store().revoke_all(empresa_id)
+
+
+def backfill_session_index(batch: int = _BATCH) -> int:
+    """One-off migration: index Redis sessions created before the per-empresa index.
 
-    Returns the number of revoked sessions.
-    Note: uses `SCAN` which is safe for production; avoid `KEYS`.
+    SCANs `session:*` once, resolves owners with pipelined GETs and SADDs the
+    tokens into their empresa's index. Safe to re-run. Returns the number of
+    sessions indexed.
     """
     r = get_redis()
-    pattern = "session:*"
-    revoked = 0
-    try:
-        for k in r.scan_iter(match=pattern):
+    indexed = 0
+    keys = []
+
+    def flush():
+        nonlocal indexed
+        pipe = r.pipeline(transaction=False)
+        for k in keys:
+            pipe.get(k)
+        owners = pipe.execute()
+        pipe = r.pipeline(transaction=False)
+        for k, owner in zip(keys, owners):
             try:
-                val = r.get(k)
-                if val and int(val) == empresa_id:
-                    r.delete(k)
-                    revoked += 1
-            except Exception:
-                # skip malformed values
-                continue
-    except Exception as e:
-        logger.exception("Error while revoking sessions for empresa %s: %s", empresa_id, e)
-    return revoked
+                empresa_id = int(owner)
+            except (TypeError, ValueError):
+                continue  # expired meanwhile or malformed
+            pipe.sadd(_index_key(empresa_id), k[len("session:"):])
+            indexed += 1
+        pipe.execute()
+        keys.clear()
+
+    for k in r.scan_iter(match="session:*", count=batch):
+        keys.append(k)
+        if len(keys) >= batch:
+            flush()
+    if keys:
+        flush()
+    return indexed
+
+
+def _invalidate(tokens: Iterable[str]) -> None:
+    """Drop `tokens` from this process's near-cache and tell the other processes."""
+    tokens = list(tokens)
+    if not tokens:
+        return
+    if _near_cache is not None:
+        for token in tokens:
+            _near_cache.delete(token)
+    try:
+        r = get_redis()
+        for i in range(0, len(tokens), _BATCH):
+            r.publish(INVALIDATION_CHANNEL, "\n".join(tokens[i:i + _BATCH]))
+    except Exception:
+        logger.warning("Could not publish session invalidation for %s token(s)", len(tokens))
+
+
+def _handle_invalidation(message) -> None:
+    if _near_cache is None or message.get("type") != "message":
+        return
+    for token in (message.get("data") or "").split("\n"):
+        _near_cache.delete(token)
+
+
+def _listen_for_invalidations() -> None:
+    while True:
+        try:
+            pubsub = get_redis().pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(INVALIDATION_CHANNEL)
+            # Poll instead of listen(): the client's socket_timeout would
+            # otherwise break an idle blocking read.
+            while True:
+                message = pubsub.get_message(timeout=1.0)
+                if message is not None:
+                    _handle_invalidation(message)
+        except Exception as e:
+            logger.warning("Session invalidation listener disconnected: %s", e)
+        # Invalidations may have been missed while disconnected.
+        if _near_cache is not None:
+            _near_cache.clear()
+        time.sleep(1.0)
+
+
+def _ensure_invalidation_listener() -> None:
+    global _listener
+    if _listener is not None:
+        return
+    with _listener_lock:
+        if _listener is None:
+            _listener = threading.Thread(target=_listen_for_invalidations, name="session-invalidation", daemon=True)
+            _listener.start()
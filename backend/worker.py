@@ -0,0 +1,115 @@
+"""
+Background worker for periodic jobs: `python -m backend.worker`.
+
+Runs as its own process (Procfile `worker`), so the jobs never compete with
+the API's request threads:
+
+- every WORKER_INTERVALO_SEGUNDOS: drain the reclassification queue;
+- once a day after WORKER_HORA_DIARIA (UTC): run the daily jobs in
+  `TAREFAS_DIARIAS`, each receiving the time of its previous run.
+
+Last runs are stored in `tarefas_execucao`, so a restarted or late worker
+resumes from where it stopped.
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import signal
+import threading
+from datetime import datetime, timezone
+from typing import Callable, Dict, Optional
+
+from sqlalchemy.orm import Session
+
+from backend import auth, database, models, reclassificacao
+
+logger = logging.getLogger("clientflow.worker")
+
+INTERVALO_SEGUNDOS = float(os.getenv("WORKER_INTERVALO_SEGUNDOS", "5"))
+HORA_DIARIA = int(os.getenv("WORKER_HORA_DIARIA", "3"))
+
+
+def _purgar_refresh_tokens(db: Session, desde: Optional[datetime], agora: datetime) -> int:
+    return auth.purge_refresh_tokens(db, now=agora)
+
+
+# nome -> job(db, desde, agora); `desde` is None on the very first run.
+TAREFAS_DIARIAS: Dict[str, Callable[[Session, Optional[datetime], datetime], int]] = {
+    "varredura_reclassificacao": reclassificacao.varredura,
+    "purga_refresh_tokens": _purgar_refresh_tokens,
+}
+
+
+def ultima_execucao(db: Session, nome: str) -> Optional[datetime]:
+    tarefa = db.get(models.TarefaExecucao, nome)
+    if tarefa is None:
+        return None
+    value = tarefa.ultima_execucao
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+
+def registrar_execucao(db: Session, nome: str, quando: datetime) -> None:
+    insert = database.dialect_insert(db)
+    stmt = insert(models.TarefaExecucao.__table__).values(nome=nome, ultima_execucao=quando)
+    db.execute(stmt.on_conflict_do_update(index_elements=["nome"], set_={"ultima_execucao": quando}))
+    db.commit()
+
+
+def _agendada_hoje(agora: datetime) -> datetime:
+    return agora.replace(hour=HORA_DIARIA, minute=0, second=0, microsecond=0)
+
+
+def executar_ciclo(db: Session, agora: Optional[datetime] = None) -> Dict[str, int]:
+    """Run one worker cycle and return how much each job did."""
+    agora = agora or datetime.now(timezone.utc)
+    resultado = {"reclassificados": 0}
+    while True:
+        processados = reclassificacao.processar_pendentes(db, agora=agora)
+        resultado["reclassificados"] += processados
+        if processados < reclassificacao.LOTE_PENDENTES:
+            break
+
+    agendada = _agendada_hoje(agora)
+    if agora >= agendada:
+        for nome, tarefa in TAREFAS_DIARIAS.items():
+            desde = ultima_execucao(db, nome)
+            if desde is not None and desde >= agendada:
+                continue
+            resultado[nome] = tarefa(db, desde, agora)
+            registrar_execucao(db, nome, agora)
+            logger.info("%s: %s", nome, resultado[nome])
+    return resultado
+
+
+def main():
+    p = argparse.ArgumentParser(description="ClientFlow background worker")
+    p.add_argument("--once", action="store_true", help="run a single cycle and exit")
+    args = p.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s %(message)s")
+
+    parar = threading.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, lambda *_: parar.set())
+
+    logger.info("Worker started (interval=%ss, daily jobs after %02d:00 UTC)", INTERVALO_SEGUNDOS, HORA_DIARIA)
+    while not parar.is_set():
+        db = database.SessionLocal()
+        try:
+            resultado = executar_ciclo(db)
+            if resultado["reclassificados"]:
+                logger.info("Reclassified %s clientes", resultado["reclassificados"])
+        except Exception:
+            db.rollback()
+            logger.exception("Worker cycle failed")
+        finally:
+            db.close()
+        if args.once:
+            break
+        parar.wait(INTERVALO_SEGUNDOS)
+    logger.info("Worker stopped")
+
+
+if __name__ == "__main__":
+    main()
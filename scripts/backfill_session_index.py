@@ -0,0 +1,23 @@
+#!/usr/bin/env python3
+"""
+Index Redis sessions created before the per-empresa session index existed.
+
+Run once after deploying; safe to re-run. Sessions created by the new code
+are indexed on creation.
+Usage:
+  python scripts/backfill_session_index.py
+"""
+import argparse
+from backend import sessions
+
+
+def main():
+    p = argparse.ArgumentParser(description="Backfill the per-empresa session index")
+    p.add_argument("--batch", type=int, default=500, help="Keys per SCAN/pipeline batch")
+    args = p.parse_args()
+    total = sessions.backfill_session_index(batch=args.batch)
+    print(f"session_index: {total} session(s) indexed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Offline load test of the AI provider path, using FakeProvider's injected latency.
+
+Sends `--requests` questions over `--distinct` different prompts with
+`--concurrency` callers. It compares two paths:
+
+- "sync": the previous path, a blocking respond() per caller on a pool of
+  `--threads` threads (the API's threadpool);
+- "async": respond_async, with timeout, AI_MAX_CONCURRENCY and
+  single-flight coalescing. The response cache is off so coalescing is
+  measured on its own.
+
+Reports req/s, p50/p95 latency, upstream calls and timeouts.
+Usage:
+  python scripts/bench_ai.py --requests 400 --concurrency 100 --distinct 10 --latency-ms 300
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from backend import ai_module
+
+
+class CountingFake(ai_module.FakeProvider):
+    calls = 0
+
+    def respond(self, prompt, max_tokens=128):
+        CountingFake.calls += 1
+        return super().respond(prompt, max_tokens)
+
+    async def _respond_async(self, prompt, max_tokens):
+        CountingFake.calls += 1
+        return await super()._respond_async(prompt, max_tokens)
+
+
+def _report(name, elapsed, latencies, total, extra):
+    latencies.sort()
+    p95 = latencies[max(0, int(len(latencies) * 0.95) - 1)]
+    print(f"{name:<6} {total / elapsed:8.1f} req/s  p50={statistics.median(latencies):8.1f} ms  p95={p95:8.1f} ms  {extra}")
+
+
+def run_sync(provider, prompts, threads):
+    CountingFake.calls = 0
+    latencies = []
+
+    def one(prompt):
+        start = time.perf_counter()
+        provider.respond(prompt)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(one, prompts))
+    _report("sync", time.perf_counter() - start, latencies, len(prompts), f"upstream={CountingFake.calls}")
+
+
+async def run_async(provider, prompts, concurrency, timeout):
+    CountingFake.calls = 0
+    before = ai_module.async_stats.snapshot().get("timeouts", 0)
+    latencies = []
+    remaining = iter(prompts)
+
+    async def worker():
+        for prompt in remaining:
+            start = time.perf_counter()
+            await provider.respond_async(prompt, timeout=timeout)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    timeouts = ai_module.async_stats.snapshot().get("timeouts", 0) - before
+    _report("async", time.perf_counter() - start, latencies, len(prompts), f"upstream={CountingFake.calls} timeouts={timeouts}")
+
+
+def main():
+    p = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument("--requests", type=int, default=400)
+    p.add_argument("--concurrency", type=int, default=100)
+    p.add_argument("--distinct", type=int, default=10, help="Number of different prompts")
+    p.add_argument("--latency-ms", type=float, default=300)
+    p.add_argument("--jitter-ms", type=float, default=100)
+    p.add_argument("--threads", type=int, default=40, help="Threadpool size for the sync path")
+    p.add_argument("--timeout", type=float, default=ai_module.AI_TIMEOUT)
+    args = p.parse_args()
+
+    provider = CountingFake(latency=args.latency_ms / 1000, jitter=args.jitter_ms / 1000)
+    prompts = [f"Dados da empresa: ...\nPergunta: {i % args.distinct}\nResposta:" for i in range(args.requests)]
+    print(f"{args.requests} requests, {args.distinct} distinct prompts, latency {args.latency_ms:.0f}+{args.jitter_ms:.0f} ms, "
+          f"AI_MAX_CONCURRENCY={ai_module.AI_MAX_CONCURRENCY}")
+    run_sync(provider, prompts, args.threads)
+    asyncio.run(run_async(provider, prompts, args.concurrency, args.timeout))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Scalar vs batch (NumPy, backend.ai_lote) client scoring: analisar_cliente / sugerir_acoes.
+
+Generates `--clientes` synthetic clientes with 0-15 atendimentos each, then
+times the per-cliente functions on lists of dicts and the columnar batch
+versions. The columns (count + last epoch day) are what a grouped SQL query
+returns. Checks that both paths give the same labels.
+Usage:
+  python scripts/bench_ai_lote.py --clientes 100000
+"""
+import argparse
+import random
+import time
+from datetime import date, timedelta
+
+import numpy as np
+
+from backend import ai_lote, ai_module
+
+
+def main():
+    p = argparse.ArgumentParser(description="Benchmark batch client scoring")
+    p.add_argument("--clientes", type=int, default=100_000)
+    p.add_argument("--seed", type=int, default=1)
+    args = p.parse_args()
+
+    rng = random.Random(args.seed)
+    hoje = date.today()
+    clientes = []
+    for i in range(args.clientes):
+        atend = [{"data": (hoje - timedelta(days=rng.randint(0, 400))).isoformat()} for _ in range(rng.randint(0, 15))]
+        clientes.append({"id": i, "nome": f"Cliente {i}", "atendimentos": atend})
+    ids = np.arange(args.clientes)
+    total = np.array([len(c["atendimentos"]) for c in clientes])
+    ultimo = ai_lote.dias_epoch([max((a["data"] for a in c["atendimentos"]), default=None) for c in clientes])
+
+    t = time.perf_counter()
+    status = [ai_module.analisar_cliente(c["atendimentos"]) for c in clientes]
+    for c, s in zip(clientes, status):
+        c["status_ia_cliente"] = s
+    sugestoes = ai_module.sugerir_acoes(clientes)
+    escalar = time.perf_counter() - t
+
+    t = time.perf_counter()
+    status_lote = ai_lote.analisar_clientes_lote(total, ultimo)
+    sugeridos, sugestoes_lote = ai_lote.sugerir_acoes_lote(ids, total, ultimo, status=status_lote)
+    lote = time.perf_counter() - t
+
+    assert status_lote.tolist() == status
+    assert sugestoes_lote.tolist() == [s["sugestao"] for s in sugestoes]
+    print(f"{args.clientes} clientes, {int(total.sum())} atendimentos, {len(sugeridos)} sugestões")
+    print(f"  escalar: {escalar * 1000:9.1f} ms")
+    print(f"  lote:    {lote * 1000:9.1f} ms  ({escalar / lote:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Benchmark the dashboard analytics queries on a seeded dataset.
+
+Compares the previous six-query implementation ("before") with the single
+round-trip conditional-aggregation query over the raw tables and with the
+daily rollup read.
+Usage:
+  python scripts/bench_analytics.py --clientes 5000 --atendimentos 50000
+  python scripts/bench_analytics.py --database-url postgresql+psycopg2://... --runs 50
+
+Without --database-url a throwaway SQLite file is used. Round trips cost far
+more on a pooled/remote PostgreSQL, so run against one for realistic numbers.
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, func
+from sqlalchemy.orm import sessionmaker
+
+from backend import dashboard_analytics, models, rollups
+from backend.analytics import get_date_range
+
+
+def six_query_analytics(db, empresa_id, dr):
+    """The pre-rework implementation: one round trip per metric and series."""
+    A, C = models.Atendimento, models.Cliente
+    appt_range = lambda start, end: (A.empresa_id == empresa_id, A.data_atendimento >= start, A.data_atendimento < end)
+    client_range = lambda start, end: (C.empresa_id == empresa_id, C.data_primeiro_contato >= start, C.data_primeiro_contato < end)
+
+    cur = db.query(func.count(A.id), func.coalesce(func.sum(A.valor_centavos), 0)).filter(*appt_range(dr.start_date, dr.end_date)).one()
+    prev = db.query(func.count(A.id), func.coalesce(func.sum(A.valor_centavos), 0)).filter(*appt_range(dr.start_date_previous, dr.end_date_previous)).one()
+    clients_cur = db.query(func.count(C.id)).filter(*client_range(dr.start_date, dr.end_date)).scalar()
+    clients_prev = db.query(func.count(C.id)).filter(*client_range(dr.start_date_previous, dr.end_date_previous)).scalar()
+    appt_day = func.date(A.data_atendimento)
+    revenue_series = db.query(appt_day, func.sum(A.valor_centavos)).filter(*appt_range(dr.start_date, dr.end_date)).group_by(appt_day).order_by(appt_day).all()
+    client_day = func.date(C.data_primeiro_contato)
+    clients_series = db.query(client_day, func.count(C.id)).filter(*client_range(dr.start_date, dr.end_date)).group_by(client_day).order_by(client_day).all()
+    return cur, prev, clients_cur, clients_prev, revenue_series, clients_series
+
+
+def seed(db, n_clientes, n_atendimentos, days=120):
+    rnd = random.Random(42)
+    now = datetime.now()
+    empresa = models.Empresa(nome_empresa="Bench", nicho="bench", email_login=f"bench-{time.time()}@example.com", senha_hash="x")
+    db.add(empresa)
+    db.commit()
+    clientes = [
+        {
+            "empresa_id": empresa.id,
+            "nome": f"Cliente {i}",
+            "telefone": f"119{i:08d}",
+            "data_primeiro_contato": now - timedelta(minutes=rnd.randint(0, days * 24 * 60)),
+        }
+        for i in range(n_clientes)
+    ]
+    db.execute(models.Cliente.__table__.insert(), clientes)
+    ids = [r[0] for r in db.query(models.Cliente.id).filter(models.Cliente.empresa_id == empresa.id)]
+    atendimentos = []
+    for _ in range(n_atendimentos):
+        valor = rnd.randint(2000, 50000)
+        atendimentos.append({
+            "empresa_id": empresa.id,
+            "cliente_id": rnd.choice(ids),
+            "tipo_servico": "Revisão",
+            "valor_cobrado": f"{valor / 100:.2f}".replace(".", ","),
+            "valor_centavos": valor,
+            "data_atendimento": now - timedelta(minutes=rnd.randint(0, days * 24 * 60)),
+        })
+    db.execute(models.Atendimento.__table__.insert(), atendimentos)
+    db.commit()
+    rollups.rebuild_rollups(db, empresa_id=empresa.id)
+    return empresa.id
+
+
+def timed(fn, runs):
+    samples = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.95) - 1]
+
+
+def main():
+    p = argparse.ArgumentParser(description="Dashboard analytics latency benchmark")
+    p.add_argument("--database-url", default=None)
+    p.add_argument("--clientes", type=int, default=5000)
+    p.add_argument("--atendimentos", type=int, default=50000)
+    p.add_argument("--runs", type=int, default=30)
+    p.add_argument("--period", default="30d")
+    args = p.parse_args()
+
+    url = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+    engine = create_engine(url)
+    models.Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+
+    empresa_id = seed(db, args.clientes, args.atendimentos)
+    dr = get_date_range(args.period)
+    print(f"{engine.dialect.name}: {args.clientes} clientes, {args.atendimentos} atendimentos, period={args.period}, runs={args.runs}")
+
+    cases = [
+        ("before: six queries", lambda: six_query_analytics(db, empresa_id, dr)),
+        ("after: single-pass raw", lambda: dashboard_analytics.analytics_from_raw(db, empresa_id, dr)),
+        ("after: rollup", lambda: dashboard_analytics.analytics_from_rollups(db, empresa_id, dr)),
+    ]
+    for label, fn in cases:
+        fn()  # warm-up
+        p50, p95 = timed(fn, args.runs)
+        print(f"  {label:<24} p50={p50:8.2f} ms  p95={p95:8.2f} ms")
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
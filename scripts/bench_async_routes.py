@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Load-test the hot endpoints of a running API to compare sync and async routes.
+
+Start the API twice, once per mode, and run this against each:
+  ASYNC_DB_ROUTES=false gunicorn ... backend.main:app
+  ASYNC_DB_ROUTES=true  gunicorn ... backend.main:app
+Usage:
+  python scripts/bench_async_routes.py --base-url http://localhost:8000 \\
+      --email oficina@example.com --senha Senha123 --concurrency 100 --requests 5000
+
+Reports requests/sec and p50/p95 latency per path. Use a PostgreSQL-backed
+deployment for meaningful numbers: the gain comes from not holding a worker
+thread while waiting on the database.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+DEFAULT_PATHS = ("/api/clientes?limit=50", "/api/atendimentos?limit=50", "/api/dashboard/analytics?period=30d")
+
+
+async def hammer(client, path, headers, total, concurrency):
+    latencies = []
+    remaining = iter(range(total))
+
+    async def worker():
+        for _ in remaining:
+            start = time.perf_counter()
+            response = await client.get(path, headers=headers)
+            response.raise_for_status()
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return total / elapsed, statistics.median(latencies), latencies[int(len(latencies) * 0.95) - 1]
+
+
+async def main_async(args):
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=60) as client:
+        login = await client.post("/api/empresas/login", json={"email_login": args.email, "senha": args.senha})
+        login.raise_for_status()
+        headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+        print(f"{args.base_url}: {args.requests} requests per path, concurrency={args.concurrency}")
+        for path in args.paths or DEFAULT_PATHS:
+            await hammer(client, path, headers, min(args.concurrency, args.requests), args.concurrency)  # warm-up
+            rps, p50, p95 = await hammer(client, path, headers, args.requests, args.concurrency)
+            print(f"  {path:<40} {rps:8.0f} req/s  p50={p50:7.2f} ms  p95={p95:7.2f} ms")
+
+
+def main():
+    p = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument("--base-url", default="http://localhost:8000")
+    p.add_argument("--email", required=True)
+    p.add_argument("--senha", required=True)
+    p.add_argument("--concurrency", type=int, default=50)
+    p.add_argument("--requests", type=int, default=2000)
+    p.add_argument("--path", dest="paths", action="append", help="repeatable; defaults to the hot read endpoints")
+    asyncio.run(main_async(p.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark of the JWT middleware overhead (requests/sec, in-process).
+
+Compares the previous `@app.middleware("http")` implementation, which decoded
+the token in a BaseHTTPMiddleware and again in the auth dependency ("before"),
+with the raw ASGI JWTClaimsMiddleware whose claims the dependency reuses
+("after"). The app is called directly over ASGI, so the numbers isolate
+middleware + JWT cost from the network and the database.
+Usage:
+  python scripts/bench_auth_middleware.py --requests 20000
+"""
+import argparse
+import asyncio
+import time
+
+from fastapi import Depends, FastAPI, Request
+from fastapi.security import OAuth2PasswordBearer
+
+from backend import auth
+from backend.middleware import JWTClaimsMiddleware
+
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/login")
+
+
+def build_before() -> FastAPI:
+    app = FastAPI()
+
+    @app.middleware("http")
+    async def inject_empresa_id_jwt(request: Request, call_next):
+        auth_header = request.headers.get("authorization")
+        if auth_header and auth_header.lower().startswith("bearer "):
+            try:
+                payload = auth.jwt.decode(auth_header.split()[1], auth.SECRET_KEY, algorithms=[auth.ALGORITHM])
+                if payload.get("sub"):
+                    request.state.empresa_id = payload["sub"]
+            except Exception:
+                pass
+        return await call_next(request)
+
+    def empresa_id(token: str = Depends(oauth2_scheme)) -> int:
+        payload = auth.jwt.decode(token, auth.SECRET_KEY, algorithms=[auth.ALGORITHM])
+        return int(payload["sub"])
+
+    @app.get("/me")
+    def me(eid: int = Depends(empresa_id)):
+        return {"id": eid}
+
+    return app
+
+
+def build_after() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(JWTClaimsMiddleware)
+
+    def empresa_id(request: Request, token: str = Depends(oauth2_scheme)) -> int:
+        claims = request.state.jwt_claims if getattr(request.state, "jwt_token", None) == token else None
+        return auth.empresa_id_from_token(token, claims)
+
+    @app.get("/me")
+    def me(eid: int = Depends(empresa_id)):
+        return {"id": eid}
+
+    return app
+
+
+async def run(app, token: str, n: int) -> float:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/me",
+        "raw_path": b"/me",
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"bench"), (b"authorization", f"Bearer {token}".encode())],
+        "client": ("127.0.0.1", 1),
+        "server": ("bench", 80),
+    }
+
+    async def receive():
+        if not body_sent[0]:
+            body_sent[0] = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        # BaseHTTPMiddleware keeps listening for a disconnect until the
+        # response is sent; block like a real server would.
+        await asyncio.Event().wait()
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            assert message["status"] == 200, message
+
+    start = time.perf_counter()
+    for _ in range(n):
+        body_sent = [False]
+        await app(dict(scope, state={}), receive, send)
+    return n / (time.perf_counter() - start)
+
+
+def main():
+    p = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument("--requests", type=int, default=10000)
+    args = p.parse_args()
+
+    token = auth.create_access_token({"sub": 1})
+    print(f"{args.requests} requests per case")
+    for label, build in (("before: http middleware", build_before), ("after: ASGI middleware", build_after)):
+        app = build()
+        asyncio.run(run(app, token, 200))  # warm-up
+        rps = asyncio.run(run(app, token, args.requests))
+        print(f"  {label:<24} {rps:10.0f} req/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Login throughput under concurrency, and what a login burst does to other requests.
+
+Fires `--requests` logins at `--concurrency` while a single probe keeps
+calling /health, then reports logins/sec and the probe's p50/p95 latency.
+Start the API once per configuration and run this against each, e.g.:
+  PASSWORD_HASH_WORKERS=0 uvicorn backend.main:app     # inline bcrypt (old behaviour)
+  PASSWORD_HASH_WORKERS=4 uvicorn backend.main:app     # process pool
+Usage:
+  python scripts/bench_login.py --base-url http://localhost:8000 \\
+      --email oficina@example.com --senha Senha123 --concurrency 32 --requests 200
+
+Logins/sec scales with the pool size up to the number of cores. The probe
+latency shows whether hashing starves the rest of the API.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+
+async def logins(client, body, total, concurrency):
+    remaining = iter(range(total))
+
+    async def worker():
+        for _ in remaining:
+            response = await client.post("/api/empresas/login", json=body)
+            response.raise_for_status()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return total / (time.perf_counter() - start)
+
+
+async def probe(client, stop, latencies):
+    while not stop.is_set():
+        start = time.perf_counter()
+        (await client.get("/health")).raise_for_status()
+        latencies.append((time.perf_counter() - start) * 1000)
+        await asyncio.sleep(0.01)
+
+
+async def main_async(args):
+    limits = httpx.Limits(max_connections=args.concurrency + 1, max_keepalive_connections=args.concurrency + 1)
+    body = {"email_login": args.email, "senha": args.senha}
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=120) as client:
+        await logins(client, body, args.concurrency, args.concurrency)  # warm-up (starts the pool)
+        stop, latencies = asyncio.Event(), []
+        probe_task = asyncio.create_task(probe(client, stop, latencies))
+        rate = await logins(client, body, args.requests, args.concurrency)
+        stop.set()
+        await probe_task
+    latencies.sort()
+    p95 = latencies[max(0, int(len(latencies) * 0.95) - 1)]
+    print(f"{args.base_url}: {args.requests} logins, concurrency={args.concurrency}")
+    print(f"  login   {rate:8.1f} logins/s")
+    print(f"  /health p50={statistics.median(latencies):8.2f} ms  p95={p95:8.2f} ms  (n={len(latencies)})")
+
+
+def main():
+    p = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument("--base-url", default="http://localhost:8000")
+    p.add_argument("--email", required=True)
+    p.add_argument("--senha", required=True)
+    p.add_argument("--concurrency", type=int, default=32)
+    p.add_argument("--requests", type=int, default=200)
+    asyncio.run(main_async(p.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
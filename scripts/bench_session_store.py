@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Latency of the session store backends (create / get / revoke).
+
+Runs the same workload against MemorySessionStore and, when REDIS_URL is
+reachable, RedisSessionStore, and prints p50/p99 per operation in
+microseconds. The near-cache is left as configured by the environment.
+Usage:
+  python scripts/bench_session_store.py --sessions 2000 --lookups 20
+"""
+import argparse
+import random
+import statistics
+import time
+
+from backend import sessions
+from backend.redis_client import get_redis
+
+
+def _timed(samples, fn, *args):
+    t = time.perf_counter()
+    result = fn(*args)
+    samples.append((time.perf_counter() - t) * 1e6)
+    return result
+
+
+def _report(name, op, samples):
+    samples.sort()
+    p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+    print(f"{name:<7} {op:<7} n={len(samples):<7} p50={statistics.median(samples):8.1f}us  p99={p99:8.1f}us")
+
+
+def run(name, store, n_sessions, lookups, empresas):
+    creates, gets, revokes = [], [], []
+    tokens = [_timed(creates, store.create, random.randint(1, empresas)) for _ in range(n_sessions)]
+    for _ in range(n_sessions * lookups):
+        _timed(gets, store.get, random.choice(tokens))
+    for token in tokens:
+        _timed(revokes, store.revoke, token)
+    _report(name, "create", creates)
+    _report(name, "get", gets)
+    _report(name, "revoke", revokes)
+
+
+def main():
+    p = argparse.ArgumentParser(description="Compare session store backends")
+    p.add_argument("--sessions", type=int, default=2000)
+    p.add_argument("--lookups", type=int, default=20, help="Lookups per session")
+    p.add_argument("--empresas", type=int, default=50)
+    args = p.parse_args()
+
+    run("memory", sessions.MemorySessionStore(), args.sessions, args.lookups, args.empresas)
+    try:
+        get_redis().ping()
+    except Exception as e:
+        print(f"redis   skipped ({e})")
+        return
+    run("redis", sessions.RedisSessionStore(), args.sessions, args.lookups, args.empresas)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+Delete expired, revoked and long-rotated refresh tokens in bounded batches.
+
+The background worker runs the same purge daily (`purga_refresh_tokens`);
+use this for a one-off cleanup or from cron when the worker is not deployed.
+Usage:
+  python scripts/purge_refresh_tokens.py --batch 1000 --grace-days 7
+"""
+import argparse
+from datetime import timedelta
+
+from backend import auth, database
+
+
+def main():
+    p = argparse.ArgumentParser(description="Purge unusable refresh tokens")
+    p.add_argument("--batch", type=int, default=auth.REFRESH_TOKEN_PURGE_BATCH, help="Rows deleted per transaction")
+    p.add_argument(
+        "--grace-days",
+        type=int,
+        default=auth.REFRESH_TOKEN_ROTATION_GRACE_DAYS,
+        help="Keep rotated tokens this long after their successor was issued",
+    )
+    args = p.parse_args()
+    db = database.SessionLocal()
+    try:
+        total = auth.purge_refresh_tokens(db, batch_size=args.batch, grace=timedelta(days=args.grace_days))
+    finally:
+        db.close()
+    print(f"refresh_tokens: {total} row(s) purged")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,26 @@
+#!/usr/bin/env python3
+"""
+Rebuild the per-empresa daily analytics rollup (`analytics_diario`) from the
+raw `atendimentos` and `clientes` tables.
+Usage:
+  python scripts/rebuild_rollups.py                 # every empresa
+  python scripts/rebuild_rollups.py --empresa-id 42 # a single empresa
+"""
+import argparse
+from backend import database, rollups
+
+
+def main():
+    p = argparse.ArgumentParser(description="Rebuild analytics_diario rollups")
+    p.add_argument("--empresa-id", type=int, default=None, help="Only rebuild this empresa")
+    args = p.parse_args()
+    db = database.SessionLocal()
+    try:
+        total = rollups.rebuild_rollups(db, empresa_id=args.empresa_id)
+    finally:
+        db.close()
+    print(f"analytics_diario: {total} row(s) rebuilt")
+
+
+if __name__ == "__main__":
+    main()
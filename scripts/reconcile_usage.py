@@ -0,0 +1,25 @@
+#!/usr/bin/env python3
+"""
+Recount per-empresa usage (`uso_empresa`) from the clientes/atendimentos tables.
+Usage:
+  python scripts/reconcile_usage.py                 # every empresa
+  python scripts/reconcile_usage.py --empresa-id 42 # a single empresa
+"""
+import argparse
+from backend import database, plan_limits
+
+
+def main():
+    p = argparse.ArgumentParser(description="Reconcile plan usage counters")
+    p.add_argument("--empresa-id", type=int, default=None, help="Only reconcile this empresa")
+    args = p.parse_args()
+    db = database.SessionLocal()
+    try:
+        total = plan_limits.reconcile_usage(db, empresa_id=args.empresa_id)
+    finally:
+        db.close()
+    print(f"uso_empresa: {total} empresa(s) reconciled")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+# anyio ships a pytest plugin, so pytest rewrites its modules on import. Load
+# the asyncio backend here, on the main thread: compiling it lazily inside the
+# TestClient portal thread trips a CPython 3.11 AST recursion-depth bug.
+import anyio._backends._asyncio  # noqa: F401
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from backend import auth, database, models
+from backend.database import Base as DBBase
+from backend.dependencies import require_authenticated_empresa
+
+
+@pytest.fixture
+def db():
+    engine = create_engine(
+        "sqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    DBBase.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+    session = Session()
+    try:
+        yield session
+    finally:
+        session.close()
+        engine.dispose()
+
+
+@pytest.fixture
+def empresa(db):
+    empresa = models.Empresa(
+        nome_empresa="Oficina Teste",
+        nicho="Mecânica",
+        email_login="oficina@example.com",
+        senha_hash=auth.get_password_hash("Senha123"),
+    )
+    db.add(empresa)
+    db.commit()
+    db.refresh(empresa)
+    return empresa
+
+
+@pytest.fixture
+def make_client(db, empresa):
+    """Build a TestClient for the given routers, authenticated as `empresa`."""
+
+    def _make(*routers):
+        app = FastAPI()
+        for router in routers:
+            app.include_router(router)
+        app.dependency_overrides[database.get_db] = lambda: db
+        app.dependency_overrides[require_authenticated_empresa] = lambda: empresa
+        return TestClient(app)
+
+    return _make
@@ -0,0 +1,102 @@
+import asyncio
+import time
+
+from backend import ai_module, cache
+
+
+class CountingFake(ai_module.FakeProvider):
+    def __init__(self, latency=0.05):
+        super().__init__(latency=latency)
+        self.calls = 0
+        self.running = 0
+        self.max_running = 0
+
+    async def _respond_async(self, prompt, max_tokens):
+        self.calls += 1
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        try:
+            return await super()._respond_async(prompt, max_tokens)
+        finally:
+            self.running -= 1
+
+
+def _gather(provider, prompts, timeout=None):
+    async def run():
+        return await asyncio.gather(*(provider.respond_async(p, timeout=timeout) for p in prompts))
+    return asyncio.run(run())
+
+
+def test_identical_concurrent_prompts_share_one_upstream_call():
+    provider = CountingFake()
+    respostas = _gather(provider, ["mesma pergunta"] * 20 + ["outra"] * 5)
+    assert provider.calls == 2
+    assert len(set(respostas[:20])) == 1 and respostas[0] != respostas[-1]
+
+
+def test_upstream_concurrency_is_capped(monkeypatch):
+    monkeypatch.setattr(ai_module, "AI_MAX_CONCURRENCY", 3)
+    provider = CountingFake(latency=0.02)
+    _gather(provider, [f"pergunta {i}" for i in range(12)])
+    assert provider.calls == 12 and provider.max_running == 3
+
+
+def test_slow_upstream_times_out():
+    before = ai_module.async_stats.snapshot().get("timeouts", 0)
+    provider = CountingFake(latency=0.5)
+    assert _gather(provider, ["lenta", "lenta"], timeout=0.05) == [None, None]
+    assert ai_module.async_stats.snapshot()["timeouts"] == before + 2
+
+
+def test_sync_only_provider_and_cache_on_the_async_path():
+    class SyncOnly(ai_module.BaseAIProvider):
+        name, model, cacheable = "sync", "s1", True
+        calls = 0
+
+        def respond(self, prompt, max_tokens=128):
+            SyncOnly.calls += 1
+            return prompt.upper()
+
+    provider = ai_module.CachedProvider(SyncOnly(), redis_tier=False)
+    assert _gather(provider, ["abc"]) == ["ABC"]
+    assert _gather(provider, ["abc"]) == ["ABC"]
+    assert SyncOnly.calls == 1 and provider.stats.snapshot()["hits"] == 1
+
+
+def test_fake_provider_is_selected_by_env(monkeypatch):
+    monkeypatch.setenv("AI_PROVIDER", "fake")
+    monkeypatch.setenv("AI_FAKE_LATENCY_MS", "10")
+    provider = ai_module.get_provider()
+    assert isinstance(provider, ai_module.FakeProvider) and provider.latency == 0.01
+
+
+def test_stalled_redis_tier_does_not_block_the_event_loop(monkeypatch):
+    class StalledRedis:
+        def __init__(self):
+            self.data = {}
+
+        def get(self, key):
+            time.sleep(0.3)
+            return self.data.get(key)
+
+        def set(self, key, value, ex=None):
+            time.sleep(0.3)
+            self.data[key] = value
+
+    redis = StalledRedis()
+    monkeypatch.setattr(cache, "_redis_down_until", 0.0)
+    monkeypatch.setattr(cache, "get_redis", lambda: redis)
+    provider = ai_module.CachedProvider(CountingFake(latency=0.01), redis_tier=True)
+
+    async def run():
+        ticks = 0
+        tarefa = asyncio.ensure_future(provider.respond_async("pergunta"))
+        while not tarefa.done():
+            await asyncio.sleep(0.01)
+            ticks += 1
+        return await tarefa, ticks
+
+    resposta, ticks = asyncio.run(run())
+    assert resposta is not None and list(redis.data.values()) == [resposta]
+    # GET + SET stall for 0.6 s; the loop kept ticking meanwhile.
+    assert ticks >= 20
@@ -0,0 +1,79 @@
+import pytest
+
+from backend import ai_module, cache
+
+
+class CountingProvider(ai_module.BaseAIProvider):
+    name = "fake"
+    model = "m1"
+    cacheable = True
+
+    def __init__(self, answer="ok"):
+        self.calls = 0
+        self.answer = answer
+
+    def respond(self, prompt, max_tokens=128):
+        self.calls += 1
+        return self.answer
+
+
+class FakeRedis:
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value
+
+
+@pytest.fixture(autouse=True)
+def _redis_up(monkeypatch):
+    monkeypatch.setattr(cache, "_redis_down_until", 0.0)
+
+
+def test_repeated_prompts_hit_the_cache():
+    inner = CountingProvider()
+    provider = ai_module.CachedProvider(inner, redis_tier=False)
+    assert provider.respond("Pergunta: resumo\n") == "ok"
+    assert provider.respond("Pergunta: resumo  \r\n") == "ok"  # same prompt once normalized
+    provider.respond("Pergunta: resumo", max_tokens=512)  # different budget, different key
+    assert inner.calls == 2
+    stats = provider.stats.snapshot()
+    assert stats["hits"] == 1 and stats["misses"] == 2 and stats["hit_rate"] == pytest.approx(1 / 3, abs=1e-4)
+
+
+def test_indentation_is_part_of_the_key():
+    inner = CountingProvider()
+    provider = ai_module.CachedProvider(inner, redis_tier=False)
+    provider.respond("def f():\n    return 1")
+    provider.respond("def f():\nreturn 1")
+    assert inner.calls == 2
+
+
+def test_failures_are_not_cached():
+    inner = CountingProvider(answer=None)
+    provider = ai_module.CachedProvider(inner, redis_tier=False)
+    assert provider.respond("x") is None
+    assert provider.respond("x") is None
+    assert inner.calls == 2
+
+
+def test_redis_tier_is_shared_between_workers(monkeypatch):
+    fake = FakeRedis()
+    monkeypatch.setattr(cache, "shared_redis", lambda: fake)
+    inner_a, inner_b = CountingProvider(), CountingProvider()
+    a = ai_module.CachedProvider(inner_a, redis_tier=True)
+    b = ai_module.CachedProvider(inner_b, redis_tier=True)
+    assert a.respond("mesma pergunta") == b.respond("mesma pergunta") == "ok"
+    assert (inner_a.calls, inner_b.calls) == (1, 0)
+    assert b.stats.snapshot()["redis_hits"] == 1
+    assert all(k.startswith("ai:resp:fake:m1:128:") for k in fake.data)
+
+
+def test_local_provider_is_not_wrapped(monkeypatch):
+    monkeypatch.setattr(ai_module, "_PROVIDER", None)
+    monkeypatch.setenv("AI_PROVIDER", "local")
+    assert isinstance(ai_module._get_provider_singleton(), ai_module.LocalProvider)
+    assert ai_module.cache_stats()["enabled"] is False
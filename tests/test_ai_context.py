@@ -0,0 +1,61 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from backend import ai_context, ai_module, cache, models, rollups
+
+AGORA = datetime(2026, 6, 1, 12, 0)
+
+
+@pytest.fixture
+def dados(db, empresa):
+    for i in range(15):
+        cliente = models.Cliente(empresa_id=empresa.id, nome=f"Cliente {i:02d}", telefone=f"119000000{i:02d}", status_cliente="ativo" if i % 3 else "inativo")
+        db.add(cliente)
+        db.flush()
+        for d in range(i):
+            db.add(models.Atendimento(
+                empresa_id=empresa.id, cliente_id=cliente.id, tipo_servico="Revisão",
+                data_atendimento=AGORA - timedelta(days=10 * d + i),
+            ))
+    rollups.registrar(db, empresa.id, date(2026, 5, 20), atendimentos=2, receita_centavos=15050)
+    rollups.registrar(db, empresa.id, date(2026, 4, 10), atendimentos=1, receita_centavos=5000)
+    db.commit()
+    return empresa
+
+
+def test_context_is_an_sql_summary(db, dados):
+    texto = ai_context.montar_contexto(db, dados.id, max_tokens=2000, agora=AGORA)
+    assert "Total de clientes: 15" in texto
+    assert "Atendimentos: 105" in texto
+    assert "Clientes por status: ativo: 10, inativo: 5" in texto
+    assert f"Clientes: {['Cliente %02d' % i for i in range(14, 4, -1)]}" in texto
+    assert "- Cliente 14: 14, 2026-05-18" in texto
+    assert "Atendimentos recentes:\n- 2026-05-31 Cliente 01: Revisão" in texto
+    assert "últimos 30 dias: R$ 150,50 em 2 atendimento(s)" in texto
+    assert "60-90 dias: R$ 0,00" in texto and "30-60 dias: R$ 50,00 em 1" in texto
+
+
+def test_context_respects_the_token_budget(db, dados):
+    texto = ai_context.montar_contexto(db, dados.id, max_tokens=120, agora=AGORA)
+    assert ai_context.estimar_tokens(texto) <= 120
+    assert "Total de clientes: 15" in texto and "Atendimentos recentes" not in texto
+
+
+def test_context_is_cached_per_tenant_until_a_write(db, dados, monkeypatch):
+    monkeypatch.setattr(cache, "shared_redis", lambda: None)
+    cache._local_values.clear()
+    calls = []
+    original = ai_context.montar_contexto
+    monkeypatch.setattr(ai_context, "montar_contexto", lambda *a, **k: calls.append(1) or original(*a, **k))
+    assert ai_context.contexto_empresa(db, dados.id) == ai_context.contexto_empresa(db, dados.id)
+    assert len(calls) == 1
+    cache.bump_tenant_version(dados.id)
+    ai_context.contexto_empresa(db, dados.id)
+    assert len(calls) == 2
+
+
+def test_local_provider_reads_the_summary(db, dados):
+    texto = ai_context.montar_contexto(db, dados.id, agora=AGORA)
+    resposta = ai_module.LocalProvider().respond(f"Dados da empresa:\n{texto}\nPergunta: resumo\nResposta:")
+    assert resposta == "Modo local: detectados 15 cliente(s) e 105 atendimento(s)."
@@ -0,0 +1,63 @@
+import random
+import subprocess
+import sys
+from datetime import date, timedelta
+
+import numpy as np
+
+from backend import ai_lote, ai_module
+
+
+def _clientes(n, seed=7):
+    rng = random.Random(seed)
+    hoje = date.today()
+    clientes = []
+    for i in range(n):
+        atend = []
+        for _ in range(rng.choice([0, 1, 2, 5, 11, 15])):
+            if rng.random() < 0.05:
+                atend.append({"tipo": "sem data"})
+            else:
+                atend.append({"data": (hoje - timedelta(days=rng.randint(-3, 400))).isoformat()})
+        # Hit the thresholds exactly as well.
+        if i % 7 == 0 and atend:
+            atend[0] = {"data": (hoje - timedelta(days=rng.choice([29, 30, 60, 61, 120, 121, 180, 181]))).isoformat()}
+        clientes.append({"id": i, "nome": f"Cliente {i}", "atendimentos": atend})
+    return clientes
+
+
+def _colunas(clientes):
+    total = [len(c["atendimentos"]) for c in clientes]
+    ultimas = [max((a["data"] for a in c["atendimentos"] if "data" in a), default=None) for c in clientes]
+    return np.array([c["id"] for c in clientes]), np.array(total), ai_lote.dias_epoch(ultimas)
+
+
+def test_batch_status_matches_scalar():
+    clientes = _clientes(3000)
+    _ids, total, ultimo = _colunas(clientes)
+    lote = ai_lote.analisar_clientes_lote(total, ultimo)
+    esperado = [ai_module.analisar_cliente(c["atendimentos"]) for c in clientes]
+    assert lote.tolist() == esperado
+    assert set(esperado) == {"Cliente novo", "Cliente inativo", "Cliente importante", "Cliente frequente", "Cliente ativo"}
+
+
+def test_batch_suggestions_match_scalar():
+    clientes = _clientes(3000, seed=11)
+    ids, total, ultimo = _colunas(clientes)
+    status = ai_lote.analisar_clientes_lote(total, ultimo)
+    for c, s in zip(clientes, status):
+        c["status_ia_cliente"] = s
+    sugeridos, sugestoes = ai_lote.sugerir_acoes_lote(ids, total, ultimo, status=status)
+    esperado = ai_module.sugerir_acoes(clientes)
+    assert [{"cliente": f"Cliente {i}", "sugestao": s} for i, s in zip(sugeridos.tolist(), sugestoes.tolist())] == esperado
+    assert "Cliente importante parado" in sugestoes
+
+
+def test_dias_epoch_handles_missing_dates():
+    dias = ai_lote.dias_epoch(["1970-01-02", None, ""])
+    assert dias[0] == 1 and np.isnan(dias[1]) and np.isnan(dias[2])
+
+
+def test_ai_module_does_not_need_numpy():
+    code = "import sys, backend.ai_module; sys.exit('numpy' in sys.modules)"
+    assert subprocess.run([sys.executable, "-c", code]).returncode == 0
@@ -0,0 +1,60 @@
+from datetime import datetime, timedelta
+
+from backend import dashboard_analytics, models
+from backend.analytics import brl_to_centavos, centavos_to_reais, get_date_range
+
+
+def test_brl_to_centavos_formats():
+    assert brl_to_centavos("R$ 1.234,56") == 123456
+    assert brl_to_centavos("1234.56") == 123456
+    assert brl_to_centavos("80,5") == 8050
+    assert brl_to_centavos(150) == 15000
+    assert brl_to_centavos(None) is None
+    assert brl_to_centavos("  ") is None
+    assert centavos_to_reais(123456) == 1234.56
+    assert centavos_to_reais(None) == 0.0
+
+
+def test_valor_centavos_filled_on_write(db, empresa):
+    cliente = models.Cliente(empresa_id=empresa.id, nome="Ana", telefone="11977776666")
+    db.add(cliente)
+    db.flush()
+    atendimento = models.Atendimento(
+        empresa_id=empresa.id,
+        cliente_id=cliente.id,
+        tipo_servico="Alinhamento",
+        valor_cobrado="R$ 250,00",
+    )
+    db.add(atendimento)
+    db.commit()
+    assert atendimento.valor_centavos == 25000
+
+    atendimento.valor_cobrado = "99,90"
+    db.commit()
+    assert atendimento.valor_centavos == 9990
+
+
+def test_single_pass_raw_analytics_splits_periods(db, empresa):
+    now = datetime(2026, 3, 15, 18, 0, 0)
+    dr = get_date_range("7d", now=now)
+    cliente = models.Cliente(empresa_id=empresa.id, nome="Bia", telefone="11933334444", data_primeiro_contato=dr.start_date_previous + timedelta(hours=1))
+    db.add(cliente)
+    db.flush()
+    stamps = [
+        (dr.start_date + timedelta(hours=2), "10,00"),   # current
+        (now - timedelta(hours=1), "5,00"),              # current, last day
+        (dr.start_date - timedelta(minutes=1), "7,00"),  # previous
+        (dr.start_date_previous - timedelta(hours=1), "99,00"),  # before both periods
+    ]
+    for stamp, valor in stamps:
+        db.add(models.Atendimento(empresa_id=empresa.id, cliente_id=cliente.id, tipo_servico="Revisão", valor_cobrado=valor, data_atendimento=stamp))
+    db.commit()
+
+    result = dashboard_analytics.analytics_from_raw(db, empresa.id, dr)
+    assert result["metrics"]["appointments"] == {"current": 2.0, "previous": 1.0, "percentage": 100.0}
+    assert result["metrics"]["revenue"]["current"] == 15.0
+    assert result["metrics"]["revenue"]["previous"] == 7.0
+    assert result["metrics"]["clients"]["current"] == 0.0
+    assert result["metrics"]["clients"]["previous"] == 1.0
+    assert [p["value"] for p in result["revenue_series"]] == [10.0, 5.0]
+    assert result["clients_series"] == []
@@ -0,0 +1,156 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+from backend import auth, cache, database, empresa_cache, models
+from backend.database import Base as DBBase
+from backend.middleware import JWTClaimsMiddleware
+from backend.routers import (
+    atendimentos,
+    atendimentos_async,
+    clientes,
+    clientes_async,
+    dashboard_async,
+    empresa,
+    empresa_async,
+)
+
+
+@pytest.fixture
+def apps(monkeypatch, tmp_path):
+    monkeypatch.setattr(cache, "get_redis", lambda: None)
+    empresa_cache._local.clear()
+    path = tmp_path / "async.db"
+
+    sync_engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    DBBase.metadata.create_all(bind=sync_engine)
+    SyncSession = sessionmaker(bind=sync_engine)
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}", poolclass=NullPool)
+    AsyncSession = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+    with SyncSession() as db:
+        db.add(models.Empresa(
+            nome_empresa="Oficina Async",
+            nicho="Mecânica",
+            email_login="async@example.com",
+            senha_hash=auth.get_password_hash("Senha123"),
+        ))
+        db.commit()
+
+    def get_db():
+        with SyncSession() as db:
+            yield db
+
+    async def get_async_db():
+        async with AsyncSession() as db:
+            yield db
+
+    def build(*routers):
+        app = FastAPI()
+        app.add_middleware(JWTClaimsMiddleware)
+        for router in routers:
+            app.include_router(router)
+        app.dependency_overrides[database.get_db] = get_db
+        app.dependency_overrides[database.get_async_db] = get_async_db
+        return TestClient(app)
+
+    yield (
+        build(empresa_async.router, clientes_async.router, atendimentos_async.router, dashboard_async.router,
+              empresa.router, clientes.router, atendimentos.router),
+        build(empresa.router, clientes.router, atendimentos.router),
+    )
+    empresa_cache._local.clear()
+    sync_engine.dispose()
+
+
+def test_async_routes_match_sync_routes(apps):
+    async_client, sync_client = apps
+
+    login = async_client.post("/api/empresas/login", json={"email_login": "async@example.com", "senha": "Senha123"})
+    assert login.status_code == 200
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+    assert async_client.get("/api/empresas/me", headers=headers).json()["nome_empresa"] == "Oficina Async"
+
+    for i in range(3):
+        created = async_client.post("/api/clientes", json={"nome": f"Cliente {i}", "telefone": f"1190000000{i}"}, headers=headers)
+        assert created.status_code == 201
+    duplicate = async_client.post("/api/clientes", json={"nome": "Outro", "telefone": "11900000000"}, headers=headers)
+    assert duplicate.status_code == 400
+
+    cliente_id = created.json()["id"]
+    atendimento = async_client.post(
+        "/api/atendimentos",
+        json={"cliente_id": cliente_id, "tipo_servico": "Revisão", "valor_cobrado": "R$ 120,00"},
+        headers=headers,
+    )
+    assert atendimento.status_code == 201
+    missing = async_client.post("/api/atendimentos", json={"cliente_id": 999, "tipo_servico": "Revisão"}, headers=headers)
+    assert missing.status_code == 404
+
+    for path in ("/api/clientes", "/api/clientes?limit=2", "/api/atendimentos", "/api/atendimentos?limit=1"):
+        assert async_client.get(path, headers=headers).json() == sync_client.get(path, headers=headers).json()
+    page = async_client.get("/api/clientes?limit=2", headers=headers).json()
+    rest = async_client.get(f"/api/clientes?limit=2&cursor={page['next_cursor']}", headers=headers).json()
+    assert len(page["items"]) + len(rest["items"]) == 3 and rest["next_cursor"] is None
+
+    analytics = async_client.get("/api/dashboard/analytics?period=7d", headers=headers).json()
+    assert analytics["metrics"]["appointments"]["current"] == 1.0
+    assert analytics["metrics"]["revenue"]["current"] == 120.0
+    assert analytics["metrics"]["clients"]["current"] == 3.0
+
+    assert async_client.get("/api/clientes").status_code == 401
+
+
+class StallingRedis:
+    """Redis whose cache reads hang until released (a stalled server)."""
+
+    def __init__(self):
+        self.data = {}
+        self.release = threading.Event()
+
+    def mget(self, *keys):
+        self.release.wait(10)
+        return [self.data.get(k) for k in keys]
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value
+
+    def incr(self, key):
+        self.data[key] = str(int(self.data.get(key, 0)) + 1)
+        return int(self.data[key])
+
+
+def test_slow_redis_does_not_stall_other_async_requests(apps, monkeypatch):
+    async_client, _sync_client = apps
+    login = async_client.post("/api/empresas/login", json={"email_login": "async@example.com", "senha": "Senha123"})
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+    redis = StallingRedis()
+    monkeypatch.setattr(cache, "_redis_down_until", 0.0)
+    monkeypatch.setattr(cache, "get_redis", lambda: redis)
+    empresa_cache._local.clear()
+    # Inside the context manager every request runs on the same event loop.
+    with async_client, ThreadPoolExecutor(max_workers=1) as pool:
+        try:
+            stalled = pool.submit(async_client.get, "/api/dashboard/analytics?period=7d", headers=headers)
+            time.sleep(0.2)  # let the dashboard request reach the hanging MGET
+            started = time.monotonic()
+            created = async_client.post("/api/clientes", json={"nome": "Durante", "telefone": "11955550000"}, headers=headers)
+            elapsed = time.monotonic() - started
+            assert created.status_code == 201
+            assert not stalled.done() and elapsed < 5
+            redis.release.set()
+            assert stalled.result(timeout=10).status_code == 200
+        finally:
+            redis.release.set()
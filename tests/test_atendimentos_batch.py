@@ -0,0 +1,52 @@
+from backend import models
+from backend.plan_limits import FREE_LIMIT_MESSAGE
+from backend.routers import atendimentos
+
+
+def _clientes(db, empresa, n):
+    clientes = [models.Cliente(empresa_id=empresa.id, nome=f"Cliente {i}", telefone=f"1190000000{i}") for i in range(n)]
+    db.add_all(clientes)
+    db.commit()
+    return [c.id for c in clientes]
+
+
+def test_batch_creates_all_in_one_transaction(db, empresa, make_client):
+    ids = _clientes(db, empresa, 2)
+    client = make_client(atendimentos.router)
+    body = [
+        {"cliente_id": ids[0], "tipo_servico": "Revisão", "valor_cobrado": "R$ 100,00"},
+        {"cliente_id": ids[1], "tipo_servico": "Alinhamento", "valor_cobrado": "50"},
+        {"cliente_id": ids[0], "tipo_servico": "Balanceamento"},
+    ]
+    resp = client.post("/api/atendimentos/batch", json=body)
+    assert resp.status_code == 201
+    created = resp.json()["ids"]
+    assert len(created) == 3
+
+    rows = {a.id: a for a in db.query(models.Atendimento)}
+    assert [rows[i].tipo_servico for i in created] == ["Revisão", "Alinhamento", "Balanceamento"]
+    db.expire_all()
+    assert db.get(models.UsoEmpresa, empresa.id).total_atendimentos == 3
+    rollup = db.query(models.AnalyticsDiario).one()
+    assert (rollup.atendimentos, rollup.receita_centavos) == (3, 15000)
+
+
+def test_batch_is_rejected_as_a_whole(db, empresa, make_client):
+    ids = _clientes(db, empresa, 1)
+    client = make_client(atendimentos.router)
+
+    resp = client.post("/api/atendimentos/batch", json=[
+        {"cliente_id": ids[0], "tipo_servico": "Revisão"},
+        {"cliente_id": 999, "tipo_servico": "Revisão"},
+    ])
+    assert resp.status_code == 404
+    assert "999" in resp.json()["detail"]
+
+    empresa.limite_atendimentos = 2
+    db.commit()
+    resp = client.post("/api/atendimentos/batch", json=[{"cliente_id": ids[0], "tipo_servico": "Revisão"}] * 3)
+    assert resp.status_code == 403
+    assert resp.json()["detail"] == FREE_LIMIT_MESSAGE
+    assert db.query(models.Atendimento).count() == 0
+
+    assert client.post("/api/atendimentos/batch", json=[]).status_code == 422
@@ -16,3 +16,57 @@ def test_create_and_decode_access_token():
     decoded = auth.decode_access_token(token)
     assert decoded is not None
     assert decoded.get("sub") == 42
+
+
+def test_purge_refresh_tokens_in_batches(db, empresa):
+    from datetime import datetime, timedelta, timezone
+    from backend import models
+
+    agora = datetime.now(timezone.utc).replace(tzinfo=None)
+
+    def token(jti, criado_dias, expira_dias, revoked=0, replaced_by=None):
+        db.add(models.RefreshToken(
+            empresa_id=empresa.id, jti=jti, token_hash=jti,
+            created_at=agora - timedelta(days=criado_dias),
+            expires_at=agora + timedelta(days=expira_dias),
+            revoked=revoked, replaced_by=replaced_by,
+        ))
+
+    token("ativo", 1, 6)
+    token("expirado", 9, -2)
+    token("logout", 1, 6, revoked=1)
+    token("rotacao-recente", 2, 5, revoked=1, replaced_by="ativo")  # successor issued 1 day ago
+    token("sucessor-antigo", 10, 1)
+    token("rotacao-antiga", 12, 1, revoked=1, replaced_by="sucessor-antigo")
+    token("rotacao-orfa", 3, 4, revoked=1, replaced_by="nao-existe")
+    db.commit()
+
+    assert auth.purge_refresh_tokens(db, batch_size=2) == 4
+    restantes = {jti for (jti,) in db.query(models.RefreshToken.jti)}
+    assert restantes == {"ativo", "rotacao-recente", "sucessor-antigo"}
+    assert auth.purge_refresh_tokens(db) == 0
+
+
+def test_login_rehashes_outdated_password(db, empresa, make_client, monkeypatch):
+    from passlib.context import CryptContext
+    from backend import passwords
+    from backend.routers import empresa as empresa_router
+
+    # Inline hashing so the patched context is the one used.
+    monkeypatch.setattr(passwords, "WORKERS", 0)
+    empresa.senha_hash = CryptContext(schemes=["bcrypt"], bcrypt__rounds=4).hash("Senha123")
+    db.commit()
+    monkeypatch.setattr(passwords, "pwd_context", CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=5))
+
+    client = make_client(empresa_router.router)
+    resp = client.post("/api/empresas/login", json={"email_login": empresa.email_login, "senha": "Senha123"})
+    assert resp.status_code == 200, resp.text
+    db.refresh(empresa)
+    assert empresa.senha_hash.startswith("$2b$05$")
+
+    resp = client.post("/api/empresas/login", json={"email_login": empresa.email_login, "senha": "errada"})
+    assert resp.status_code == 401
+
+
+def test_verify_password_rejects_malformed_hash():
+    assert auth.verify_password("x", "not-a-hash") is False
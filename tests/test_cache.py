@@ -0,0 +1,138 @@
+import time
+
+import pytest
+
+from backend import cache
+
+
+class FakeRedis:
+    def __init__(self):
+        self.data = {}
+
+    def mget(self, *keys):
+        return [self.data.get(k) for k in keys]
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value
+
+    def incr(self, key):
+        self.data[key] = str(int(self.data.get(key, 0)) + 1)
+        return int(self.data[key])
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.queued = []
+
+    def incr(self, key):
+        self.queued.append(key)
+
+    def execute(self):
+        return [self.redis.incr(key) for key in self.queued]
+
+
+class DownRedis:
+    def __getattr__(self, name):
+        raise ConnectionError("redis down")
+
+
+@pytest.fixture(autouse=True)
+def _reset_cache(monkeypatch):
+    monkeypatch.setattr(cache, "_redis_down_until", 0.0)
+    cache._local_values.clear()
+    cache._local_versions.clear()
+    cache._pending_bumps.clear()
+    cache.stats.reset()
+    yield
+
+
+def _counter():
+    calls = {"n": 0}
+
+    def compute():
+        calls["n"] += 1
+        return {"n": calls["n"]}
+
+    return calls, compute
+
+
+def test_redis_tier_hits_until_version_bump(monkeypatch):
+    fake = FakeRedis()
+    monkeypatch.setattr(cache, "get_redis", lambda: fake)
+    calls, compute = _counter()
+
+    assert cache.get_or_compute(1, "analytics", "7d", compute) == {"n": 1}
+    assert cache.get_or_compute(1, "analytics", "7d", compute) == {"n": 1}
+    # Other tenants are unaffected by empresa 1's writes.
+    cache.get_or_compute(2, "analytics", "7d", compute)
+    cache.bump_tenant_version(1)
+    assert cache.get_or_compute(1, "analytics", "7d", compute) == {"n": 3}
+    assert cache.get_or_compute(2, "analytics", "7d", compute) == {"n": 2}
+    assert cache.cache_stats()["hits"] == 2
+    assert cache.cache_stats()["misses"] == 3
+
+
+def test_falls_back_to_local_cache_when_redis_is_down(monkeypatch):
+    monkeypatch.setattr(cache, "get_redis", lambda: DownRedis())
+    calls, compute = _counter()
+
+    cache.get_or_compute(1, "dashboard", "totais", compute)
+    cache.get_or_compute(1, "dashboard", "totais", compute)
+    assert calls["n"] == 1
+    cache.bump_tenant_version(1)
+    cache.get_or_compute(1, "dashboard", "totais", compute)
+    assert calls["n"] == 2
+    assert cache.cache_stats()["redis_errors"] == 1
+
+
+def test_bumps_made_during_an_outage_reach_redis_on_recovery(monkeypatch):
+    fake = FakeRedis()
+    backend = {"r": fake}
+    monkeypatch.setattr(cache, "get_redis", lambda: backend["r"])
+    calls, compute = _counter()
+    cache.get_or_compute(1, "dashboard", "totais", compute)  # cached in Redis at version 0
+
+    backend["r"] = DownRedis()
+    cache.get_or_compute(1, "dashboard", "totais", compute)
+    cache.bump_tenant_version(1)
+    cache.bump_tenant_version(2)
+    assert cache._pending_bumps == {1, 2}
+
+    # Redis is back: the next call replays the bumps before reading, so the
+    # entry cached before the outage is stale for every worker.
+    backend["r"] = fake
+    monkeypatch.setattr(cache, "_redis_down_until", 0.0)
+    assert cache.get_or_compute(1, "dashboard", "totais", compute) == {"n": 3}
+    assert fake.data["cache:ver:1"] == "1" and fake.data["cache:ver:2"] == "1"
+    assert not cache._pending_bumps
+
+
+def test_local_versions_are_bounded_and_eviction_only_misses(monkeypatch):
+    monkeypatch.setattr(cache, "get_redis", lambda: DownRedis())
+    monkeypatch.setattr(cache, "_local_versions", cache.LocalTTLCache(maxsize=2, ttl=60))
+    calls, compute = _counter()
+    cache.get_or_compute(1, "dashboard", "totais", compute)
+    for empresa_id in range(2, 6):
+        cache.bump_tenant_version(empresa_id)
+    assert len(cache._local_versions) == 2
+    # Empresa 1's version was evicted: it gets a new one and recomputes.
+    cache.get_or_compute(1, "dashboard", "totais", compute)
+    assert calls["n"] == 2
+
+
+def test_local_ttl_cache_evicts_lru_and_expired():
+    lru = cache.LocalTTLCache(maxsize=2, ttl=60)
+    lru.set("a", 1)
+    lru.set("b", 2)
+    lru.get("a")
+    lru.set("c", 3)
+    assert lru.get("b") is None
+    assert lru.get("a") == 1
+
+    lru.set("short", 1, ttl=0.01)
+    time.sleep(0.02)
+    assert lru.get("short") is None
@@ -0,0 +1,88 @@
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import event
+
+from backend import auth, cache, empresa_cache
+from backend.dependencies import require_authenticated_empresa
+
+
+class FakeRedis:
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value
+
+    def delete(self, key):
+        self.data.pop(key, None)
+
+
+@pytest.fixture(autouse=True)
+def _reset_cache(monkeypatch):
+    monkeypatch.setattr(cache, "_redis_down_until", 0.0)
+    monkeypatch.setattr(cache, "get_redis", lambda: None)
+    empresa_cache._local.clear()
+    yield
+    empresa_cache._local.clear()
+
+
+def _count_selects(db):
+    counter = {"n": 0}
+
+    @event.listens_for(db.bind, "before_cursor_execute")
+    def _count(conn, cursor, statement, *args):
+        if statement.lstrip().upper().startswith("SELECT"):
+            counter["n"] += 1
+
+    return counter
+
+
+def test_second_request_does_not_hit_the_db(db, empresa):
+    token = auth.create_access_token({"sub": empresa.id})
+    selects = _count_selects(db)
+
+    first = require_authenticated_empresa(token, db)
+    second = require_authenticated_empresa(token, db)
+
+    assert first is second
+    assert first.id == empresa.id and first.email_login == "oficina@example.com"
+    assert selects["n"] == 1
+
+
+def test_redis_tier_is_shared_between_workers(monkeypatch, db, empresa):
+    fake = FakeRedis()
+    monkeypatch.setattr(cache, "get_redis", lambda: fake)
+
+    empresa_cache.get_empresa(db, empresa.id)
+    assert f"empresa:{empresa.id}" in fake.data
+
+    # Another worker: empty L1, warm Redis.
+    empresa_cache._local.clear()
+    selects = _count_selects(db)
+    assert empresa_cache.get_empresa(db, empresa.id).nome_empresa == "Oficina Teste"
+    assert selects["n"] == 0
+
+
+def test_commit_invalidates_cached_empresa(monkeypatch, db, empresa):
+    fake = FakeRedis()
+    monkeypatch.setattr(cache, "get_redis", lambda: fake)
+    assert empresa_cache.get_empresa(db, empresa.id).plano_empresa == "free"
+
+    empresa.plano_empresa = "pro"
+    db.flush()
+    # Not committed yet: the cached snapshot still reflects the committed row.
+    assert empresa_cache.get_empresa(db, empresa.id).plano_empresa == "free"
+    db.commit()
+
+    assert f"empresa:{empresa.id}" not in fake.data
+    assert empresa_cache.get_empresa(db, empresa.id).plano_empresa == "pro"
+
+
+def test_unknown_empresa_is_rejected(db):
+    token = auth.create_access_token({"sub": 999})
+    with pytest.raises(HTTPException) as exc:
+        require_authenticated_empresa(token, db)
+    assert exc.value.status_code == 401
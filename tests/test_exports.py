@@ -0,0 +1,39 @@
+import csv
+import io
+import json
+
+from backend import models
+from backend.routers import atendimentos, clientes
+
+
+def _seed(db, empresa):
+    cliente = models.Cliente(empresa_id=empresa.id, nome="Maria", telefone="11988887777")
+    db.add(cliente)
+    db.flush()
+    db.add(models.Atendimento(empresa_id=empresa.id, cliente_id=cliente.id, tipo_servico="Troca de óleo"))
+    db.commit()
+
+
+def test_export_clientes_csv(db, empresa, make_client):
+    _seed(db, empresa)
+    resp = make_client(clientes.router).get("/api/clientes/export", params={"format": "csv"})
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/csv")
+    rows = list(csv.reader(io.StringIO(resp.text)))
+    assert rows[0] == ["id", "nome", "telefone", "anotacoes_rapidas", "data_primeiro_contato"]
+    assert rows[1][1:3] == ["Maria", "11988887777"]
+
+
+def test_export_atendimentos_ndjson(db, empresa, make_client):
+    _seed(db, empresa)
+    resp = make_client(atendimentos.router).get("/api/atendimentos/export", params={"format": "ndjson"})
+    assert resp.status_code == 200
+    lines = [json.loads(line) for line in resp.text.splitlines()]
+    assert len(lines) == 1
+    assert set(lines[0]) == set(atendimentos.ATENDIMENTO_FIELDS)
+    assert lines[0]["tipo_servico"] == "Troca de óleo"
+
+
+def test_export_rejects_unknown_format(db, empresa, make_client):
+    resp = make_client(clientes.router).get("/api/clientes/export", params={"format": "xlsx"})
+    assert resp.status_code == 422
@@ -0,0 +1,77 @@
+from backend import imports, models
+from backend.routers import clientes
+
+
+def _upload(client, content):
+    return client.post("/api/clientes/import", files={"arquivo": ("clientes.csv", content.encode(), "text/csv")})
+
+
+def test_import_dedupes_validates_and_reports(db, empresa, make_client, monkeypatch):
+    monkeypatch.setattr(imports, "IMPORT_CHUNK_SIZE", 2)
+    db.add(models.Cliente(empresa_id=empresa.id, nome="Existente", telefone="11900000001"))
+    db.commit()
+    client = make_client(clientes.router)
+
+    csv_content = (
+        "Nome,Telefone,anotacoes_rapidas\n"
+        "Ana,11900000001,\n"          # already stored
+        "Bia,11900000002,vip\n"
+        "C,11900000003,\n"            # nome too short
+        "Duda,11900000002,\n"         # repeated in the file
+        "Eva,11900000005,\n"
+        "Fábio,123,\n"                # invalid phone
+    )
+    resp = _upload(client, csv_content)
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["importados"] == 2
+    assert body["ignorados"] == 4
+    assert [e["linha"] for e in body["erros"]] == [2, 4, 5, 7]
+    assert body["erros"][0]["erro"] == imports.DUPLICATE_MESSAGE
+
+    stored = {c.telefone: c for c in db.query(models.Cliente).filter(models.Cliente.empresa_id == empresa.id)}
+    assert set(stored) == {"11900000001", "11900000002", "11900000005"}
+    assert stored["11900000002"].anotacoes_rapidas == "vip"
+    assert stored["11900000002"].status_cliente == "novo"
+    db.expire_all()
+    assert db.get(models.UsoEmpresa, empresa.id).total_clientes == 3
+    assert sum(r.novos_clientes for r in db.query(models.AnalyticsDiario)) == 2
+
+
+def test_import_stops_at_plan_limit(db, empresa, make_client):
+    empresa.limite_clientes = 3
+    db.commit()
+    client = make_client(clientes.router)
+
+    rows = "".join(f"Cliente {i},1190000001{i}\n" for i in range(5))
+    body = _upload(client, "nome,telefone\n" + rows).json()
+    assert body["importados"] == 3
+    assert [e["erro"] for e in body["erros"]] == [imports.LIMIT_MESSAGE] * 2
+    assert db.query(models.Cliente).count() == 3
+
+
+def test_import_requires_columns(make_client):
+    client = make_client(clientes.router)
+    resp = _upload(client, "nome;telefone\nAna;11900000001\n")
+    assert resp.status_code == 400
+
+
+def test_import_rejects_non_utf8(make_client):
+    client = make_client(clientes.router)
+    resp = client.post("/api/clientes/import", files={"arquivo": ("c.csv", "nome,telefone\nJoão,11900000001\n".encode("latin-1"), "text/csv")})
+    assert resp.status_code == 400
+
+
+def test_bad_line_after_committed_chunks_still_invalidates_the_cache(db, empresa, make_client, monkeypatch):
+    monkeypatch.setattr(imports, "IMPORT_CHUNK_SIZE", 50)
+    bumps = []
+    monkeypatch.setattr(imports.cache, "bump_tenant_version", bumps.append)
+    client = make_client(clientes.router)
+
+    # The bad byte sits past the decoder's first read, after several chunks.
+    linhas = "".join(f"Cliente {i},1190{i:07d}\n" for i in range(600)).encode()
+    resp = client.post("/api/clientes/import", files={"arquivo": ("c.csv", b"nome,telefone\n" + linhas + "João,11800000000\n".encode("latin-1"), "text/csv")})
+    assert resp.status_code == 400
+    importados = db.query(models.Cliente).filter(models.Cliente.empresa_id == empresa.id).count()
+    assert importados > 0 and f"Clientes já importados: {importados}" in resp.json()["detail"]
+    assert bumps == [empresa.id]
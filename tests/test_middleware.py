@@ -0,0 +1,53 @@
+import pytest
+from fastapi import Depends, FastAPI, Request
+from fastapi.testclient import TestClient
+
+from backend import auth, cache, database, empresa_cache
+from backend.dependencies import require_authenticated_empresa
+from backend.middleware import JWTClaimsMiddleware
+
+
+@pytest.fixture
+def client(monkeypatch, db):
+    monkeypatch.setattr(cache, "get_redis", lambda: None)
+    auth._claims_cache.clear()
+    empresa_cache._local.clear()
+
+    app = FastAPI()
+    app.add_middleware(JWTClaimsMiddleware)
+
+    @app.get("/me")
+    def me(request: Request, empresa=Depends(require_authenticated_empresa)):
+        return {"id": empresa.id, "state_empresa_id": request.state.empresa_id}
+
+    @app.get("/public")
+    def public(request: Request):
+        return {"empresa_id": getattr(request.state, "empresa_id", None)}
+
+    app.dependency_overrides[database.get_db] = lambda: db
+    return TestClient(app)
+
+
+def test_token_is_decoded_once_across_middleware_and_dependency(monkeypatch, client, empresa):
+    calls = {"n": 0}
+    real_decode = auth.decode_access_token
+
+    def counting_decode(token):
+        calls["n"] += 1
+        return real_decode(token)
+
+    monkeypatch.setattr(auth, "decode_access_token", counting_decode)
+    headers = {"Authorization": f"Bearer {auth.create_access_token({'sub': empresa.id})}"}
+
+    for _ in range(3):
+        response = client.get("/me", headers=headers)
+        assert response.status_code == 200
+        assert response.json() == {"id": empresa.id, "state_empresa_id": empresa.id}
+    assert calls["n"] == 1
+
+
+def test_invalid_token_is_ignored_on_public_routes_and_rejected_on_protected(client):
+    headers = {"Authorization": "Bearer not-a-jwt"}
+    assert client.get("/public", headers=headers).json() == {"empresa_id": None}
+    assert client.get("/me", headers=headers).status_code == 401
+    assert client.get("/me").status_code == 401
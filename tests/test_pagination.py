@@ -0,0 +1,87 @@
+from datetime import datetime, timedelta
+
+from backend import models
+from backend.routers import atendimentos, clientes
+
+
+def _seed(db, empresa, total=7):
+    base = datetime(2026, 1, 1, 12, 0, 0)
+    for i in range(total):
+        # Two rows share each timestamp so the id tie-breaker is exercised.
+        cliente = models.Cliente(
+            empresa_id=empresa.id,
+            nome=f"Cliente {i}",
+            telefone=f"1199999{i:04d}",
+            data_primeiro_contato=base + timedelta(days=i // 2),
+        )
+        db.add(cliente)
+        db.flush()
+        db.add(models.Atendimento(
+            empresa_id=empresa.id,
+            cliente_id=cliente.id,
+            tipo_servico="Revisão",
+            data_atendimento=base + timedelta(days=i // 2),
+        ))
+    db.commit()
+
+
+def _walk(client, path, limit):
+    ids, cursor = [], None
+    while True:
+        params = {"limit": limit}
+        if cursor:
+            params["cursor"] = cursor
+        resp = client.get(path, params=params)
+        assert resp.status_code == 200
+        body = resp.json()
+        ids.extend(item["id"] for item in body["items"])
+        cursor = body["next_cursor"]
+        if not cursor:
+            return ids
+
+
+def test_clientes_cursor_pages_match_unpaged_order(db, empresa, make_client):
+    _seed(db, empresa)
+    client = make_client(clientes.router)
+
+    legacy = client.get("/api/clientes").json()
+    assert isinstance(legacy, list) and len(legacy) == 7
+
+    paged_ids = _walk(client, "/api/clientes", limit=3)
+    expected = [
+        c.id for c in db.query(models.Cliente).order_by(
+            models.Cliente.data_primeiro_contato.desc(), models.Cliente.id.desc()
+        )
+    ]
+    assert paged_ids == expected
+
+
+def test_atendimentos_cursor_pages_cover_all_rows(db, empresa, make_client):
+    _seed(db, empresa)
+    client = make_client(atendimentos.router)
+
+    paged_ids = _walk(client, "/api/atendimentos", limit=2)
+    assert len(paged_ids) == 7
+    assert len(set(paged_ids)) == 7
+
+
+def test_invalid_cursor_returns_400(db, empresa, make_client):
+    client = make_client(clientes.router)
+    resp = client.get("/api/clientes", params={"cursor": "not-a-cursor"})
+    assert resp.status_code == 400
+
+
+def test_null_sort_values_on_a_page_boundary_do_not_end_the_listing(db, empresa, make_client):
+    _seed(db, empresa, total=5)
+    # The column defaults to now(), so clear it after the insert.
+    db.query(models.Cliente).filter(models.Cliente.id.in_([2, 4, 5])).update(
+        {models.Cliente.data_primeiro_contato: None}, synchronize_session=False
+    )
+    db.query(models.Atendimento).filter(models.Atendimento.id.in_([1, 3])).update(
+        {models.Atendimento.data_atendimento: None}, synchronize_session=False
+    )
+    db.commit()
+
+    # limit=1 puts every row, NULL-dated ones included, on a boundary.
+    assert _walk(make_client(clientes.router), "/api/clientes", limit=1) == [3, 1, 5, 4, 2]
+    assert _walk(make_client(atendimentos.router), "/api/atendimentos", limit=1) == [5, 4, 2, 3, 1]
@@ -0,0 +1,61 @@
+import pytest
+from fastapi import HTTPException
+
+from backend import models
+from backend.plan_limits import FREE_LIMIT_MESSAGE, check_plan_limits, reconcile_usage
+from backend.routers import clientes
+
+
+def _uso(db, empresa):
+    db.expire_all()
+    return db.get(models.UsoEmpresa, empresa.id)
+
+
+def test_free_limit_enforced_from_counter(db, empresa, make_client):
+    empresa.limite_clientes = 2
+    db.commit()
+    client = make_client(clientes.router)
+
+    for i in range(2):
+        resp = client.post("/api/clientes", json={"nome": f"Cliente {i}", "telefone": f"1190000000{i}"})
+        assert resp.status_code == 201
+    resp = client.post("/api/clientes", json={"nome": "Excedente", "telefone": "11900000009"})
+    assert resp.status_code == 403
+    assert resp.json()["detail"] == FREE_LIMIT_MESSAGE
+
+    assert _uso(db, empresa).total_clientes == 2
+    assert db.query(models.Cliente).count() == 2
+
+
+def test_counter_seeded_from_existing_rows(db, empresa):
+    empresa.limite_clientes = 3
+    db.add_all([
+        models.Cliente(empresa_id=empresa.id, nome=f"Legado {i}", telefone=f"1191111111{i}")
+        for i in range(3)
+    ])
+    db.commit()
+
+    with pytest.raises(HTTPException) as exc:
+        check_plan_limits(empresa, "clientes", db=db)
+    assert exc.value.status_code == 403
+    assert _uso(db, empresa).total_clientes == 3
+
+
+def test_reservation_rolls_back_with_transaction(db, empresa):
+    check_plan_limits(empresa, "atendimentos", db=db)
+    db.commit()
+    check_plan_limits(empresa, "atendimentos", db=db, quantidade=5)
+    db.rollback()
+    assert _uso(db, empresa).total_atendimentos == 1
+
+
+def test_pro_is_unlimited_but_counted_and_reconcile_recounts(db, empresa):
+    empresa.plano_empresa = "pro"
+    empresa.limite_clientes = 1
+    db.commit()
+    check_plan_limits(empresa, "clientes", db=db, quantidade=10)
+    db.commit()
+    assert _uso(db, empresa).total_clientes == 10
+
+    reconcile_usage(db, empresa_id=empresa.id)
+    assert _uso(db, empresa).total_clientes == 0
@@ -0,0 +1,78 @@
+"""
+EXPLAIN-based checks that the hot query paths are served by the composite
+tenant-scoped indexes declared in backend/models.py.
+"""
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, text
+
+from backend import models
+
+
+def _plan(db, query) -> str:
+    sql = query.statement.compile(db.bind, compile_kwargs={"literal_binds": True})
+    rows = db.execute(text(f"EXPLAIN QUERY PLAN {sql}")).fetchall()
+    return " | ".join(str(r[-1]) for r in rows)
+
+
+def test_analytics_queries_use_empresa_date_indexes(db):
+    start = datetime(2026, 1, 1)
+    end = start + timedelta(days=30)
+
+    appt_plan = _plan(db, db.query(func.count(models.Atendimento.id)).filter(
+        models.Atendimento.empresa_id == 1,
+        models.Atendimento.data_atendimento >= start,
+        models.Atendimento.data_atendimento < end,
+    ))
+    assert "ix_atendimentos_empresa_data" in appt_plan
+
+    client_plan = _plan(db, db.query(func.count(models.Cliente.id)).filter(
+        models.Cliente.empresa_id == 1,
+        models.Cliente.data_primeiro_contato >= start,
+        models.Cliente.data_primeiro_contato < end,
+    ))
+    assert "ix_clientes_empresa_primeiro_contato" in client_plan
+
+
+def test_list_queries_use_empresa_date_indexes(db):
+    clientes_plan = _plan(db, db.query(models.Cliente).filter(
+        models.Cliente.empresa_id == 1,
+    ).order_by(models.Cliente.data_primeiro_contato.desc(), models.Cliente.id.desc()).limit(50))
+    assert "ix_clientes_empresa_primeiro_contato" in clientes_plan
+
+    atend_plan = _plan(db, db.query(models.Atendimento).filter(
+        models.Atendimento.empresa_id == 1,
+    ).order_by(models.Atendimento.data_atendimento.desc(), models.Atendimento.id.desc()).limit(50))
+    assert "ix_atendimentos_empresa_data" in atend_plan
+
+
+def test_phone_dedupe_and_cliente_history_use_indexes(db):
+    phone_plan = _plan(db, db.query(models.Cliente).filter(
+        models.Cliente.empresa_id == 1,
+        models.Cliente.telefone == "11999990000",
+    ))
+    assert "ix_clientes_empresa_telefone" in phone_plan
+
+    history_plan = _plan(db, db.query(models.Atendimento).filter(
+        models.Atendimento.cliente_id == 1,
+    ).order_by(models.Atendimento.data_atendimento.desc()))
+    assert "ix_atendimentos_cliente_data" in history_plan
+
+
+def test_active_refresh_tokens_use_partial_index(db):
+    plan = _plan(db, db.query(models.RefreshToken.id).filter(
+        models.RefreshToken.empresa_id == 1,
+        models.RefreshToken.revoked == 0,
+        models.RefreshToken.expires_at > datetime(2026, 1, 1),
+    ))
+    assert "ix_refresh_tokens_ativos" in plan
+
+
+def test_reclassification_sweep_uses_range_scans(db):
+    from backend import reclassificacao
+
+    agora = datetime(2026, 6, 1)
+    janelas = reclassificacao._janelas(agora - timedelta(days=1), agora, agora - timedelta(days=400))
+    plan = _plan(db, reclassificacao._candidatos(db, 1, janelas))
+    assert "ix_atendimentos_empresa_data" in plan
+    assert "ix_atendimentos_cliente_data" in plan
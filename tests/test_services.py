@@ -0,0 +1,73 @@
+from datetime import datetime, timedelta, timezone
+
+from backend import models, services
+
+AGORA = datetime(2026, 6, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def _classificar_legado(cliente, db, agora):
+    """The original per-row implementation (one SELECT of every atendimento)."""
+    atendimentos = db.query(models.Atendimento).filter(
+        models.Atendimento.cliente_id == cliente.id, models.Atendimento.empresa_id == cliente.empresa_id
+    ).all()
+    total = len(atendimentos)
+    if total == 0:
+        return ("novo", "baixo", 0, 0)
+    datas = sorted((a.data_atendimento.replace(tzinfo=timezone.utc) for a in atendimentos if a.data_atendimento), reverse=True)
+    meses_sem_retorno = (agora - datas[0]).days // 30 if datas else 99
+    if total >= 5:
+        status, nivel, importante = "frequente", "alto", 1
+    elif meses_sem_retorno >= 6:
+        status, nivel, importante = "inativo", "baixo", 0
+    elif meses_sem_retorno <= 2:
+        status, nivel, importante = "recente", "medio", 0
+    else:
+        status, nivel, importante = "ativo", "medio", 0
+    return (status, nivel, min(100, total * 20 - meses_sem_retorno * 5), importante)
+
+
+def _seed(db, empresa):
+    outra = models.Empresa(nome_empresa="Outra", nicho="x", email_login="outra@example.com", senha_hash="x")
+    db.add(outra)
+    db.flush()
+    # (atendimentos ago in days, ...) per cliente; None = no data_atendimento.
+    perfis = [
+        [], [0], [59], [60], [89], [90], [91], [179], [180], [181], [400],
+        [10, 200], [400, 5, 30], [1, 2, 3, 4], [1, 2, 3, 4, 500], [300] * 6, [None], [None, 100],
+    ]
+    for i, dias in enumerate(perfis):
+        cliente = models.Cliente(empresa_id=empresa.id, nome=f"Cliente {i}", telefone=f"1190000{i:04d}", status_cliente="desatualizado")
+        db.add(cliente)
+        db.flush()
+        for d in dias:
+            db.add(models.Atendimento(
+                empresa_id=empresa.id,
+                cliente_id=cliente.id,
+                tipo_servico="Revisão",
+                data_atendimento=None if d is None else (AGORA - timedelta(days=d)).replace(tzinfo=None),
+            ))
+    # An atendimento pointing at empresa's cliente from another tenant is ignored.
+    db.add(models.Atendimento(empresa_id=outra.id, cliente_id=cliente.id, tipo_servico="X", data_atendimento=AGORA.replace(tzinfo=None)))
+    db.commit()
+
+
+def test_set_based_reclassification_matches_per_row(db, empresa):
+    _seed(db, empresa)
+    clientes = db.query(models.Cliente).filter(models.Cliente.empresa_id == empresa.id).order_by(models.Cliente.id).all()
+    esperado = {c.id: _classificar_legado(c, db, AGORA) for c in clientes}
+
+    services.atualizar_status_todos_clientes(empresa.id, db, agora=AGORA)
+    db.expire_all()
+    obtido = {
+        c.id: (c.status_cliente, c.nivel_atividade, c.score_atividade, c.importante)
+        for c in db.query(models.Cliente).filter(models.Cliente.empresa_id == empresa.id)
+    }
+    assert obtido == esperado
+    assert {s for s, *_ in obtido.values()} == {"novo", "recente", "ativo", "inativo", "frequente"}
+
+    for c in clientes:
+        services.classificar_cliente(c, db, agora=AGORA)
+        assert (c.status_cliente, c.nivel_atividade, c.score_atividade, c.importante) == esperado[c.id]
+
+    # Nothing changed since the last run: no rows rewritten.
+    assert services.reclassificar_clientes(db, empresa_id=empresa.id, agora=AGORA) == 0
@@ -1,7 +1,122 @@
+import fnmatch
+import random
+
 from backend import sessions
 import pytest
 
 
+class FakeRedis:
+    """In-memory subset of the redis-py API used by backend.sessions (TTLs are stored, not enforced)."""
+
+    def __init__(self):
+        self.data = {}
+        self.ttls = {}
+        self.published = []
+        self.calls = []
+
+    def _call(self, name):
+        self.calls.append(name)
+
+    def set(self, key, value, ex=None):
+        self._call("set")
+        self.data[key] = value
+        if ex is not None:
+            self.ttls[key] = ex
+
+    def get(self, key):
+        self._call("get")
+        value = self.data.get(key)
+        return value if isinstance(value, str) else None
+
+    def getdel(self, key):
+        self._call("getdel")
+        value = self.get(key)
+        self.data.pop(key, None)
+        return value
+
+    def expire(self, key, seconds):
+        self._call("expire")
+        if key not in self.data:
+            return False
+        self.ttls[key] = seconds
+        return True
+
+    def ttl(self, key):
+        self._call("ttl")
+        if key not in self.data:
+            return -2
+        return self.ttls.get(key, -1)
+
+    def publish(self, channel, message):
+        self._call("publish")
+        self.published.append((channel, message))
+        return 0
+
+    def exists(self, key):
+        self._call("exists")
+        return int(key in self.data)
+
+    def delete(self, *keys):
+        self._call("delete")
+        return sum(self.data.pop(k, None) is not None for k in keys)
+
+    def unlink(self, *keys):
+        self._call("unlink")
+        return sum(self.data.pop(k, None) is not None for k in keys)
+
+    def sadd(self, key, *members):
+        self._call("sadd")
+        self.data.setdefault(key, set()).update(members)
+
+    def srem(self, key, *members):
+        self._call("srem")
+        self.data.get(key, set()).difference_update(members)
+        if not self.data.get(key):
+            self.data.pop(key, None)
+
+    def smembers(self, key):
+        self._call("smembers")
+        return set(self.data.get(key, set()))
+
+    def srandmember(self, key, number):
+        self._call("srandmember")
+        members = list(self.data.get(key, set()))
+        return random.sample(members, min(number, len(members)))
+
+    def scan_iter(self, match="*", count=None):
+        self._call("scan")
+        return [k for k in list(self.data) if fnmatch.fnmatchcase(k, match)]
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.queued = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self.queued.append((name, args, kwargs))
+            return self
+        return queue
+
+    def execute(self):
+        self.redis.calls.append("pipeline")
+        results = [getattr(self.redis, name)(*args, **kwargs) for name, args, kwargs in self.queued]
+        self.queued = []
+        return results
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    fake = FakeRedis()
+    monkeypatch.setattr(sessions, "get_redis", lambda: fake)
+    monkeypatch.setattr(sessions, "_store", sessions.RedisSessionStore())
+    return fake
+
+
 def test_create_and_get_session():
     # Skip when Redis is unavailable in local/dev environments.
     try:
@@ -13,3 +128,113 @@ def test_create_and_get_session():
     assert empresa_id == 123
     sessions.revoke_session(token)
     assert sessions.get_session_empresa(token) is None
+
+
+def test_revoke_all_uses_the_index_not_a_scan(fake_redis):
+    tokens = [sessions.create_session(1) for _ in range(3)]
+    other = sessions.create_session(2)
+    sessions.revoke_session(tokens[0])
+    assert fake_redis.smembers("session_index:1") == set(tokens[1:])
+
+    fake_redis.calls.clear()
+    assert sessions.revoke_all_sessions_for_empresa(1) == 2
+    assert "scan" not in fake_redis.calls and "get" not in fake_redis.calls
+    assert all(sessions.get_session_empresa(t) is None for t in tokens)
+    assert "session_index:1" not in fake_redis.data
+    assert sessions.get_session_empresa(other) == 2
+
+
+def test_expired_members_are_pruned_lazily(fake_redis):
+    old = sessions.create_session(1)
+    del fake_redis.data[f"session:{old}"]  # TTL ran out
+    sessions.create_session(1)
+    assert old not in fake_redis.smembers("session_index:1")
+    assert len(fake_redis.smembers("session_index:1")) == 1
+
+
+def test_backfill_indexes_legacy_sessions(fake_redis):
+    fake_redis.set("session:legacy-a", "7")
+    fake_redis.set("session:legacy-b", "7")
+    fake_redis.set("session:broken", "x")
+    assert sessions.backfill_session_index(batch=2) == 2
+    assert fake_redis.smembers("session_index:7") == {"legacy-a", "legacy-b"}
+    assert sessions.revoke_all_sessions_for_empresa(7) == 2
+
+
+def test_lookup_is_one_round_trip_until_the_ttl_drifts(fake_redis):
+    token = sessions.create_session(5)
+    key = f"session:{token}"
+    fake_redis.calls.clear()
+    assert sessions.get_session_empresa(token) == 5
+    assert fake_redis.calls == ["pipeline", "get", "ttl"]  # queued commands, one round trip
+
+    fake_redis.ttls[key] = sessions.SESSION_TTL - sessions.SESSION_REFRESH_THRESHOLD - 1
+    fake_redis.calls.clear()
+    assert sessions.get_session_empresa(token) == 5
+    assert fake_redis.calls == ["pipeline", "get", "ttl", "expire"]
+    assert fake_redis.ttls[key] == sessions.SESSION_TTL
+
+
+def test_revocation_publishes_invalidations(fake_redis):
+    tokens = [sessions.create_session(3) for _ in range(2)]
+    sessions.revoke_session(tokens[0])
+    sessions.revoke_all_sessions_for_empresa(3)
+    assert fake_redis.published == [
+        (sessions.INVALIDATION_CHANNEL, tokens[0]),
+        (sessions.INVALIDATION_CHANNEL, tokens[1]),
+    ]
+
+
+def test_near_cache_serves_hits_and_drops_invalidated_tokens(fake_redis, monkeypatch):
+    monkeypatch.setattr(sessions, "_near_cache", sessions.LocalTTLCache(maxsize=100, ttl=5))
+    monkeypatch.setattr(sessions, "_ensure_invalidation_listener", lambda: None)
+    token = sessions.create_session(9)
+    assert sessions.get_session_empresa(token) == 9
+    fake_redis.calls.clear()
+    assert sessions.get_session_empresa(token) == 9
+    assert fake_redis.calls == []
+
+    # Another worker revoked it: the session is gone and the message arrives.
+    del fake_redis.data[f"session:{token}"]
+    sessions._handle_invalidation({"type": "message", "data": token})
+    assert sessions.get_session_empresa(token) is None
+
+
+def test_memory_store_round_trip_and_revoke_all():
+    store = sessions.MemorySessionStore(ttl=60, refresh_threshold=10)
+    tokens = [store.create(1) for _ in range(3)]
+    other = store.create(2)
+    assert store.get(tokens[0]) == 1
+    store.revoke(tokens[0])
+    assert store.get(tokens[0]) is None
+    assert store.revoke_all(1) == 2
+    assert all(store.get(t) is None for t in tokens)
+    assert store.get(other) == 2 and len(store) == 1
+
+
+def test_memory_store_expires_slides_and_evicts(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(sessions.time, "monotonic", lambda: now[0])
+    store = sessions.MemorySessionStore(ttl=60, refresh_threshold=10)
+    token = store.create(1)
+    stale = store.create(2)
+    now[0] += 30
+    assert store.get(token) == 1  # drifted past the threshold: slides to now + 60
+    now[0] += 45
+    assert store.get(token) == 1
+    assert store.get(stale) is None
+    now[0] += 61
+    store.create(3)  # evicts the expired entry from the front
+    assert len(store) == 1 and 1 not in store._index
+
+
+def test_store_is_selected_by_env(monkeypatch):
+    monkeypatch.setattr(sessions, "_store", None)
+    monkeypatch.setattr(sessions, "SESSION_STORE", "memory")
+    token = sessions.create_session(4)
+    assert isinstance(sessions.get_store(), sessions.MemorySessionStore)
+    assert sessions.get_session_empresa(token) == 4
+    monkeypatch.setattr(sessions, "_store", None)
+    monkeypatch.setattr(sessions, "SESSION_STORE", "memcached")
+    with pytest.raises(RuntimeError):
+        sessions.get_store()
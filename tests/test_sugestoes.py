@@ -0,0 +1,98 @@
+import random
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+from sqlalchemy import event
+
+from backend import ai_lote, models, services
+from backend.routers import clientes
+
+AGORA = datetime(2026, 6, 1, 15, 30, tzinfo=timezone.utc)
+
+
+def _popular(db, empresa, n=300, seed=5):
+    rng = random.Random(seed)
+    hoje = AGORA.replace(tzinfo=None)
+    ultimas, status = {}, {}
+    for i in range(n):
+        cliente = models.Cliente(
+            empresa_id=empresa.id, nome=f"Cliente {i:03d}", telefone=f"11{i:09d}",
+            data_primeiro_contato=hoje - timedelta(days=rng.randint(0, 500)),
+            status_ia_cliente=rng.choice([None, "Cliente importante", "Cliente ativo"]),
+        )
+        db.add(cliente)
+        db.flush()
+        datas = [hoje - timedelta(days=rng.randint(-2, 400), hours=rng.randint(0, 23)) for _ in range(rng.choice([0, 1, 3, 8]))]
+        if i % 5 == 0 and datas:
+            # Land on the 30/60/120-day boundaries, at either end of the day.
+            dias = rng.choice([29, 30, 60, 61, 120, 121])
+            datas[0] = hoje.replace(hour=rng.choice([0, 23])) - timedelta(days=dias)
+            datas = datas[:1]
+        for data in datas:
+            db.add(models.Atendimento(empresa_id=empresa.id, cliente_id=cliente.id, tipo_servico="Revisão", data_atendimento=data))
+        ultimas[cliente.id] = max(datas).date().isoformat() if datas else None
+        status[cliente.id] = cliente.status_ia_cliente
+    db.commit()
+    return ultimas, status
+
+
+def _todas(db, empresa_id, limit):
+    itens, cursor = services.sugestoes_clientes(db, empresa_id, limit, agora=AGORA)
+    while cursor:
+        pagina, cursor = services.sugestoes_clientes(db, empresa_id, limit, cursor, agora=AGORA)
+        itens += pagina
+    return itens
+
+
+def test_sql_rules_match_the_python_rules(db, empresa):
+    ultimas, status = _popular(db, empresa)
+    ids = np.array(list(ultimas))
+    total = np.array([int(ultimas[i] is not None) for i in ids])
+    esperado_ids, esperado = ai_lote.sugerir_acoes_lote(
+        ids, total, ai_lote.dias_epoch([ultimas[i] for i in ids]),
+        status=np.array([status[i] or "" for i in ids]), hoje=AGORA.date(),
+    )
+
+    itens = _todas(db, empresa.id, limit=500)
+    assert {i["cliente_id"]: i["sugestao"] for i in itens} == dict(zip(esperado_ids.tolist(), esperado.tolist()))
+    assert set(esperado.tolist()) == set(services.SUGESTOES)
+
+
+def test_pages_are_ordered_by_urgency_without_gaps(db, empresa):
+    _popular(db, empresa)
+    completa = _todas(db, empresa.id, limit=500)
+    paginada = _todas(db, empresa.id, limit=7)
+    assert [i["cliente_id"] for i in paginada] == [i["cliente_id"] for i in completa]
+    chaves = [(i["urgencia"], i["ultimo_atendimento"] is None, -(i["dias_sem_atendimento"] or 0)) for i in completa]
+    assert [c[0] for c in chaves] == sorted(c[0] for c in chaves)
+    for item in completa:
+        assert services.SUGESTOES[item["urgencia"]] == item["sugestao"]
+        if item["ultimo_atendimento"] is not None:
+            assert item["dias_sem_atendimento"] == (AGORA.date() - item["ultimo_atendimento"].date()).days
+
+
+def test_appointment_rows_never_reach_the_app(db, empresa):
+    _popular(db, empresa, n=50)
+    empresa_id = empresa.id
+    db.expunge_all()
+    statements = []
+
+    @event.listens_for(db.bind, "before_cursor_execute")
+    def _capture(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    services.sugestoes_clientes(db, empresa_id, 20, agora=AGORA)
+    assert len(statements) == 1
+    assert "max(atendimentos.data_atendimento)" in statements[0] and "GROUP BY atendimentos.cliente_id" in statements[0]
+    assert not any(isinstance(obj, models.Atendimento) for obj in db.identity_map.values())
+
+
+def test_endpoint_pages_and_rejects_bad_cursors(db, empresa, make_client):
+    _popular(db, empresa, n=40)
+    client = make_client(clientes.router)
+    primeira = client.get("/api/clientes/sugestoes", params={"limit": 5}).json()
+    assert len(primeira["items"]) == 5 and primeira["next_cursor"]
+    assert [i["urgencia"] for i in primeira["items"]] == sorted(i["urgencia"] for i in primeira["items"])
+    segunda = client.get("/api/clientes/sugestoes", params={"limit": 5, "cursor": primeira["next_cursor"]}).json()
+    assert not {i["cliente_id"] for i in primeira["items"]} & {i["cliente_id"] for i in segunda["items"]}
+    assert client.get("/api/clientes/sugestoes", params={"cursor": "bogus"}).status_code == 400
@@ -0,0 +1,89 @@
+from datetime import datetime, timedelta, timezone
+
+from backend import models, reclassificacao, worker
+from backend.routers import atendimentos
+
+AGORA = datetime(2026, 6, 1, 4, 0, tzinfo=timezone.utc)
+
+
+def _cliente(db, empresa, telefone, dias=()):
+    cliente = models.Cliente(empresa_id=empresa.id, nome=f"Cliente {telefone}", telefone=telefone)
+    db.add(cliente)
+    db.flush()
+    for d in dias:
+        db.add(models.Atendimento(
+            empresa_id=empresa.id, cliente_id=cliente.id, tipo_servico="Revisão",
+            data_atendimento=(AGORA - timedelta(days=d)).replace(tzinfo=None),
+        ))
+    db.commit()
+    return cliente
+
+
+def test_atendimento_writes_queue_only_their_clientes(db, empresa, make_client):
+    a = _cliente(db, empresa, "11900000001")
+    b = _cliente(db, empresa, "11900000002")
+    _cliente(db, empresa, "11900000003")
+    client = make_client(atendimentos.router)
+    client.post("/api/atendimentos", json={"cliente_id": a.id, "tipo_servico": "Revisão"})
+    resp = client.post("/api/atendimentos/batch", json=[{"cliente_id": a.id, "tipo_servico": "Xx"}, {"cliente_id": b.id, "tipo_servico": "Yy"}])
+    assert resp.status_code == 201, resp.text
+
+    fila = {q.cliente_id for q in db.query(models.ClienteReclassificar)}
+    assert fila == {a.id, b.id}
+
+    assert reclassificacao.processar_pendentes(db, lote=1) == 1
+    assert reclassificacao.processar_pendentes(db) == 1
+    assert db.query(models.ClienteReclassificar).count() == 0
+    db.expire_all()
+    assert db.get(models.Cliente, a.id).status_cliente == "recente"
+    assert db.get(models.Cliente, b.id).status_cliente == "recente"
+
+
+def test_daily_sweep_only_touches_clientes_crossing_a_threshold(db, empresa):
+    cruzou_inativo = _cliente(db, empresa, "11900000001", dias=[180])
+    cruzou_ativo = _cliente(db, empresa, "11900000002", dias=[90])
+    estavel = _cliente(db, empresa, "11900000003", dias=[45])
+
+    # First run: full pass establishes the baseline.
+    ontem = AGORA - timedelta(days=1)
+    assert worker.executar_ciclo(db, agora=ontem)["varredura_reclassificacao"] == 3
+    db.expire_all()
+    assert [db.get(models.Cliente, c.id).status_cliente for c in (cruzou_inativo, cruzou_ativo, estavel)] == ["ativo", "recente", "recente"]
+
+    resultado = worker.executar_ciclo(db, agora=AGORA)
+    assert resultado["varredura_reclassificacao"] == 2
+    db.expire_all()
+    assert db.get(models.Cliente, cruzou_inativo.id).status_cliente == "inativo"
+    assert db.get(models.Cliente, cruzou_ativo.id).status_cliente == "ativo"
+
+    # Already ran after today's scheduled hour.
+    assert "varredura_reclassificacao" not in worker.executar_ciclo(db, agora=AGORA + timedelta(hours=1))
+
+
+def test_sweep_follows_the_score_past_six_months_in_every_empresa(db, empresa):
+    outra = models.Empresa(nome_empresa="Outra", nicho="x", email_login="outra@example.com", senha_hash="x")
+    db.add(outra)
+    db.commit()
+    # Ages cross the 7- and 13-month boundaries between yesterday and today.
+    parado = _cliente(db, empresa, "11900000001", dias=[210, 400])
+    muito_parado = _cliente(db, outra, "11900000002", dias=[390])
+    estavel = _cliente(db, empresa, "11900000003", dias=[215])
+
+    ontem = AGORA - timedelta(days=1)
+    reclassificacao.varredura(db, desde=None, agora=ontem)
+    db.expire_all()
+    antes = {c.id: db.get(models.Cliente, c.id).score_atividade for c in (parado, muito_parado, estavel)}
+
+    assert reclassificacao.varredura(db, desde=ontem, agora=AGORA) == 2
+    db.expire_all()
+    assert db.get(models.Cliente, parado.id).score_atividade == antes[parado.id] - 5
+    assert db.get(models.Cliente, muito_parado.id).score_atividade == antes[muito_parado.id] - 5
+    assert db.get(models.Cliente, estavel.id).score_atividade == antes[estavel.id]
+
+
+def test_sweep_windows_merge_after_a_long_gap():
+    agora = AGORA.replace(tzinfo=None)
+    curto = reclassificacao._janelas(agora - timedelta(days=1), agora, agora - timedelta(days=95))
+    assert curto == [(agora - timedelta(days=30 * k + 1), agora - timedelta(days=30 * k)) for k in (1, 2, 3)]
+    longo = reclassificacao._janelas(agora - timedelta(days=45), agora, agora - timedelta(days=95))
+    assert longo == [(agora - timedelta(days=135), agora - timedelta(days=30))]